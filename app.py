@@ -4,10 +4,8 @@ Enhanced with file upload, full database view, and change tracking
 """
 
 import streamlit as st
-import pandas as pd
 import sys
 from pathlib import Path
-import time
 from datetime import datetime
 import io
 
@@ -15,7 +13,6 @@ import io
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.config import Config
-from src.batch_processor import search_google, extract_with_grok
 from src.auth import check_password
 
 # Page config
@@ -30,6 +27,30 @@ st.set_page_config(
 if not check_password():
     st.stop()
 
+# Pipeline modules (pandas, search, extraction) load only after login so the
+# password page renders immediately
+import pandas as pd
+
+from src.batch_processor import search_google, extract_with_grok
+from src.search_strategy import search_reporter
+from src.enrichment import enrich_results
+from src.rate_limiter import ApiError
+from src.metrics import start_batch, finish_batch, load_metrics
+from src.scheduler import RefreshScheduler
+from src.budget import get_ledger
+from src.data_store import load_reporters, save_reporters, ensure_tracking_columns
+from src.backups import load_manifest, restore_snapshot
+from src.coalesce import get_coalescer, person_key
+from src.local_lookup import lookup_reporter
+from src.update_engine import apply_updates, confidence_of, decision_for
+
+
+@st.cache_data(max_entries=4, show_spinner="Rebuilding snapshot...")
+def snapshot_csv(db_path: str, snapshot_id: str) -> bytes:
+    """A backup snapshot as CSV - snapshots never change, so each one is replayed once, not on every rerun"""
+    return restore_snapshot(db_path, snapshot_id).to_csv(index=False).encode('utf-8-sig')
+
+
 # Session state initialization
 if 'processing' not in st.session_state:
     st.session_state.processing = False
@@ -176,10 +197,10 @@ with st.sidebar:
             upload_path.parent.mkdir(parents=True, exist_ok=True)
 
             # Read and validate CSV
-            df_upload = pd.read_csv(uploaded_file, encoding='utf-8')
+            df_upload = load_reporters(uploaded_file)
 
             # Save to disk
-            df_upload.to_csv(upload_path, index=False, encoding='utf-8-sig')
+            save_reporters(df_upload, upload_path, note='upload')
 
             st.session_state.current_db_path = upload_path
             st.session_state.uploaded_file_name = uploaded_file.name
@@ -217,6 +238,15 @@ with st.sidebar:
         else:
             st.error("❌ Google")
 
+    # Remaining daily budget (shared with CLI runs and the scraper)
+    for api, budget in get_ledger().status().items():
+        if not budget['limit']:
+            st.caption(f"{api.title()}: {budget['spent']:,} {budget['unit']} today (no cap)")
+            continue
+        st.progress(budget['remaining'] / budget['limit'])
+        label = {'ok': '', 'low': ' ⚠️ low - degraded mode', 'exhausted': ' ⛔ paused until reset'}[budget['level']]
+        st.caption(f"{api.title()}: {budget['remaining']:,}/{budget['limit']:,} {budget['unit']} left today{label}")
+
     st.divider()
 
     # Settings
@@ -238,11 +268,20 @@ with st.sidebar:
         help="Number of reporters to process"
     )
 
+    selection_mode = st.radio(
+        "Reporter Selection",
+        options=["Highest priority first", "Row range"],
+        index=0,
+        help="Priority ranks reporters by staleness, confidence, manual-review status and missing contacts"
+    )
+    prioritize = selection_mode == "Highest priority first"
+
     start_row = st.number_input(
         "Start Row",
         min_value=2,
         max_value=1000,
         value=2,
+        disabled=prioritize,
         help="CSV row to start from (2 = first reporter)"
     )
 
@@ -251,7 +290,7 @@ with st.sidebar:
     # Database info
     st.subheader("📊 Database Stats")
     try:
-        df = pd.read_csv(st.session_state.current_db_path, encoding='utf-8')
+        df = load_reporters(st.session_state.current_db_path, view='sidebar')
 
         total = len(df)
         processed = df['confidence_score'].notna().sum() if 'confidence_score' in df.columns else 0
@@ -286,6 +325,7 @@ with tab1:
     st.header("🚀 Process Reporters")
 
     col1, col2 = st.columns([3, 1])
+    selection_label = "highest priority first" if prioritize else f"rows from {start_row}"
 
     with col1:
         st.markdown(f"""
@@ -293,7 +333,7 @@ with tab1:
             <strong>⚙️ Current Settings:</strong><br>
             • Confidence Threshold: <strong>{confidence_threshold}%</strong><br>
             • Batch Size: <strong>{batch_size}</strong> reporters<br>
-            • Starting from Row: <strong>{start_row}</strong><br>
+            • Selection: <strong>{selection_label}</strong><br>
             • Database: <strong>{current_db_name}</strong>
         </div>
         """, unsafe_allow_html=True)
@@ -303,18 +343,27 @@ with tab1:
             st.session_state.processing = True
             st.rerun()
 
+    if prioritize and not st.session_state.processing:
+        with st.expander("🎯 Next up (priority queue)"):
+            try:
+                queue_df = load_reporters(st.session_state.current_db_path, view='scheduler')
+                st.dataframe(
+                    RefreshScheduler(st.session_state.current_db_path).preview(queue_df, n=batch_size),
+                    use_container_width=True, hide_index=True
+                )
+            except Exception as e:
+                st.error(f"❌ Error loading priority queue: {e}")
+
     # Processing logic
     if st.session_state.processing:
         st.markdown("---")
         st.subheader("⚡ Processing in Progress...")
 
-        # Load CSV
-        df = pd.read_csv(st.session_state.current_db_path, encoding='utf-8')
+        recorder = start_batch('app')
 
-        # Add tracking columns if needed
-        for col in ['confidence_score', 'last_updated', 'update_notes', 'decision', 'source_urls', 'search_history']:
-            if col not in df.columns:
-                df[col] = None
+        # Load CSV
+        with recorder.span('csv_io'):
+            df = ensure_tracking_columns(load_reporters(st.session_state.current_db_path, view='process'))
 
         # Progress bar
         progress_bar = st.progress(0)
@@ -322,10 +371,19 @@ with tab1:
         results_container = st.container()
 
         results = []
-        end_row = min(start_row + batch_size, len(df) + 1)
-        total = end_row - start_row
-
-        for idx, i in enumerate(range(start_row - 1, end_row - 1)):
+        scheduler = None
+        if prioritize:
+            scheduler = RefreshScheduler(st.session_state.current_db_path)
+            rows = scheduler.next_batch(df, batch_size)
+        else:
+            end_row = min(start_row + batch_size, len(df) + 1)
+            rows = list(range(start_row - 1, end_row - 1))
+        total = max(len(rows), 1)
+
+        completed = []
+        coalescer = get_coalescer()
+        seen_people = {}
+        for idx, i in enumerate(rows):
             row = df.iloc[i]
             first_name = row['שם פרטי']
             last_name = row['שם משפחה']
@@ -338,27 +396,62 @@ with tab1:
                 with st.expander(f"Row {i + 2}: {full_name}", expanded=True):
                     col1, col2 = st.columns(2)
 
-                    with col1:
-                        st.write("🔍 **Searching Google...**")
-
-                    # Search
-                    query = f'"{full_name}" Israel journalist reporter media'
-                    search_results = search_google(query, num_results=5)
+                    # Confident match in the scraped journalists database - no API calls
+                    local = lookup_reporter(first_name, last_name, row.get('תפקיד'))
+                    local_context = local['context'] if local else None
+                    # Same person as an earlier row (or processed recently) - reuse that result
+                    person = person_key(first_name, last_name)
+                    extracted = local['extracted'] if local else None
+                    shared = None if extracted else seen_people.get(person) or coalescer.recent(person)
+                    if extracted:
+                        completed.append(i)
+                        with col1:
+                            st.info(f"📇 **Matched in the journalists database ({local['confidence']}%) - no API calls**")
+                    elif shared:
+                        extracted = shared
+                        completed.append(i)
+                        with col1:
+                            st.info("♻️ **Same person as an earlier or recent request - reusing its result**")
+                    else:
+                        with col1:
+                            st.write("🔍 **Searching Google...**")
 
-                    with col2:
-                        if search_results:
-                            st.success(f"✅ Found {len(search_results)} results")
-                        else:
-                            st.warning("⚠️ No results found")
-                            continue
+                        # Search (query variants merged and ranked)
+                        try:
+                            search_results = search_reporter(search_google, first_name, last_name, role=row.get('תפקיד'))
+                        except ApiError as e:
+                            st.error(f"❌ Google API unavailable, stopping batch: {e}")
+                            break
 
-                    # Extract
-                    st.write("🤖 **Extracting with AI...**")
-                    extracted = extract_with_grok(full_name, search_results)
+                        with col2:
+                            if search_results:
+                                st.success(f"✅ Found {len(search_results)} results")
+                            else:
+                                st.warning("⚠️ No results found")
+                                completed.append(i)  # Nothing to extract
+                                continue
+
+                        # Extract
+                        page_context = None
+                        if Config.ENRICH_PAGES:
+                            st.write("🌐 **Fetching top result pages...**")
+                            page_context = enrich_results(full_name, search_results)
+
+                        st.write("🤖 **Extracting with AI...**")
+                        try:
+                            extracted = extract_with_grok(full_name, search_results, page_context=page_context,
+                                                          local_context=local_context)
+                        except ApiError as e:
+                            st.error(f"❌ Grok API unavailable, stopping batch: {e}")
+                            break
+                        completed.append(i)  # Only once extracted - a row stopped mid-way goes back to the queue
+                        if extracted:
+                            seen_people[person] = extracted
+                            coalescer.remember(person, extracted)
 
                     if extracted:
-                        confidence = extracted.get('confidence_score', 0)
-                        decision = "AUTO-UPDATE" if confidence >= confidence_threshold else "MANUAL REVIEW"
+                        confidence = confidence_of(extracted)
+                        decision = decision_for(confidence, confidence_threshold)
 
                         # Display results
                         col1, col2, col3 = st.columns(3)
@@ -383,40 +476,21 @@ with tab1:
                             'extracted': extracted
                         })
 
-                    time.sleep(2)  # Rate limiting
-
         # Save results
         status_text.text("💾 Saving results...")
 
-        # Update DataFrame
-        for result in results:
-            i = result['row'] - 2
-            extracted = result['extracted']
-            confidence = extracted.get('confidence_score', 0)
-            decision = result['decision']
-
-            timestamp = datetime.now().isoformat()
-            df.at[i, 'confidence_score'] = confidence
-            df.at[i, 'last_updated'] = timestamp
-            df.at[i, 'decision'] = decision
-
-            source_urls = extracted.get('source_urls', [])
-            df.at[i, 'source_urls'] = "; ".join(source_urls) if source_urls else None
-
-            # Update search history
-            update_notes = extracted.get('notes', '')
-            history_entry = f"[{timestamp}] Confidence: {confidence}% | Decision: {decision} | {update_notes}"
-            existing_history = df.at[i, 'search_history']
-            if pd.isna(existing_history) or existing_history == '':
-                df.at[i, 'search_history'] = history_entry
-            else:
-                df.at[i, 'search_history'] = existing_history + " || " + history_entry
+        # Update DataFrame - same field diffs and threshold policy as the CLI (src/update_engine.py)
+        df, changes, outcomes = apply_updates(df, {r['row'] - 2: r['extracted'] for r in results},
+                                              threshold=confidence_threshold)
 
-        # Save
-        backup_path = Config.OUTPUT_PATH / f"backup_reporters_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        Config.OUTPUT_PATH.mkdir(exist_ok=True)
-        df.to_csv(st.session_state.current_db_path, index=False, encoding='utf-8-sig')
-        df.to_csv(backup_path, index=False, encoding='utf-8-sig')
+        # Save (records the changed rows as an incremental backup snapshot and in the change feed)
+        with recorder.span('csv_io'):
+            backup = save_reporters(df, st.session_state.current_db_path, rows=[r['row'] - 2 for r in results],
+                                    note='app', changes=changes)
+        finish_batch(reporters=len(results))
+        if scheduler:
+            scheduler.complete(completed)
+            scheduler.release([i for i in rows if i not in completed])
 
         progress_bar.progress(1.0)
         status_text.markdown("### ✅ Processing Complete!")
@@ -436,21 +510,33 @@ with tab1:
         with col3:
             st.metric("⚠️ Manual Reviews", manual_reviews)
 
+        if not changes.empty:
+            applied = changes[changes['applied']]
+            with st.expander(f"📝 Field Changes ({len(applied)} applied, {len(changes) - len(applied)} for review)"):
+                st.dataframe(
+                    changes.assign(row=changes['row'] + 2).rename(columns={
+                        'row': 'Row', 'column': 'Field', 'old': 'Current', 'new': 'Found',
+                        'confidence': 'Confidence', 'decision': 'Decision', 'applied': 'Applied'
+                    }),
+                    use_container_width=True, hide_index=True
+                )
+
         st.session_state.results = results
         st.session_state.processing = False
 
-        st.success(f"💾 Backup saved: {backup_path.name}")
+        if backup:
+            st.success(f"💾 Backup snapshot: {backup['id']} ({backup['changed']} rows, {backup['bytes'] / 1024:.1f} KB)")
 
 # ==================== TAB 2: REVIEW QUEUE ====================
 with tab2:
     st.header("📋 Review Queue")
 
     try:
-        df = pd.read_csv(st.session_state.current_db_path, encoding='utf-8')
+        df = load_reporters(st.session_state.current_db_path, view='review')
 
         if 'decision' in df.columns:
             # Filter for manual review
-            manual_review_df = df[df['decision'] == 'MANUAL REVIEW'].copy()
+            manual_review_df = df[df['decision'] == 'MANUAL REVIEW']
 
             if len(manual_review_df) > 0:
                 st.warning(f"⚠️ **{len(manual_review_df)} reporters need manual review**")
@@ -489,10 +575,10 @@ with tab3:
     st.header("📊 Statistics Dashboard")
 
     try:
-        df = pd.read_csv(st.session_state.current_db_path, encoding='utf-8')
+        df = load_reporters(st.session_state.current_db_path, view='statistics')
 
         if 'confidence_score' in df.columns:
-            processed_df = df[df['confidence_score'].notna()].copy()
+            processed_df = df[df['confidence_score'].notna()]
 
             if len(processed_df) > 0:
                 # Key metrics
@@ -564,12 +650,66 @@ with tab3:
     except Exception as e:
         st.error(f"❌ Error loading statistics: {e}")
 
+    # Per-batch timing and token cost (logs/metrics.jsonl)
+    st.markdown("---")
+    st.subheader("⏱️ Batch Performance")
+
+    batch_metrics = load_metrics(limit=20)
+    if batch_metrics:
+        import plotly.express as px
+
+        stage_rows = [
+            {'batch': m['batch_id'], 'stage': stage, 'seconds': stats['total_ms'] / 1000}
+            for m in batch_metrics for stage, stats in m['stages'].items()
+        ]
+        if stage_rows:
+            fig = px.bar(
+                pd.DataFrame(stage_rows), x='batch', y='seconds', color='stage',
+                title="Time per Stage (last 20 batches)"
+            )
+            fig.update_layout(height=400, xaxis_title=None)
+            st.plotly_chart(fig, use_container_width=True)
+
+        summary_df = pd.DataFrame([{
+            'Batch': m['batch_id'],
+            'Source': m['source'],
+            'Reporters': m['reporters'],
+            'Wall (s)': m['elapsed_s'],
+            'Prompt tokens': m['tokens']['prompt'],
+            'Completion tokens': m['tokens']['completion'],
+            'Tokens/reporter': m['tokens_per_reporter'],
+            'Page cache hits': m['counters'].get('page_cache_hits', 0),
+            'Retries': sum(v for k, v in m['counters'].items() if k.endswith('_retries')),
+        } for m in reversed(batch_metrics)])
+        st.dataframe(summary_df, use_container_width=True, hide_index=True)
+
+        latest = batch_metrics[-1]
+        with st.expander(f"Latest batch stage breakdown ({latest['batch_id']})"):
+            st.dataframe(
+                pd.DataFrame(latest['stages']).T.rename_axis('stage'),
+                use_container_width=True
+            )
+            if latest.get('pipeline'):
+                st.write("**Pipeline stages (utilization, backpressure, queue depth):**")
+                st.dataframe(
+                    pd.DataFrame(latest['pipeline']).T.rename_axis('stage'),
+                    use_container_width=True
+                )
+            if latest.get('reporter_tokens'):
+                st.write("**Tokens per reporter:**")
+                st.dataframe(
+                    pd.DataFrame(latest['reporter_tokens'].items(), columns=['Reporter', 'Tokens']),
+                    use_container_width=True, hide_index=True
+                )
+    else:
+        st.info("ℹ️ No batch metrics recorded yet. Run a batch to see timing and token cost.")
+
 # ==================== TAB 4: VIEW DATABASE ====================
 with tab4:
     st.header("🗄️ View Full Database")
 
     try:
-        df = pd.read_csv(st.session_state.current_db_path, encoding='utf-8')
+        df = load_reporters(st.session_state.current_db_path, view='database')
 
         # Filters
         col1, col2, col3 = st.columns(3)
@@ -599,8 +739,8 @@ with tab4:
             else:
                 min_confidence = 0
 
-        # Apply filters
-        filtered_df = df.copy()
+        # Apply filters (each filter returns a new frame - no upfront copy needed)
+        filtered_df = df
 
         if decision_filter != 'All':
             if decision_filter == 'Not Processed':
@@ -660,11 +800,11 @@ with tab5:
     st.header("📝 Change History")
 
     try:
-        df = pd.read_csv(st.session_state.current_db_path, encoding='utf-8')
+        df = load_reporters(st.session_state.current_db_path, view='history')
 
         if 'search_history' in df.columns:
             # Filter reporters with history
-            history_df = df[df['search_history'].notna()].copy()
+            history_df = df[df['search_history'].notna()]
 
             if len(history_df) > 0:
                 st.success(f"📋 **{len(history_df)} reporters** have processing history")
@@ -730,6 +870,32 @@ with tab5:
         else:
             st.warning("⚠️ No change history tracked yet. Process some reporters first.")
 
+        # Backup snapshots (incremental, see src/backups.py)
+        snapshots = load_manifest(st.session_state.current_db_path)
+        if snapshots:
+            st.markdown("---")
+            st.subheader("🗄️ Backup Snapshots")
+            st.dataframe(pd.DataFrame([{
+                'snapshot': e['id'], 'created': e['created'][:19], 'kind': e['kind'], 'rows changed': e['changed'],
+                'KB': round(e['bytes'] / 1024, 1), 'note': e.get('note', ''),
+            } for e in reversed(snapshots)]), use_container_width=True, hide_index=True)
+            restore_id = st.selectbox("Snapshot", [e['id'] for e in reversed(snapshots)])
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.checkbox("Prepare snapshot download"):
+                    st.download_button(
+                        label="📥 Download Snapshot CSV",
+                        data=snapshot_csv(str(st.session_state.current_db_path), restore_id),
+                        file_name=f"reporters_{restore_id}.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
+            with col2:
+                if st.button("⏪ Restore This Snapshot", use_container_width=True):
+                    restored = restore_snapshot(st.session_state.current_db_path, restore_id)
+                    save_reporters(restored, st.session_state.current_db_path, note=f"restore {restore_id}")
+                    st.success(f"✅ Restored {restore_id} (the previous state is kept as a snapshot)")
+
     except Exception as e:
         st.error(f"❌ Error loading change history: {e}")
 
@@ -753,10 +919,10 @@ with tab6:
 
     ### 3️⃣ Process Reporters
     **"Process" Tab:**
-    1. Review your settings
+    1. Review your settings ("Highest priority first" picks the stalest / least certain records)
     2. Click **"▶️ Start Processing"**
     3. Watch real-time progress for each reporter
-    4. Results auto-saved with backup
+    4. Results auto-saved with an incremental backup snapshot
 
     ### 4️⃣ Review Results
     **"Review Queue" Tab:**
@@ -0,0 +1,484 @@
+"""
+Offline benchmark suite for the update pipeline
+Runs the batch processor, the Streamlit data paths and the scraper against
+local stub servers (no Google/Grok quota) and reports reporters/minute,
+p50/p95 per-stage latency, peak memory and DataFrame footprint
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --reporters 40 --latency-ms 80 --error-rate 0.05
+    python benchmarks/run_benchmarks.py --output benchmarks/results/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import inspect
+import io
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.config import Config
+from src.metrics import percentile, get_last_summary
+from stub_servers import StubServers
+
+SAMPLE_CSV = Config.PROJECT_ROOT / 'DB-Sample' / 'Sample list.csv'
+JOURNALISTS_JSON = Config.PROJECT_ROOT / 'data' / 'journalists.json'
+
+
+def latency_summary(samples):
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50) * 1000, 2),
+        'p95_ms': round(percentile(samples, 95) * 1000, 2),
+        'total_s': round(sum(samples), 3),
+    }
+
+
+class StageTimer:
+    """Times calls to module-level functions by wrapping them for the duration of a benchmark"""
+
+    def __init__(self):
+        self.samples = {}
+        self._patched = []
+
+    def wrap(self, module, attr, stage):
+        original = getattr(module, attr)
+
+        if inspect.iscoroutinefunction(original):
+            async def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await original(*args, **kwargs)
+                finally:
+                    self.samples.setdefault(stage, []).append(time.perf_counter() - start)
+        else:
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    self.samples.setdefault(stage, []).append(time.perf_counter() - start)
+
+        setattr(module, attr, timed)
+        self._patched.append((module, attr, original))
+
+    def restore(self):
+        for module, attr, original in reversed(self._patched):
+            setattr(module, attr, original)
+        self._patched.clear()
+
+    def summary(self):
+        return {stage: latency_summary(samples) for stage, samples in self.samples.items()}
+
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    """Silence the pipeline's progress prints"""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def measure(fn):
+    """Run fn, returning (result, elapsed_seconds, peak_memory_mb)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def configure(stubs, workdir, args):
+    """Point the pipeline at the stubs and a scratch copy of the database"""
+    Config.GOOGLE_API_ENDPOINT = stubs.google_endpoint
+    Config.GOOGLE_API_KEY = 'benchmark'
+    Config.GOOGLE_SEARCH_ENGINE_ID = 'benchmark'
+    Config.GROK_BASE_URL = stubs.grok_base_url
+    Config.GROK_API_KEY = 'benchmark'
+    Config.PIPELINE_SEARCH_WORKERS = args.search_workers
+    Config.PIPELINE_EXTRACT_WORKERS = args.extract_workers
+    Config.GOOGLE_MAX_RPS = args.max_rps
+    Config.GROK_MAX_RPS = args.max_rps
+    Config.DB_SAMPLE_PATH = workdir / 'reporters.csv'
+    Config.OUTPUT_PATH = workdir / 'output'
+    Config.CACHE_PATH = workdir / 'cache'
+    Config.LOGS_PATH = workdir / 'logs'
+    Config.JOURNALISTS_PATH = workdir / 'journalists.json'
+    Config.CRAWL_DELAY = 0
+    # Measure real calls: no daily caps, no search-result cache
+    Config.GOOGLE_DAILY_QUERY_LIMIT = 0
+    Config.GROK_DAILY_TOKEN_LIMIT = 0
+    Config.SEARCH_CACHE_TTL_HOURS = 0
+    shutil.copy(SAMPLE_CSV, Config.DB_SAMPLE_PATH)
+    shutil.copy(JOURNALISTS_JSON, Config.JOURNALISTS_PATH)
+
+
+def bench_batch(args):
+    """batch_process end to end: search -> enrich -> extract -> CSV write (stages from the batch metrics)"""
+    import src.batch_processor as bp
+    from src.backups import load_manifest
+    from src.data_store import load_reporters, save_reporters
+
+    with quiet(not args.verbose):
+        # Baseline full snapshot, so the batch's own backup is the incremental one
+        save_reporters(load_reporters(Config.DB_SAMPLE_PATH), Config.DB_SAMPLE_PATH, note='baseline')
+        (results, _), elapsed, peak_mb = measure(
+            lambda: bp.batch_process(num_reporters=args.reporters, start_row=2))
+    metrics = get_last_summary() or {}
+    snapshots = load_manifest(Config.DB_SAMPLE_PATH)
+
+    return {
+        'processed': len(results),
+        'elapsed_s': round(elapsed, 3),
+        'reporters_per_min': round(len(results) / elapsed * 60, 1) if elapsed else 0.0,
+        'peak_mb': round(peak_mb, 2),
+        'tokens_per_reporter': metrics.get('tokens_per_reporter', 0),
+        'retries': sum(v for k, v in metrics.get('counters', {}).items() if k.endswith('_retries')),
+        'backup_kb': round(snapshots[-1]['bytes'] / 1024, 2) if snapshots else 0.0,
+        'full_backup_kb': round(snapshots[0]['bytes'] / 1024, 2) if snapshots else 0.0,
+        'stages': metrics.get('stages', {}),
+        'pipeline': metrics.get('pipeline', {}),
+    }
+
+
+def scaled_csv(args, workdir):
+    """The sample CSV replicated --scale times (written once per run)"""
+    import pandas as pd
+
+    path = workdir / 'data_paths.csv'
+    if not path.exists():
+        base = pd.read_csv(SAMPLE_CSV, encoding='utf-8')
+        pd.concat([base] * args.scale, ignore_index=True).to_csv(path, index=False, encoding='utf-8-sig')
+    return path
+
+
+def bench_data_paths(args, workdir):
+    """The read/filter/download paths the Streamlit tabs run on every rerun"""
+    from src import change_feed, contacts, update_engine
+    from src.data_store import load_reporters
+    from src.journalists_store import JournalistsStore
+
+    path = scaled_csv(args, workdir)
+
+    def load():
+        return load_reporters(path)
+
+    def parse_csv():
+        return load_reporters(path, snapshot=False)
+
+    def review_queue():
+        df = load_reporters(path, view='review')
+        queue = df[df['decision'] == 'MANUAL REVIEW']
+        return queue.to_csv(index=False, encoding='utf-8-sig')
+
+    def statistics_tab():
+        df = load_reporters(path, view='statistics')
+        processed = df[df['confidence_score'].notna()]
+        return processed['decision'].value_counts(), processed['confidence_score'].mean()
+
+    def view_database():
+        df = load_reporters(path, view='database')
+        filtered = df[df['שם פרטי'].str.contains('א', case=False, na=False)]
+        return filtered.to_csv(index=False, encoding='utf-8-sig'), df.to_csv(index=False, encoding='utf-8-sig')
+
+    # Every row gets an extraction; about half clear the confidence threshold
+    extractions = {i: {'job_title': f"כתב/ת {i % 7}", 'employer': 'חדשות הבדיקה', 'topics': ['פוליטיקה'],
+                       'email': f"r{i}@news.example.co.il", 'phone': None, 'confidence_score': 40 + i % 60,
+                       'source_urls': ['https://news.example.co.il/']} for i in range(len(load_reporters(path)))}
+
+    def apply_updates():
+        return update_engine.apply_updates(load_reporters(path), extractions)
+
+    def contact_index():
+        return contacts.duplicate_contacts(load_reporters(path, view='scheduler'))
+
+    # Streamed changed-since export from the middle of the last_updated range
+    stamps = load_reporters(path, columns=['last_updated'])['last_updated'].dropna().sort_values()
+    since = stamps.iloc[len(stamps) // 2] if len(stamps) else None
+
+    def export_since():
+        positions, _ = change_feed.changed_rows(path, since)
+        return change_feed.write_rows(change_feed.iter_rows(path, positions), io.StringIO())
+
+    def journalists_page():
+        # First visit: build the shared store and its full downloads
+        store = JournalistsStore.from_file(Config.JOURNALISTS_PATH)
+        return store.stats, store.full_csv, store.full_json
+
+    shared_store = JournalistsStore.from_file(Config.JOURNALISTS_PATH)
+
+    def journalists_rerun():
+        # Any later rerun: filter the shared store, render the table and the filtered download
+        positions = shared_store.filter(organization=shared_store.organizations[0], beat='news')
+        return shared_store.view(positions), shared_store.to_csv(positions), shared_store.labels[positions]
+
+    ops = {
+        'parse_csv': parse_csv,
+        'load_csv': load,
+        'review_queue': review_queue,
+        'statistics': statistics_tab,
+        'view_database': view_database,
+        'apply_updates': apply_updates,
+        'contact_index': contact_index,
+        'export_since': export_since,
+        'journalists_page': journalists_page,
+        'journalists_rerun': journalists_rerun,
+    }
+
+    report = {'rows': len(load())}
+    for name, op in ops.items():
+        samples = []
+        peak_mb = 0.0
+        for _ in range(args.repeat):
+            _, elapsed, peak = measure(op)
+            samples.append(elapsed)
+            peak_mb = max(peak_mb, peak)
+        report[name] = dict(latency_summary(samples), peak_mb=round(peak_mb, 2))
+    return report
+
+
+def bench_memory(args, workdir):
+    """Resident DataFrame size per view: untyped read vs the typed schema and per-tab projections"""
+    import pandas as pd
+    from src.data_store import VIEW_COLUMNS, load_reporters, frame_memory_mb
+
+    path = scaled_csv(args, workdir)
+    untyped = pd.read_csv(path, encoding='utf-8')
+    report = {'rows': len(untyped), 'untyped_mb': round(frame_memory_mb(untyped), 3)}
+    typed = load_reporters(path)
+    report['typed_mb'] = round(frame_memory_mb(typed), 3)
+    # What one session holds across a rerun that renders every tab
+    views = {view: round(frame_memory_mb(load_reporters(path, view=view)), 3) for view in VIEW_COLUMNS}
+    report['views'] = views
+    report['session_mb'] = round(sum(views.values()), 3)
+    report['untyped_session_mb'] = round(report['untyped_mb'] * len(views), 3)
+    return report
+
+
+def bench_scraper(args, stubs):
+    """
+    scrape_organization crawling the fixture site from /authors/ (plain requests
+    fetches without crawl4ai), then again replayed from its crawl archive
+    """
+    with quiet(True):
+        import src.scrape_organizations as so
+        so.JOURNALISTS_FILE = Config.JOURNALISTS_PATH  # Never the real data/journalists.json
+
+    org = {
+        'id': 'fixture-news',
+        'name_english': 'Fixture News',
+        'staff_page_url': f"{stubs.site_url}/authors/",
+        'website': stubs.site_url,
+    }
+    timer = StageTimer()
+    timer.wrap(so, 'extract_journalists_with_grok', 'extract')
+    timer.wrap(so, 'fetch_crawl_page', 'fetch')
+    mode = 'crawl4ai' if so.CRAWL4AI_AVAILABLE else 'requests (crawl4ai not installed)'
+
+    def run():
+        return asyncio.run(so.scrape_organization(org))
+
+    try:
+        with quiet(not args.verbose):
+            journalists, elapsed, peak_mb = measure(run)
+        pages = len(timer.samples.get('fetch', []))
+        # The same crawl + extraction served from the archive the live run just wrote
+        Config.CRAWL_REPLAY = True
+        with quiet(not args.verbose):
+            replayed, replay_elapsed, _ = measure(run)
+    finally:
+        Config.CRAWL_REPLAY = False
+        timer.restore()
+
+    return {
+        'mode': mode,
+        'pages': pages,
+        'journalists': len(journalists),
+        'elapsed_s': round(elapsed, 3),
+        'replay_journalists': len(replayed),
+        'replay_elapsed_s': round(replay_elapsed, 3),
+        'peak_mb': round(peak_mb, 2),
+        'stages': timer.summary(),
+    }
+
+
+# Startup paths: (label, argv after the interpreter). app_login is what app.py
+# imports before the password check renders; app_pipeline is the rest.
+STARTUP_TARGETS = [
+    ('app_login', ['-c', 'import streamlit, src.config, src.auth']),
+    ('app_pipeline', ['-c', 'import pandas, src.batch_processor, src.search_strategy, src.enrichment, '
+                            'src.metrics, src.scheduler, src.budget']),
+    ('cli_help', ['-m', 'src.cli', '--help']),
+    ('scraper_list', ['src/scrape_organizations.py', 'list']),
+    ('scraper_stats', ['src/scrape_organizations.py', 'stats']),
+]
+
+
+def parse_importtime(stderr):
+    """Total import time and the heaviest top-level imports from -X importtime output"""
+    total_us, top = 0, {}
+    for line in stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)', line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if depth == 0:  # top-level import
+            total_us += cumulative
+            top[name] = top.get(name, 0) + cumulative
+    heaviest = sorted(top.items(), key=lambda kv: -kv[1])[:5]
+    return total_us / 1000, {name: round(us / 1000, 1) for name, us in heaviest}
+
+
+def bench_startup(args):
+    """Cold-start wall time and -X importtime totals for the app, CLI and scraper entry points"""
+    results = {}
+    for label, argv in STARTUP_TARGETS:
+        walls, imports, heaviest = [], [], {}
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, '-X', 'importtime', *argv], cwd=Config.PROJECT_ROOT,
+                                  capture_output=True, text=True, encoding='utf-8', errors='replace')
+            walls.append(time.perf_counter() - start)
+            if proc.returncode != 0:
+                break
+            import_ms, heaviest = parse_importtime(proc.stderr)
+            imports.append(import_ms / 1000)
+
+        if proc.returncode != 0:
+            missing = re.search(r"No module named '([^']+)'", proc.stderr)
+            results[label] = {'skipped': f"missing {missing.group(1)}" if missing else proc.stderr.strip()[-200:]}
+            continue
+        results[label] = dict(latency_summary(walls), import_ms=round(percentile(imports, 50) * 1000, 1),
+                              heaviest=heaviest)
+    return results
+
+
+def find_regressions(current, baseline, tolerance):
+    """Compare against a previous run; lower-is-better except reporters_per_min"""
+    regressions = []
+
+    def walk(cur, base, path):
+        for key, value in cur.items():
+            if key not in base:
+                continue
+            name = f"{path}.{key}" if path else key
+            if isinstance(value, dict) and isinstance(base[key], dict):
+                walk(value, base[key], name)
+            elif isinstance(value, (int, float)) and isinstance(base[key], (int, float)) and base[key]:
+                if key == 'reporters_per_min' and value < base[key] * (1 - tolerance):
+                    regressions.append(f"{name}: {base[key]} -> {value}")
+                elif (key in ('p95_ms', 'peak_mb') or key.endswith('_mb')) and value > base[key] * (1 + tolerance):
+                    regressions.append(f"{name}: {base[key]} -> {value}")
+
+    walk(current, baseline, '')
+    return regressions
+
+
+def print_report(report):
+    print("=" * 70)
+    print("Benchmark Results")
+    print("=" * 70)
+    for section, data in report.items():
+        if section == 'settings':
+            continue
+        print(f"\n[{section}]")
+        for key, value in data.items():
+            if key == 'views':
+                for view, mb in value.items():
+                    print(f"  view {view:<15} {mb:>9.3f}MB")
+            elif key == 'pipeline':
+                for stage, stats in value.items():
+                    print(f"  pipeline {stage:<11} workers={stats['workers']:<2} items={stats['items']:<4} "
+                          f"util={stats['utilization']:>4.0%}  blocked={stats['blocked_s']:>6.2f}s  "
+                          f"queue max={stats['queue_max']} mean={stats['queue_mean']}")
+            elif key == 'stages':
+                for stage, stats in value.items():
+                    print(f"  stage {stage:<14} n={stats['count']:<4} p50={stats['p50_ms']:>9.2f}ms  p95={stats['p95_ms']:>9.2f}ms")
+            elif isinstance(value, dict) and 'skipped' in value:
+                print(f"  {key:<20} skipped ({value['skipped']})")
+            elif isinstance(value, dict) and 'import_ms' in value:
+                heaviest = ', '.join(f"{name} {ms:.0f}ms" for name, ms in value['heaviest'].items())
+                print(f"  {key:<20} p50={value['p50_ms']:>9.2f}ms  p95={value['p95_ms']:>9.2f}ms  "
+                      f"imports={value['import_ms']:.0f}ms  ({heaviest})")
+            elif isinstance(value, dict):
+                print(f"  {key:<20} p50={value['p50_ms']:>9.2f}ms  p95={value['p95_ms']:>9.2f}ms  peak={value['peak_mb']:.2f}MB")
+            else:
+                print(f"  {key:<20} {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the reporter updater")
+    parser.add_argument('--only', choices=['batch', 'data', 'memory', 'scraper', 'startup'], action='append',
+                        help='Run only these benchmarks (repeatable)')
+    parser.add_argument('--reporters', type=int, default=20, help='Reporters per batch run')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Stub API latency (ms, +/-50%% jitter)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of stub API calls answered with 429')
+    parser.add_argument('--search-workers', type=int, default=Config.PIPELINE_SEARCH_WORKERS,
+                        help='Batch pipeline search workers')
+    parser.add_argument('--extract-workers', type=int, default=Config.PIPELINE_EXTRACT_WORKERS,
+                        help='Batch pipeline extraction workers')
+    parser.add_argument('--max-rps', type=float, default=50.0, help='Rate limiter ceiling for both APIs')
+    parser.add_argument('--scale', type=int, default=20, help='Replicate the sample CSV N times for data paths')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions per data-path operation')
+    parser.add_argument('--output', type=Path, help='Write results as JSON')
+    parser.add_argument('--baseline', type=Path, help='Fail if results regress against this JSON')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed regression fraction')
+    parser.add_argument('--verbose', action='store_true', help='Show pipeline output')
+    args = parser.parse_args()
+
+    selected = set(args.only or ['batch', 'data', 'memory', 'scraper', 'startup'])
+    report = {'settings': {k: v for k, v in vars(args).items() if isinstance(v, (int, float, str)) and v is not None}}
+
+    with tempfile.TemporaryDirectory() as tmp, StubServers(args.latency_ms, args.error_rate) as stubs:
+        workdir = Path(tmp)
+        configure(stubs, workdir, args)
+
+        if 'batch' in selected:
+            report['batch'] = bench_batch(args)
+        if 'data' in selected:
+            report['data_paths'] = bench_data_paths(args, workdir)
+        if 'memory' in selected:
+            report['memory'] = bench_memory(args, workdir)
+        if 'scraper' in selected:
+            report['scraper'] = bench_scraper(args, stubs)
+
+    if 'startup' in selected:
+        report['startup'] = bench_startup(args)
+
+    print_report(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\n[OK] Results written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        regressions = find_regressions(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n[X] {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for r in regressions:
+                print(f"  - {r}")
+            sys.exit(1)
+        print(f"\n[OK] No regressions beyond {args.tolerance:.0%} vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Local stand-in servers for offline benchmarks
+Replays recorded Google Custom Search and Grok chat-completion responses with
+configurable latency / error rate, and serves the fixture crawl site
+"""
+
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+SITE_DIR = FIXTURES_DIR / "site"
+
+
+class FaultConfig:
+    """Latency and error injection shared by the API stubs"""
+
+    def __init__(self, latency_ms: float = 0, error_rate: float = 0.0, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        if self.latency_ms:
+            with self._lock:
+                jitter = self._random.uniform(0.5, 1.5)
+            time.sleep(self.latency_ms * jitter / 1000)
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    faults = None
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def maybe_fail(self) -> bool:
+        """Inject latency and (sometimes) a 429 with Retry-After"""
+        self.faults.delay()
+        if self.faults.should_fail():
+            self.send_json(429, {'error': {'code': 429, 'message': 'Rate limit exceeded (stub)'}},
+                           headers={'Retry-After': '0'})
+            return True
+        return False
+
+
+class CustomSearchHandler(_StubHandler):
+    """GET /customsearch/v1 - cycles through recorded responses"""
+    recorded_responses = None
+    site_url = ''
+
+    def do_GET(self):
+        if self.maybe_fail():
+            return
+        body = json.dumps(next(self.recorded_responses), ensure_ascii=False).replace('{site}', self.site_url)
+        self.send_json(200, json.loads(body))
+
+
+class ChatCompletionsHandler(_StubHandler):
+    """POST /v1/chat/completions - replays recorded contents; batched prompts get one object per reporter ID"""
+    recorded = None
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if self.maybe_fail():
+            return
+
+        prompt = request.get('messages', [{}])[-1].get('content', '')
+        ids = re.findall(r'=== Reporter ID: (\w+) ===', prompt)
+
+        if ids:
+            item = json.loads(self.recorded['reporter']['content'].strip('`').removeprefix('json'))
+            content = json.dumps([dict(item, reporter_id=rid) for rid in ids], ensure_ascii=False)
+            usage = (self.recorded['reporter']['prompt_tokens'] * len(ids) // 2,
+                     self.recorded['reporter']['completion_tokens'] * len(ids))
+        else:
+            entry = self.recorded['journalists' if 'WEBPAGE CONTENT' in prompt else 'reporter']
+            content = entry['content']
+            usage = (entry['prompt_tokens'], entry['completion_tokens'])
+
+        self.send_json(200, {
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'stub'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': usage[0], 'completion_tokens': usage[1],
+                      'total_tokens': usage[0] + usage[1]},
+        })
+
+
+class SiteHandler(SimpleHTTPRequestHandler):
+    """Static fixture crawl site"""
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServers:
+    """
+    Context manager running the Google, Grok and fixture-site stubs on
+    ephemeral localhost ports.
+
+        with StubServers(latency_ms=50, error_rate=0.05) as stubs:
+            stubs.google_endpoint, stubs.grok_base_url, stubs.site_url
+    """
+
+    def __init__(self, latency_ms: float = 0, error_rate: float = 0.0, seed: int = 42):
+        self.faults = FaultConfig(latency_ms, error_rate, seed)
+        self._servers = []
+
+    def _start(self, handler):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self._servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    def __enter__(self):
+        self.site_url = self._start(partial(SiteHandler, directory=str(SITE_DIR)))
+
+        with open(FIXTURES_DIR / "customsearch_responses.json", 'r', encoding='utf-8') as f:
+            search = json.load(f)['responses']
+        with open(FIXTURES_DIR / "chat_responses.json", 'r', encoding='utf-8') as f:
+            chat = json.load(f)
+
+        google = type('Google', (CustomSearchHandler,), {
+            'faults': self.faults, 'recorded_responses': itertools.cycle(search), 'site_url': self.site_url,
+        })
+        grok = type('Grok', (ChatCompletionsHandler,), {'faults': self.faults, 'recorded': chat})
+
+        self.google_endpoint = self._start(google)
+        self.grok_base_url = self._start(grok) + "/v1"
+        return self
+
+    def __exit__(self, *exc):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        return False
+
+
+if __name__ == "__main__":
+    with StubServers() as stubs:
+        print(f"Google endpoint: {stubs.google_endpoint}")
+        print(f"Grok base URL:   {stubs.grok_base_url}")
+        print(f"Fixture site:    {stubs.site_url}")
+        print("Press Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -4,7 +4,6 @@ Browse and search journalists scraped from Israeli media organizations
 """
 
 import streamlit as st
-import pandas as pd
 import json
 from pathlib import Path
 from datetime import datetime
@@ -27,6 +26,9 @@ st.set_page_config(
 if not check_password():
     st.stop()
 
+import pandas as pd  # Loaded after login so the password page renders immediately
+from src.journalists_store import JournalistsStore, file_signature  # Imports pandas too
+
 # Data paths
 DATA_DIR = Path(__file__).parent.parent / "data"
 JOURNALISTS_FILE = DATA_DIR / "journalists.json"
@@ -86,15 +88,18 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Cache data loading
-@st.cache_data
-def load_journalists_data():
-    """Load journalists from JSON file with caching"""
+@st.cache_resource(max_entries=1)
+def load_journalists_store(signature):
+    """One columnar store shared by every session, rebuilt when journalists.json changes"""
+    return JournalistsStore.from_file(JOURNALISTS_FILE)
+
+
+def get_journalists_store():
     try:
-        with open(JOURNALISTS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_journalists_store(file_signature(JOURNALISTS_FILE))
     except Exception as e:
         st.error(f"Error loading journalists: {e}")
-        return {"journalists": [], "metadata": {}}
+        return JournalistsStore([])
 
 @st.cache_data
 def load_organizations_data():
@@ -120,13 +125,13 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load data
-journalists_data = load_journalists_data()
+store = get_journalists_store()
 orgs_data = load_organizations_data()
 
-journalists = journalists_data.get('journalists', [])
-metadata = journalists_data.get('metadata', {})
+metadata = store.metadata
+stats = store.stats
 
-if not journalists:
+if not len(store):
     st.warning("No journalist data found. Run the scraping script first:")
     st.code("py -3.12 src/scrape_organizations.py scrape-all", language="bash")
     st.stop()
@@ -140,16 +145,13 @@ st.markdown("""
 
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    st.metric("Total Journalists", len(journalists))
+    st.metric("Total Journalists", stats['total'])
 with col2:
-    unique_orgs = len(set(j.get('organization_name', 'Unknown') for j in journalists))
-    st.metric("Organizations", unique_orgs)
+    st.metric("Organizations", stats['organizations'])
 with col3:
-    verified = sum(1 for j in journalists if j.get('verified', False))
-    st.metric("Verified", verified)
+    st.metric("Verified", stats['verified'])
 with col4:
-    with_email = sum(1 for j in journalists if j.get('email'))
-    st.metric("With Email", with_email)
+    st.metric("With Email", stats['with_email'])
 
 st.markdown("---")
 
@@ -158,10 +160,9 @@ with st.sidebar:
     st.header("🔍 Filters")
 
     # Organization filter
-    org_names = sorted(set(j.get('organization_name', 'Unknown') for j in journalists))
     selected_org = st.selectbox(
         "Organization",
-        options=['All Organizations'] + org_names,
+        options=['All Organizations'] + store.organizations,
         index=0
     )
 
@@ -169,25 +170,16 @@ with st.sidebar:
     search_name = st.text_input("Search by Name", "", placeholder="Enter name...")
 
     # Beat/topic filter
-    all_beats = []
-    for j in journalists:
-        beat = j.get('beat', '')
-        if beat:
-            all_beats.extend([b.strip() for b in beat.split(',') if b.strip()])
-    unique_beats = sorted(set(all_beats))
-
     selected_beat = st.selectbox(
         "Beat/Topic",
-        options=['All Beats'] + unique_beats[:50],
+        options=['All Beats'] + store.beats[:50],
         index=0
     )
 
     # Job title filter
-    all_titles = sorted(set(j.get('job_title_english', '') or j.get('job_title_hebrew', '') or 'Unknown'
-                           for j in journalists if j.get('job_title_english') or j.get('job_title_hebrew')))
     selected_title = st.selectbox(
         "Job Title",
-        options=['All Titles'] + all_titles[:50],
+        options=['All Titles'] + store.titles[:50],
         index=0
     )
 
@@ -197,47 +189,34 @@ with st.sidebar:
     st.subheader("📊 Database Stats")
     if metadata:
         st.caption(f"**Last Updated:** {metadata.get('last_updated', 'Unknown')[:10]}")
-        st.caption(f"**Total Records:** {metadata.get('total_journalists', len(journalists))}")
+        st.caption(f"**Total Records:** {metadata.get('total_journalists', stats['total'])}")
 
     # Refresh button
     if st.button("🔄 Refresh Data"):
         st.cache_data.clear()
+        st.cache_resource.clear()
         st.rerun()
 
-# Apply filters
-filtered = journalists.copy()
-
-if selected_org != 'All Organizations':
-    filtered = [j for j in filtered if j.get('organization_name') == selected_org]
-
-if search_name:
-    search_lower = search_name.lower()
-    filtered = [j for j in filtered if
-               search_lower in (j.get('name_english', '') or '').lower() or
-               search_lower in (j.get('name_hebrew', '') or '').lower()]
-
-if selected_beat != 'All Beats':
-    filtered = [j for j in filtered if selected_beat.lower() in (j.get('beat', '') or '').lower()]
-
-if selected_title != 'All Titles':
-    filtered = [j for j in filtered if
-               selected_title == (j.get('job_title_english', '') or j.get('job_title_hebrew', ''))]
+# Apply filters (row positions into the shared store - nothing is copied per session)
+filtered = store.filter(
+    organization=selected_org if selected_org != 'All Organizations' else None,
+    name=search_name,
+    beat=selected_beat if selected_beat != 'All Beats' else None,
+    title=selected_title if selected_title != 'All Titles' else None,
+)
 
 # Display results count
-st.info(f"Showing **{len(filtered)}** of **{len(journalists)}** journalists")
+st.info(f"Showing **{len(filtered)}** of **{stats['total']}** journalists")
 
 # Tabs for different views
 tab1, tab2, tab3 = st.tabs(["📋 Table View", "📈 Analytics", "🔍 Details"])
 
 # TAB 1: TABLE VIEW
 with tab1:
-    if filtered:
-        df_journalists = pd.DataFrame(filtered)
-
+    if len(filtered):
         # Select and rename columns for display
         display_cols = ['name_english', 'name_hebrew', 'organization_name', 'job_title_english',
                       'beat', 'email', 'profile_url', 'verified', 'confidence_score']
-        available_cols = [col for col in display_cols if col in df_journalists.columns]
 
         # Rename columns for better display
         col_rename = {
@@ -252,7 +231,7 @@ with tab1:
             'confidence_score': 'Confidence'
         }
 
-        df_display = df_journalists[available_cols].rename(columns=col_rename)
+        df_display = store.view(filtered, display_cols).rename(columns=col_rename)
 
         # Display table
         st.dataframe(
@@ -272,42 +251,41 @@ with tab1:
             }
         )
 
-        # Download buttons
+        # Download buttons (built on request; the full exports are cached with the store)
         st.markdown("---")
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            # Download filtered as CSV
-            csv_filtered = df_journalists.to_csv(index=False, encoding='utf-8-sig')
-            st.download_button(
-                label="📥 Download Filtered (CSV)",
-                data=csv_filtered,
-                file_name=f"journalists_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-
-        with col2:
-            # Download full database as CSV
-            df_all = pd.DataFrame(journalists)
-            csv_full = df_all.to_csv(index=False, encoding='utf-8-sig')
-            st.download_button(
-                label="📥 Download All (CSV)",
-                data=csv_full,
-                file_name=f"journalists_full_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-
-        with col3:
-            # Download as JSON
-            st.download_button(
-                label="📥 Download All (JSON)",
-                data=json.dumps(journalists, ensure_ascii=False, indent=2),
-                file_name=f"journalists_full_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json",
-                use_container_width=True
-            )
+        if st.checkbox("Prepare downloads"):
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                # Download filtered as CSV
+                st.download_button(
+                    label="📥 Download Filtered (CSV)",
+                    data=store.to_csv(filtered),
+                    file_name=f"journalists_filtered_{stamp}.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
+
+            with col2:
+                # Download full database as CSV
+                st.download_button(
+                    label="📥 Download All (CSV)",
+                    data=store.full_csv,
+                    file_name=f"journalists_full_{stamp}.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
+
+            with col3:
+                # Download as JSON
+                st.download_button(
+                    label="📥 Download All (JSON)",
+                    data=store.full_json,
+                    file_name=f"journalists_full_{stamp}.json",
+                    mime="application/json",
+                    use_container_width=True
+                )
     else:
         st.warning("No journalists match the selected filters.")
 
@@ -318,16 +296,10 @@ with tab2:
     st.subheader("📊 Journalists by Organization")
 
     # Organization distribution
-    org_counts = {}
-    for j in journalists:
-        org = j.get('organization_name', 'Unknown')
-        org_counts[org] = org_counts.get(org, 0) + 1
-
-    org_counts_sorted = dict(sorted(org_counts.items(), key=lambda x: -x[1]))
-
+    org_counts = store.organization_counts.head(20)
     df_orgs = pd.DataFrame({
-        'Organization': list(org_counts_sorted.keys())[:20],
-        'Journalists': list(org_counts_sorted.values())[:20]
+        'Organization': org_counts.index.astype(str),
+        'Journalists': org_counts.to_numpy()
     })
 
     fig = px.bar(
@@ -347,20 +319,10 @@ with tab2:
 
     with col1:
         st.subheader("🎯 Top Beats/Topics")
-        beat_counts = {}
-        for j in journalists:
-            beat = j.get('beat', '')
-            if beat:
-                for b in beat.split(','):
-                    b = b.strip()
-                    if b:
-                        beat_counts[b] = beat_counts.get(b, 0) + 1
-
-        beat_counts_sorted = dict(sorted(beat_counts.items(), key=lambda x: -x[1])[:15])
-
+        beat_counts = store.beat_counts.head(15)
         df_beats = pd.DataFrame({
-            'Beat': list(beat_counts_sorted.keys()),
-            'Count': list(beat_counts_sorted.values())
+            'Beat': beat_counts.index,
+            'Count': beat_counts.to_numpy()
         })
 
         fig2 = px.pie(
@@ -374,9 +336,7 @@ with tab2:
 
     with col2:
         st.subheader("📧 Contact Information")
-        with_email = sum(1 for j in journalists if j.get('email'))
-        with_profile = sum(1 for j in journalists if j.get('profile_url'))
-        total = len(journalists)
+        with_email, with_profile, total = stats['with_email'], stats['with_profile'], stats['total']
 
         contact_data = pd.DataFrame({
             'Type': ['With Email', 'Without Email', 'With Profile URL', 'Without Profile URL'],
@@ -395,10 +355,7 @@ with tab2:
 
     # Scrape dates
     st.subheader("📅 Data Freshness")
-    scrape_dates = {}
-    for j in journalists:
-        date = j.get('scraped_date', '')[:10] if j.get('scraped_date') else 'Unknown'
-        scrape_dates[date] = scrape_dates.get(date, 0) + 1
+    scrape_dates = stats['scrape_dates']
 
     st.write(f"**Scrape Dates:** {', '.join(sorted(scrape_dates.keys()))}")
     st.write(f"**Records per date:** {scrape_dates}")
@@ -407,17 +364,16 @@ with tab2:
 with tab3:
     st.subheader("🔍 Journalist Details")
 
-    if filtered:
+    if len(filtered):
         # Select a journalist
-        journalist_names = [f"{j.get('name_english', '')} - {j.get('organization_name', '')}" for j in filtered]
-        selected_idx = st.selectbox(
+        selected_pos = st.selectbox(
             "Select a journalist",
-            options=range(len(journalist_names)),
-            format_func=lambda i: journalist_names[i]
+            options=filtered.tolist(),
+            format_func=lambda p: store.labels[p]
         )
 
-        if selected_idx is not None:
-            j = filtered[selected_idx]
+        if selected_pos is not None:
+            j = store.record(selected_pos)
 
             col1, col2 = st.columns(2)
 
@@ -0,0 +1,126 @@
+"""
+Crash- and concurrency-safe file writes
+Temp file + fsync + atomic rename, under an advisory lock file next to the
+target so the app, CLI runs and the scraper never interleave their writes
+"""
+
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.config import Config
+
+
+class LockTimeoutError(TimeoutError):
+    """Another writer held the lock for longer than FILE_LOCK_TIMEOUT"""
+
+
+def lock_path(path) -> Path:
+    path = Path(path)
+    return path.with_name(f".{path.name}.lock")
+
+
+def _try_lock(f) -> bool:
+    if sys.platform == 'win32':
+        import msvcrt
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+    import fcntl
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _unlock(f):
+    if sys.platform == 'win32':
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def file_lock(path, timeout: float = None):
+    """Exclusive advisory lock on `path` (via a .<name>.lock sibling), waiting up to `timeout` seconds"""
+    timeout = Config.FILE_LOCK_TIMEOUT if timeout is None else timeout
+    target = lock_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+    with open(target, 'a+b') as f:
+        while not _try_lock(f):
+            if time.monotonic() >= deadline:
+                raise LockTimeoutError(f"{path} is locked by another writer (waited {timeout:g}s)")
+            time.sleep(0.05)
+        try:
+            yield
+        finally:
+            _unlock(f)
+
+
+def _read_umask() -> int:
+    # os.umask can only be read by setting it - do that once, at import, before any worker threads create files
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+_UMASK = _read_umask()
+
+
+def _fsync_dir(directory: Path):
+    # Make the rename itself durable (not supported on Windows)
+    if sys.platform == 'win32':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode: str = 'w', encoding: str = 'utf-8', newline=None):
+    """
+    Open a temp file in the target's directory; on a clean exit it is flushed,
+    fsynced and renamed over `path`, otherwise removed. Readers only ever see
+    the old or the new file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=path.parent)
+    try:
+        binary = 'b' in mode
+        with os.fdopen(fd, mode, encoding=None if binary else encoding, newline=None if binary else newline) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600 - keep the existing file's permissions (or the umask default)
+        os.chmod(tmp, path.stat().st_mode & 0o777 if path.exists() else 0o666 & ~_UMASK)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+    _fsync_dir(path.parent)
+
+
+def atomic_write_json(path, data, **kwargs):
+    with atomic_write(path) as f:
+        json.dump(data, f, **kwargs)
+
+
+def atomic_copy(source, target):
+    with atomic_write(target, 'wb') as f:
+        f.write(Path(source).read_bytes())
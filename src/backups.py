@@ -0,0 +1,215 @@
+"""
+Incremental backup snapshots of the reporter database
+Each save records only the rows that changed since the previous snapshot as a
+gzip'd, content-addressed object under output/backups/<db>/objects/, listed in
+manifest.jsonl. A full checkpoint every BACKUP_FULL_EVERY snapshots keeps
+point-in-time restores short; snapshots older than BACKUP_KEEP_DAYS are pruned.
+"""
+
+import gzip
+import hashlib
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from src.atomic_io import atomic_write
+from src.config import Config
+from src.data_store import apply_schema
+
+
+def store_dir(db_path) -> Path:
+    db_path = Path(db_path)
+    digest = hashlib.sha1(str(db_path.resolve()).encode('utf-8')).hexdigest()[:8]
+    return Config.OUTPUT_PATH / 'backups' / f"{db_path.stem.replace(' ', '_')}-{digest}"
+
+
+def _object_path(store: Path, digest: str) -> Path:
+    return store / 'objects' / digest[:2] / f"{digest}.json.gz"
+
+
+def _put_object(store: Path, payload: dict) -> tuple:
+    """Write payload once under its content hash; returns (digest, bytes written - 0 if already stored)"""
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    digest = hashlib.sha256(raw).hexdigest()
+    path = _object_path(store, digest)
+    if path.exists():
+        return digest, 0
+    data = gzip.compress(raw, mtime=0)
+    with atomic_write(path, 'wb') as f:
+        f.write(data)
+    return digest, len(data)
+
+
+def _get_object(store: Path, digest: str) -> dict:
+    with open(_object_path(store, digest), 'rb') as f:
+        return json.loads(gzip.decompress(f.read()))
+
+
+def load_manifest(db_path) -> list:
+    """Snapshots for one database, oldest first"""
+    path = store_dir(db_path) / 'manifest.jsonl'
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _save_manifest(store: Path, entries: list):
+    with atomic_write(store / 'manifest.jsonl') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def _cell(value):
+    if value is None or pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _rows_payload(df: pd.DataFrame, indices) -> dict:
+    frame = df.loc[list(indices)]
+    return {str(i): [_cell(v) for v in values] for i, values in zip(frame.index, frame.itertuples(index=False))}
+
+
+def _chain(entries: list, snapshot_id: str) -> list:
+    """Entries from the last full snapshot up to snapshot_id"""
+    position = next(n for n, e in enumerate(entries) if e['id'] == snapshot_id)
+    start = max(n for n in range(position + 1) if entries[n]['kind'] == 'full')
+    return entries[start:position + 1]
+
+
+def _materialize(store: Path, chain: list) -> pd.DataFrame:
+    rows, columns, length = {}, [], 0
+    for entry in chain:
+        payload = _get_object(store, entry['object'])
+        if entry['kind'] == 'full':
+            rows = {}
+        rows.update(payload['rows'])
+        columns, length = payload['columns'], payload['length']
+    values = [rows.get(str(i), [None] * len(columns)) for i in range(length)]
+    df = pd.DataFrame(values, columns=columns, dtype=object)
+    return apply_schema(df)
+
+
+def _changed_rows(previous: pd.DataFrame, current: pd.DataFrame) -> list:
+    """Row indices whose content differs (vectorized row hashes)"""
+    common = min(len(previous), len(current))
+    before = pd.util.hash_pandas_object(previous.iloc[:common].astype(str), index=False).to_numpy()
+    after = pd.util.hash_pandas_object(current.iloc[:common].astype(str), index=False).to_numpy()
+    changed = current.index[:common][before != after].tolist()
+    return changed + current.index[common:].tolist()
+
+
+def _fingerprint(db_path) -> list:
+    stat = Path(db_path).stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def record_snapshot(df: pd.DataFrame, db_path, changed: Optional[list] = None, base: Optional[list] = None,
+                    note: str = '') -> dict:
+    """
+    Record the state just saved to db_path. `changed` (the rows a job edited)
+    is trusted when `base` - the CSV mtime/size the job loaded - is what the
+    previous snapshot saved; otherwise the previous state is rebuilt and
+    compared row by row. Returns the manifest entry.
+    """
+    store = store_dir(db_path)
+    entries = load_manifest(db_path)
+    parent = entries[-1] if entries else None
+    if parent is None or base is None or parent.get('fingerprint') != list(base):
+        changed = None
+    columns = [str(c) for c in df.columns]
+    df = df.reset_index(drop=True)
+
+    since_full = 0
+    for entry in reversed(entries):
+        if entry['kind'] == 'full':
+            break
+        since_full += 1
+
+    kind = 'delta'
+    if parent is None or parent['columns'] != columns or since_full + 1 >= Config.BACKUP_FULL_EVERY:
+        kind = 'full'
+    elif changed is None:
+        changed = _changed_rows(_materialize(store, _chain(entries, parent['id'])), df)
+
+    indices = df.index if kind == 'full' else sorted(set(changed) & set(df.index))
+    payload = {'columns': columns, 'length': len(df), 'rows': _rows_payload(df, indices)}
+    digest, written = _put_object(store, payload)
+
+    now = datetime.now()
+    entry = {
+        'id': now.strftime('%Y%m%d_%H%M%S_%f'),
+        'created': now.isoformat(),
+        'database': str(Path(db_path).resolve()),
+        'kind': kind,
+        'parent': parent['id'] if parent else None,
+        'object': digest,
+        'rows': len(df),
+        'changed': len(indices),
+        'bytes': written,
+        'columns': columns,
+        'fingerprint': _fingerprint(db_path),
+        'note': note,
+    }
+    entries.append(entry)
+    _save_manifest(store, prune(store, entries))
+    return entry
+
+
+def prune(store: Path, entries: list, now: Optional[datetime] = None) -> list:
+    """
+    Drop snapshots older than BACKUP_KEEP_DAYS (always keeping the newest
+    BACKUP_KEEP_MIN). The oldest survivor is rewritten as a full snapshot if
+    it was a delta, then unreferenced objects are deleted.
+    """
+    cutoff = (now or datetime.now()) - timedelta(days=Config.BACKUP_KEEP_DAYS)
+    keep_from = len(entries)
+    for n, entry in enumerate(entries):
+        if datetime.fromisoformat(entry['created']) >= cutoff:
+            keep_from = n
+            break
+    keep_from = min(keep_from, max(0, len(entries) - Config.BACKUP_KEEP_MIN))
+    if keep_from == 0:
+        return entries
+
+    first = entries[keep_from]
+    if first['kind'] != 'full':
+        df = _materialize(store, _chain(entries, first['id']))
+        first['object'], first['bytes'] = _put_object(
+            store, {'columns': list(df.columns), 'length': len(df), 'rows': _rows_payload(df, df.index)})
+        first['kind'], first['changed'] = 'full', len(df)
+    kept = entries[keep_from:]
+    kept[0]['parent'] = None
+
+    referenced = {e['object'] for e in kept}
+    for path in (store / 'objects').glob('*/*.json.gz'):
+        if path.name.split('.')[0] not in referenced:
+            path.unlink(missing_ok=True)
+    print(f"  [~] Pruned {keep_from} backup snapshot(s) older than {Config.BACKUP_KEEP_DAYS} days")
+    return kept
+
+
+def find_snapshot(db_path, snapshot_id: Optional[str] = None, at: Optional[datetime] = None) -> Optional[dict]:
+    """A snapshot by id (or unique id prefix), the last one at or before `at`, or the latest"""
+    entries = load_manifest(db_path)
+    if snapshot_id:
+        matches = [e for e in entries if e['id'].startswith(snapshot_id)]
+        return matches[0] if len(matches) == 1 else None
+    if at:
+        entries = [e for e in entries if datetime.fromisoformat(e['created']) <= at]
+    return entries[-1] if entries else None
+
+
+def restore_snapshot(db_path, snapshot_id: str) -> pd.DataFrame:
+    """Rebuild the database as it was at a snapshot (last full snapshot + deltas)"""
+    entries = load_manifest(db_path)
+    return _materialize(store_dir(db_path), _chain(entries, snapshot_id))
+
+
+def store_size_mb(db_path) -> float:
+    objects = store_dir(db_path) / 'objects'
+    return sum(p.stat().st_size for p in objects.glob('*/*.json.gz')) / 1024 / 1024 if objects.exists() else 0.0
@@ -4,11 +4,11 @@ Batch processor: Process multiple reporters and update CSV
 
 import sys
 import io
-from pathlib import Path
 import json
-import pandas as pd
-from datetime import datetime
+import hashlib
+import threading
 import time
+from pathlib import Path
 
 # Fix Windows console encoding for Hebrew
 if sys.platform == 'win32':
@@ -19,65 +19,111 @@ if sys.platform == 'win32':
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config import Config
-from googleapiclient.discovery import build
-from openai import OpenAI
+from src.rate_limiter import call_with_retry, ApiError
+from src.search_strategy import search_reporter
+from src.enrichment import enrich_results
+from src.prompt_builder import estimate_tokens, build_reporter_context
+from src.scheduler import RefreshScheduler
+from src.budget import get_ledger
+from src.data_store import load_reporters, save_reporters, ensure_tracking_columns
+from src.metrics import get_recorder, start_batch, finish_batch, print_summary
+from src.pipeline import Pipeline, Stage, StageFailure
+from src.coalesce import get_coalescer, group_rows
+from src.local_lookup import lookup_reporter
+from src.update_engine import apply_updates, confidence_of, decision_for
+from src.response_parser import (
+    REPORTER_SCHEMA, create_json_completion, parse_object_response, parse_array_response, get_parse_stats
+)
+
+def _search_cache_file(query, num_results):
+    digest = hashlib.sha1(f"{query}\n{num_results}".encode('utf-8')).hexdigest()
+    return Config.CACHE_PATH / 'search' / digest[:2] / f"{digest}.json"
+
+def read_cached_search(query, num_results, max_age_hours=None):
+    """Cached results for a query (any age if max_age_hours is None)"""
+    path = _search_cache_file(query, num_results)
+    try:
+        if max_age_hours is not None and time.time() - path.stat().st_mtime > max_age_hours * 3600:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_cached_search(query, num_results, results):
+    path = _search_cache_file(query, num_results)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False)
 
 def search_google(query, num_results=5):
-    """Search Google and return top results"""
+    """
+    Search Google and return top results
+
+    Served from the search cache when fresh (or at any age once the daily
+    budget runs low). Raises ApiError (quota exhausted / still rate limited /
+    daily budget used up) so callers don't mistake a throttled search for a
+    reporter with no results.
+    """
+    ledger = get_ledger()
+    cached = read_cached_search(query, num_results,
+                                None if ledger.is_low('google') else Config.SEARCH_CACHE_TTL_HOURS)
+    if cached is not None:
+        get_recorder().incr('search_cache_hits')
+        return cached
+    reserved = ledger.reserve('google')
+    executed = False
+
     try:
-        service = build("customsearch", "v1", developerKey=Config.GOOGLE_API_KEY)
-        result = service.cse().list(
+        from googleapiclient.discovery import build  # Imported on first search (slow to load)
+
+        client_options = {'api_endpoint': Config.GOOGLE_API_ENDPOINT} if Config.GOOGLE_API_ENDPOINT else None
+        service = build("customsearch", "v1", developerKey=Config.GOOGLE_API_KEY, client_options=client_options)
+        request = service.cse().list(
             q=query,
             cx=Config.GOOGLE_SEARCH_ENGINE_ID,
             num=num_results
-        ).execute()
-
-        if 'items' not in result:
-            return []
+        )
+        with get_recorder().span('search'):
+            result = call_with_retry('google', request.execute)
+        executed = True
+        get_recorder().incr('google_queries')
 
         results = []
-        for item in result['items']:
+        for item in result.get('items', []):
             results.append({
                 'title': item.get('title', ''),
                 'link': item.get('link', ''),
                 'snippet': item.get('snippet', '')
             })
+        write_cached_search(query, num_results, results)
         return results
 
+    except ApiError:
+        raise
     except Exception as e:
         print(f"  [X] Search error: {e}")
         return []
-
-def extract_with_grok(reporter_name, search_results):
-    """Use Grok to extract structured reporter information"""
-    context = f"Reporter Name: {reporter_name}\n\nSearch Results:\n"
-    for i, result in enumerate(search_results, 1):
-        context += f"\n{i}. {result['title']}\n{result['snippet']}\nURL: {result['link']}\n"
-
-    prompt = f"""You are analyzing search results for an Israeli media professional.
-
-{context}
-
-Task: Extract the following information about "{reporter_name}":
-- Full Name (Hebrew and English if available)
-- Current Job Title (in Hebrew if possible)
-- Current Employer/Organization (in Hebrew if possible)
-- Contact Email (search carefully in all results, check author info, contact sections)
-- Phone/Mobile (search carefully in all results, look for contact information)
-- Professional Topics/Beats (in Hebrew if possible)
-
-IMPORTANT: For Israeli media professionals, prefer Hebrew for all fields except email/phone/URLs.
-
-Search CAREFULLY for email and phone in:
-- Author bio sections
-- Contact information in articles
-- "About the author" sections
-- Staff directory listings
-- Profile pages
-
-Return ONLY a JSON object with this exact structure (use null for missing fields):
-{{
-  "name_hebrew": "...",
+    finally:
+        if not executed:
+            # The query never ran (client setup or request failed) - refund the reservation
+            ledger.settle('google', reserved, 0)
+
+EXTRACTION_SYSTEM_PROMPT = "You are a data extraction assistant. Return only valid JSON, no other text."
+
+# Instruction blocks shared by the single and batched extraction prompts
+EXTRACTION_FIELDS = """- Full Name (Hebrew and English if available)
+- Current Job Title
+- Current Employer/Organization
+- Contact Email
+- Phone/Mobile
+- Professional Topics/Beats
+
+IMPORTANT: Prefer Hebrew for all fields except email/phone/URLs.
+Search CAREFULLY for email and phone in author bios, "about the author" sections,
+contact lines in articles, staff directories and profile pages."""
+
+EXTRACTION_SCHEMA = """  "name_hebrew": "...",
   "name_english": "...",
   "job_title": "...",
   "employer": "...",
@@ -86,61 +132,213 @@ Return ONLY a JSON object with this exact structure (use null for missing fields
   "topics": "...",
   "confidence_score": 0-100,
   "source_urls": ["url1", "url2", "url3"],
-  "notes": "any important observations about what you found and where"
-}}
+  "notes": "any important observations about what you found and where\""""
 
-Confidence Score Guidelines:
+CONFIDENCE_GUIDELINES = """Confidence Score Guidelines:
 - 90-100: Multiple reliable sources agree, all key fields found including contact info
 - 70-89: One reliable source, most key fields found, some contact info
 - 50-69: Partial information, uncertain sources, missing contact info
-- Below 50: Very limited or no relevant information
+- Below 50: Very limited or no relevant information"""
+
+# Expected completion size per reporter in a batched response
+OUTPUT_TOKENS_PER_REPORTER = 350
+
+def get_grok_client():
+    """OpenAI-compatible client for Grok (retries handled by call_with_retry)"""
+    from openai import OpenAI  # Imported on first extraction (slow to load)
+
+    return OpenAI(
+        api_key=Config.GROK_API_KEY,
+        base_url=Config.GROK_BASE_URL,
+        max_retries=0
+    )
+
+def extract_with_grok(reporter_name, search_results, page_context=None, local_context=None, context=None):
+    """
+    Use Grok to extract structured reporter information (raises ApiError on quota/rate limit)
+
+    context: an already compacted prompt context (batch fallback) - built from the results otherwise
+    """
+    if context is None:
+        context = build_reporter_context(reporter_name, search_results, page_context, local_context=local_context)
+
+    prompt = f"""You are analyzing search results for an Israeli media professional.
+
+{context}
+
+Task: Extract the following information about "{reporter_name}":
+{EXTRACTION_FIELDS}
+
+Return ONLY a JSON object with this exact structure (use null for missing fields):
+{{
+{EXTRACTION_SCHEMA}
+}}
+
+{CONFIDENCE_GUIDELINES}
 
 IMPORTANT: Return ONLY the JSON object, no other text."""
 
     try:
-        client = OpenAI(
-            api_key=Config.GROK_API_KEY,
-            base_url=Config.GROK_BASE_URL
-        )
+        client = get_grok_client()
 
-        completion = client.chat.completions.create(
-            model=Config.GROK_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a data extraction assistant. Return only valid JSON, no other text."},
+        completion = create_json_completion(
+            client,
+            [
+                {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.1,
-            max_tokens=1000
+            max_tokens=1000,
+            json_mode=True,
+            reporters=[reporter_name]
         )
 
-        response = completion.choices[0].message.content.strip()
-
-        # Remove markdown code blocks if present
-        if response.startswith("```"):
-            response = response.split("```")[1]
-            if response.startswith("json"):
-                response = response[4:]
-            response = response.strip()
-
-        data = json.loads(response)
-        return data
+        # Validated against REPORTER_SCHEMA; malformed JSON is repaired, not dropped
+        return parse_object_response(completion.choices[0].message.content, REPORTER_SCHEMA, call='reporter')
 
+    except ApiError:
+        raise
     except Exception as e:
         print(f"  [X] Extraction error: {e}")
         return None
 
-def process_reporter(row_index, first_name, last_name):
-    """Process a single reporter"""
+def build_batch_prompt(batch):
+    """Pack several reporters' contexts into one prompt returning a JSON array"""
+    sections = "\n".join(f"=== Reporter ID: {r['id']} ===\n{r['context']}" for r in batch)
+
+    return f"""You are analyzing search results for {len(batch)} Israeli media professionals.
+Each reporter has an ID and their OWN search results - use only that reporter's results for their entry.
+
+{sections}
+
+Task: For EACH reporter, extract:
+{EXTRACTION_FIELDS}
+
+Return ONLY a JSON array with exactly one object per reporter ID (use null for missing fields):
+[
+  {{
+  "reporter_id": "the Reporter ID above",
+{EXTRACTION_SCHEMA}
+  }}
+]
+
+{CONFIDENCE_GUIDELINES}
+
+IMPORTANT: Return ONLY the JSON array with {len(batch)} objects, no other text."""
+
+def take_batch(pending, max_size):
+    """Take the next batch from pending that fits the input and output token budgets"""
+    overhead = estimate_tokens(build_batch_prompt([]))
+    batch, tokens = [], overhead
+    for reporter in pending:
+        cost = estimate_tokens(reporter['context'])
+        if batch and (len(batch) >= max_size
+                      or tokens + cost > Config.GROK_BATCH_MAX_INPUT_TOKENS
+                      or (len(batch) + 1) * OUTPUT_TOKENS_PER_REPORTER > Config.GROK_MAX_OUTPUT_TOKENS):
+            break
+        batch.append(reporter)
+        tokens += cost
+    return batch
+
+def request_batch(batch):
+    """
+    Send one batched extraction request.
+
+    Returns ({reporter_id: data}, truncated). Complete objects are recovered
+    from a truncated/malformed array; reporters still missing fall back to a
+    single call.
+    """
+    client = get_grok_client()
+    completion = create_json_completion(
+        client,
+        [
+            {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+            {"role": "user", "content": build_batch_prompt(batch)}
+        ],
+        max_tokens=min(Config.GROK_MAX_OUTPUT_TOKENS, OUTPUT_TOKENS_PER_REPORTER * len(batch) + 200),
+        reporters=[r['name'] for r in batch]
+    )
+
+    choice = completion.choices[0]
+    truncated = getattr(choice, 'finish_reason', None) == 'length'
+
+    parsed = {}
+    for item in parse_array_response(choice.message.content, REPORTER_SCHEMA, call='reporter_batch'):
+        if item.get('reporter_id') is not None:
+            parsed[str(item.pop('reporter_id'))] = item
+    return parsed, truncated
+
+def extract_batch_with_grok(reporters):
+    """
+    Extract several reporters per Grok request, sharing the instruction block.
+
+    reporters: list of {'key', 'name', 'search_results', 'page_context', 'local_context'}
+    Yields (key, extracted_or_None) in input order. Batches shrink when a
+    response is cut off at max_tokens; reporters missing from a batch
+    response (or the whole batch, if the batched call fails) fall back to
+    extract_with_grok(). Raises ApiError on quota/rate limit.
+    """
+    pending = [
+        dict(r, id=f"r{n}", context=build_reporter_context(r['name'], r['search_results'], r.get('page_context'),
+                                                            local_context=r.get('local_context')))
+        for n, r in enumerate(reporters)
+    ]
+    max_size = max(1, Config.GROK_BATCH_SIZE)
+
+    while pending:
+        batch = take_batch(pending, max_size)
+        pending = pending[len(batch):]
+
+        parsed = {}
+        if len(batch) > 1:
+            print(f"\n  [2] Extracting {len(batch)} reporters in one Grok request...")
+            try:
+                parsed, truncated = request_batch(batch)
+            except ApiError:
+                raise
+            except Exception as e:
+                # Network/SDK failure on the batched call - extract the reporters one by one instead
+                print(f"  [X] Batch extraction error: {e} - extracting individually")
+                parsed, truncated = {}, False
+            if truncated:
+                max_size = max(1, len(batch) // 2)
+                print(f"  [~] Batch response truncated, batch size reduced to {max_size}")
+
+        for reporter in batch:
+            extracted = parsed.get(reporter['id'])
+            if extracted is None:
+                if len(batch) > 1:
+                    print(f"  [~] {reporter['name']} missing from batch response, extracting individually")
+                extracted = extract_with_grok(reporter['name'], reporter['search_results'],
+                                              context=reporter['context'])  # Compacted once, above
+            yield reporter['key'], extracted
+
+def local_stage(first_name, last_name, role=None):
+    """
+    Look the reporter up in journalists.json first. Returns (extracted, local_context):
+    a confident local answer (no API calls needed), or known profiles for the prompt.
+    """
+    match = lookup_reporter(first_name, last_name, role)
+    if not match:
+        return None, None
+    if match['extracted']:
+        print(f"\n  [OK] {first_name} {last_name} matched in journalists.json ({match['confidence']}%) - "
+              f"skipping Google and Grok")
+        return match['extracted'], None
+    print(f"\n  [~] {first_name} {last_name}: {len(match['records'])} possible match(es) in journalists.json "
+          f"({match['confidence']}%) - adding to the prompt")
+    return None, match['context']
+
+def search_stage(row_index, first_name, last_name, role=None, local_context=None):
+    """Search (and optionally enrich) one reporter; returns extraction input or None"""
     full_name_hebrew = f"{first_name} {last_name}"
 
     print(f"\n{'='*70}")
     print(f"Processing #{row_index}: {full_name_hebrew}")
     print('='*70)
 
-    # Search with Hebrew name
-    query = f'"{full_name_hebrew}" Israel journalist reporter media'
+    # Search with several query variants (Hebrew, English, employer, org sites)
     print(f"  [1] Searching Google...")
-    results = search_google(query, num_results=5)
+    results = search_reporter(search_google, first_name, last_name, role=role)
 
     if not results:
         print(f"  [!] No results found")
@@ -148,9 +346,24 @@ def process_reporter(row_index, first_name, last_name):
 
     print(f"  [OK] Found {len(results)} results")
 
-    # Extract with Grok
-    print(f"  [2] Extracting with Grok...")
-    extracted = extract_with_grok(full_name_hebrew, results)
+    # Fetch top result pages for bio/contact details snippets don't include
+    page_context = enrich_results(full_name_hebrew, results) if Config.ENRICH_PAGES else None
+
+    return {'name': full_name_hebrew, 'search_results': results, 'page_context': page_context,
+            'local_context': local_context}
+
+def process_reporter(row_index, first_name, last_name, role=None):
+    """Process a single reporter (answered from journalists.json when the local match is confident)"""
+    extracted, local_context = local_stage(first_name, last_name, role=role)
+    if not extracted:
+        found = search_stage(row_index, first_name, last_name, role=role, local_context=local_context)
+        if not found:
+            return None
+
+        # Extract with Grok
+        print(f"  [2] Extracting with Grok...")
+        extracted = extract_with_grok(found['name'], found['search_results'], page_context=found['page_context'],
+                                      local_context=found['local_context'])
 
     if not extracted:
         print(f"  [!] Extraction failed")
@@ -164,166 +377,248 @@ def process_reporter(row_index, first_name, last_name):
 
     return extracted
 
-def batch_process(num_reporters=5, start_row=2):
+def batch_process(num_reporters=5, start_row=2, prioritize=False, rows=None,
+                  input_path=None, output_path=None, on_event=None):
     """
     Process multiple reporters and update CSV
 
     Args:
         num_reporters: Number of reporters to process
         start_row: Starting row index (2 = first reporter after header)
+        prioritize: Take the highest-priority reporters from the refresh
+            scheduler instead of a contiguous range (start_row is ignored)
+        rows: Explicit DataFrame indices to process (overrides the above)
+        input_path / output_path: CSV to read / write (default DB_SAMPLE_PATH, overwritten in place)
+        on_event: Optional callback(event, **data) for progress (searched,
+            extracted, extraction_failed, stopped, saved, done); called from
+            pipeline worker threads, one event at a time. A row is finished
+            once it is extracted, fails extraction (extraction_failed carries
+            stage/error when a pipeline stage raised) or is searched with
+            results=0 - rows only searched when a stage stopped are not.
     """
+    input_path = Path(input_path or Config.DB_SAMPLE_PATH)
+    output_path = Path(output_path or input_path)
+    emit_lock = threading.Lock()
+
+    def emit(event, **data):
+        # Pipeline stages run on worker threads - deliver events one at a time
+        if on_event:
+            with emit_lock:
+                on_event(event, **data)
+
     print("="*70)
     print("Reporter Database Updater - Batch Processing")
     print("="*70)
-    print(f"Processing {num_reporters} reporters starting from row {start_row}")
+    if rows is not None:
+        print(f"Processing {len(rows)} selected reporters")
+    elif prioritize:
+        print(f"Processing the {num_reporters} highest-priority reporters")
+    else:
+        print(f"Processing {num_reporters} reporters starting from row {start_row}")
+    recorder = start_batch('batch_processor')
 
     # Read CSV
-    print(f"\nReading CSV: {Config.DB_SAMPLE_PATH}")
-    df = pd.read_csv(Config.DB_SAMPLE_PATH, encoding='utf-8')
+    print(f"\nReading CSV: {input_path}")
+    with recorder.span('csv_io'):
+        df = load_reporters(input_path)
 
     print(f"[OK] Loaded {len(df)} reporters")
     print(f"[OK] Columns: {list(df.columns)}")
 
     # Add new columns for tracking
-    if 'confidence_score' not in df.columns:
-        df['confidence_score'] = None
-    if 'last_updated' not in df.columns:
-        df['last_updated'] = None
-    if 'update_notes' not in df.columns:
-        df['update_notes'] = None
-    if 'decision' not in df.columns:
-        df['decision'] = None
-    if 'source_urls' not in df.columns:
-        df['source_urls'] = None
-    if 'search_history' not in df.columns:
-        df['search_history'] = None
+    ensure_tracking_columns(df)
 
     # Process reporters
-    results = []
-    end_row = min(start_row + num_reporters, len(df))
-
-    for i in range(start_row - 1, end_row - 1):  # -1 because pandas is 0-indexed
-        row = df.iloc[i]
-        first_name = row['שם פרטי']
-        last_name = row['שם משפחה']
-
-        # Process reporter
-        extracted = process_reporter(i + 2, first_name, last_name)  # +2 for display (1 for header, 1 for 0-index)
-
-        if extracted:
-            # Update DataFrame
-            confidence = extracted.get('confidence_score', 0)
-            decision = "AUTO-UPDATE" if confidence >= Config.CONFIDENCE_THRESHOLD else "MANUAL REVIEW"
-
-            # Only update if auto-update threshold met
-            if decision == "AUTO-UPDATE":
-                changes = []
-
-                # Update job title/employer (תפקיד column)
-                if extracted.get('job_title') or extracted.get('employer'):
-                    old_val = str(row.get('תפקיד', ''))
-                    employer = extracted.get('employer', '')
-                    job_title = extracted.get('job_title', '')
-
-                    # Combine employer and title
-                    new_val = f"{job_title} @ {employer}" if employer and job_title else (job_title or employer)
-
-                    if old_val != new_val and new_val:
-                        df.at[i, 'תפקיד'] = new_val
-                        changes.append(f"תפקיד: '{old_val}' → '{new_val}'")
-
-                # Update topics (נושאים column)
-                if extracted.get('topics'):
-                    old_val = str(row.get('נושאים', ''))
-                    new_val = extracted['topics']
-                    if old_val != new_val and new_val != 'null':
-                        df.at[i, 'נושאים'] = new_val
-                        changes.append(f"נושאים: '{old_val}' → '{new_val}'")
-
-                # Update email (דוא"ל column)
-                if extracted.get('email'):
-                    old_val = str(row.get('דוא"ל', ''))
-                    new_val = extracted['email']
-                    if old_val != new_val and new_val != 'null':
-                        df.at[i, 'דוא"ל'] = new_val
-                        changes.append(f"דוא\"ל: '{old_val}' → '{new_val}'")
-
-                # Update mobile phone (נייד column)
-                if extracted.get('phone'):
-                    old_val = str(row.get('נייד', ''))
-                    new_val = extracted['phone']
-                    if old_val != new_val and new_val != 'null':
-                        df.at[i, 'נייד'] = new_val
-                        changes.append(f"נייד: '{old_val}' → '{new_val}'")
-
-                if changes:
-                    update_notes = "UPDATED: " + " | ".join(changes)
-                else:
-                    update_notes = f"No changes needed. Verified: {extracted.get('employer', 'N/A')} - {extracted.get('job_title', 'N/A')}"
+    extracted_rows = {}  # Row index -> extraction, applied together after the pipeline
+    scheduler = None
+    if rows is not None:
+        rows = [i for i in rows if 0 <= i < len(df)]
+    elif prioritize:
+        scheduler = RefreshScheduler(input_path)
+        rows = scheduler.next_batch(df, num_reporters)
+    else:
+        end_row = min(start_row + num_reporters, len(df))
+        rows = range(start_row - 1, end_row - 1)  # -1 because pandas is 0-indexed
+
+    # Pipeline: search -> extract -> apply run as overlapping stages with bounded
+    # queues between them (search keeps going while Grok extracts earlier rows).
+    # Rows naming the same person share one search and extraction (src/coalesce.py).
+    people = [(i, df.at[i, 'שם פרטי'], df.at[i, 'שם משפחה'], df.at[i, 'תפקיד'] if 'תפקיד' in df.columns else None)
+              for i in rows]
+    details = {person[0]: person for person in people}
+    inputs = []
+    for key, members in group_rows(people).items():
+        roles = [details[i][3] for i in members if isinstance(details[i][3], str) and details[i][3].strip()]
+        inputs.append((key, members, details[members[0]][1], details[members[0]][2], roles[0] if roles else None))
+    coalescer = get_coalescer()
+    attempted = []
+    completed = []  # Rows extracted, failed or with nothing to extract - the rest go back to the queue
+    followers = []  # (rows, future) for people another batch is already processing
+    owned = set()
+    stopped = set()
+
+    def stop(stage, error, message):
+        # Several workers can hit the same exhausted API - report it once
+        with emit_lock:
+            first = stage not in stopped
+            stopped.add(stage)
+        if first:
+            print(f"\n  [X] {message}: {error}")
+            emit('stopped', stage=stage, api=error.api, error=str(error))
+        pipeline.stop(stage)
+
+    def searched(members, first_name, last_name, results, shared=None):
+        attempted.extend(members)
+        for i in members:
+            emit('searched', row=i + 2, name=f"{first_name} {last_name}", results=results,
+                 **({'shared': shared} if shared else {}))
+
+    def search_step(batch):
+        for key, members, first_name, last_name, role in batch:
+            # Confident journalists.json match: no Google or Grok call at all
+            extracted, local_context = local_stage(first_name, last_name, role=role)
+            if extracted is not None:
+                searched(members, first_name, last_name, None, shared='local')
+                yield {'key': members, 'extracted': extracted}
+                continue
+            extracted = coalescer.recent(key)
+            if extracted is not None:
+                print(f"\n  [~] Reusing a recent extraction for {first_name} {last_name} "
+                      f"(rows {', '.join(str(i + 2) for i in members)})")
+                searched(members, first_name, last_name, None, shared='recent')
+                yield {'key': members, 'extracted': extracted}
+                continue
+            future, owner = coalescer.claim(key)
+            if not owner:
+                print(f"\n  [~] {first_name} {last_name} is already being processed - waiting for that result")
+                searched(members, first_name, last_name, None, shared='inflight')
+                followers.append((members, future))
+                continue
+            owned.add(key)
+
+            if len(members) > 1:
+                get_recorder().incr('coalesced_rows', len(members) - 1)
+                print(f"\n  [~] Rows {', '.join(str(i + 2) for i in members)} are the same person - "
+                      f"sharing one search and extraction")
+            try:
+                found = search_stage(members[0] + 2, first_name, last_name, role=role,  # +2 for display (1 for header, 1 for 0-index)
+                                     local_context=local_context)
+            except ApiError as e:
+                # Quota/budget exhausted or persistently throttled - extract what we have
+                coalescer.resolve(key, error=e)
+                stop('search', e, "Search API unavailable, stopping search")
+                return
+            searched(members, first_name, last_name, len(found['search_results']) if found else 0)
+            if found:
+                found.update(key=members, person=key)
+                yield found
             else:
-                # For manual review, still record what we found
-                found_info = []
-                if extracted.get('employer'):
-                    found_info.append(f"Employer: {extracted['employer']}")
-                if extracted.get('job_title'):
-                    found_info.append(f"Title: {extracted['job_title']}")
-                if extracted.get('email'):
-                    found_info.append(f"Email: {extracted['email']}")
-                if extracted.get('phone'):
-                    found_info.append(f"Phone: {extracted['phone']}")
-                if extracted.get('topics'):
-                    found_info.append(f"Topics: {extracted['topics']}")
-
-                update_notes = f"Low confidence ({confidence}%). Found: " + "; ".join(found_info) if found_info else f"Low confidence. Needs manual verification."
-
-            # Store source URLs
-            source_urls = extracted.get('source_urls', [])
-            df.at[i, 'source_urls'] = "; ".join(source_urls) if source_urls else None
-
-            # Build search history entry
-            timestamp = datetime.now().isoformat()
-            history_entry = f"[{timestamp}] Confidence: {confidence}% | Decision: {decision} | {update_notes}"
-
-            # Append to search history (keep all previous searches)
-            existing_history = df.at[i, 'search_history']
-            if pd.isna(existing_history) or existing_history == '':
-                df.at[i, 'search_history'] = history_entry
+                completed.extend(members)
+                coalescer.resolve(key, None)
+
+    def extract_step(batch):
+        for r in batch:
+            if 'extracted' in r:
+                yield r['key'], r['extracted']
+        todo = [r for r in batch if 'extracted' not in r]
+        person = {tuple(r['key']): r['person'] for r in todo}
+        try:
+            if Config.GROK_BATCH_SIZE > 1:
+                extractions = extract_batch_with_grok(todo)
             else:
-                df.at[i, 'search_history'] = existing_history + " || " + history_entry
-
-            df.at[i, 'confidence_score'] = confidence
-            df.at[i, 'last_updated'] = timestamp
-            df.at[i, 'update_notes'] = update_notes
-            df.at[i, 'decision'] = decision
-
-            results.append({
-                'row': i + 2,
-                'name': f"{first_name} {last_name}",
-                'confidence': confidence,
-                'decision': decision,
-                'extracted': extracted
-            })
-
-        # Rate limiting: 1 second between requests
-        if i < end_row - 2:
-            print(f"\n  [~] Waiting 2 seconds (rate limiting)...")
-            time.sleep(2)
-
-    # Save updated CSV - OVERWRITE the original to keep history in same file
-    output_path = Config.DB_SAMPLE_PATH
-
-    # Also save a timestamped backup
-    backup_path = Config.OUTPUT_PATH / f"backup_reporters_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    Config.OUTPUT_PATH.mkdir(exist_ok=True)
-
-    df.to_csv(output_path, index=False, encoding='utf-8-sig')  # utf-8-sig for Excel compatibility
-    df.to_csv(backup_path, index=False, encoding='utf-8-sig')  # Backup copy
+                extractions = ((r['key'], extract_with_grok(r['name'], r['search_results'],
+                                                            page_context=r['page_context'],
+                                                            local_context=r['local_context'])) for r in todo)
+            for members, extracted in extractions:
+                coalescer.resolve(person[tuple(members)], extracted)
+                yield members, extracted
+        except ApiError as e:
+            # Quota exhausted or persistently throttled - stop and save what we have
+            stop('extract', e, "API unavailable, stopping batch")
+
+    def failed_step(failure):
+        # A stage raised on a batch: its rows count as failed attempts rather than vanishing
+        get_recorder().incr(f'{failure.stage}_failures')
+        for item in failure.items:
+            members = item[1] if failure.stage == 'search' else item['key'] if failure.stage == 'extract' else item[0]
+            for i in members:
+                if i in completed:
+                    continue  # Already yielded before the stage failed
+                completed.append(i)
+                print(f"  [X] {failure.stage} failed for row {i + 2}: {failure.error}")
+                emit('extraction_failed', row=i + 2, stage=failure.stage, error=str(failure.error))
+
+    def apply_step(batch):
+        # Single worker: collects results for one vectorized apply. One extraction fans out to every row of the person.
+        for item in batch:
+            if isinstance(item, StageFailure):
+                failed_step(item)
+                continue
+            members, extracted = item
+            for i in members:
+                completed.append(i)
+                if not extracted:
+                    print(f"  [!] Extraction failed for row {i + 2}")
+                    emit('extraction_failed', row=i + 2)
+                    continue
+                extracted_rows[i] = extracted
+                name = f"{df.at[i, 'שם פרטי']} {df.at[i, 'שם משפחה']}"
+                confidence = confidence_of(extracted)
+                print(f"  [OK] Row {i + 2}: {name} - {confidence}% - {decision_for(confidence)}")
+                emit('extracted', row=i + 2, name=name, confidence=confidence, decision=decision_for(confidence))
+        return ()
+
+    pipeline = Pipeline([
+        Stage('search', search_step, workers=Config.PIPELINE_SEARCH_WORKERS),
+        Stage('extract', extract_step, workers=Config.PIPELINE_EXTRACT_WORKERS,
+              batch_size=max(1, Config.GROK_BATCH_SIZE), batch_wait=Config.PIPELINE_BATCH_WAIT),
+        Stage('apply', apply_step, workers=1),
+    ], queue_size=Config.PIPELINE_QUEUE_SIZE)
+    try:
+        pipeline.run(inputs)
+    finally:
+        # Release anything a stopped stage never got to, so waiting batches don't hang
+        for key in owned:
+            coalescer.resolve(key, None)
+    for failure in pipeline.failures:
+        failed_step(failure)
+    recorder.set_pipeline(pipeline.stats())
+
+    # People another batch was processing: wait only now, after our own work is published
+    for members, future in followers:
+        apply_step([(members, coalescer.wait(future))])
+
+    # Field diffs + threshold policy for every row at once (src/update_engine.py)
+    df, changes, outcomes = apply_updates(df, extracted_rows)
+    results = [{
+        'row': i + 2,
+        'name': f"{df.at[i, 'שם פרטי']} {df.at[i, 'שם משפחה']}",
+        'confidence': int(outcomes.at[i, 'confidence']),
+        'decision': outcomes.at[i, 'decision'],
+        'changes': int(outcomes.at[i, 'changes']),
+        'extracted': extracted_rows[i]
+    } for i in rows if i in outcomes.index]
+    applied = int(changes['applied'].sum())
+
+    # Save updated CSV - OVERWRITE the original (by default) to keep history in same file
+    # (utf-8-sig for Excel; only our rows are merged if another job saved meanwhile,
+    # and the changed rows are recorded as an incremental backup snapshot and in the change feed)
+    with recorder.span('csv_io'):
+        backup = save_reporters(df, output_path, rows=[r['row'] - 2 for r in results], note='batch', changes=changes)
+    metrics = finish_batch(reporters=len(results))
+    if scheduler:
+        scheduler.complete(completed)
+        scheduler.release([i for i in rows if i not in completed])
+    emit('saved', path=str(output_path), backup=backup['id'] if backup else None)
     print(f"\n{'='*70}")
     print("Summary")
     print('='*70)
     print(f"[OK] Processed: {len(results)} reporters")
+    print(f"[OK] Field changes: {applied} applied, {len(changes) - applied} held for manual review")
     print(f"[OK] Updated original CSV: {output_path}")
-    print(f"[OK] Backup saved to: {backup_path}")
+    if backup:
+        print(f"[OK] Backup snapshot: {backup['id']} ({backup['kind']}, {backup['changed']} rows, "
+              f"{backup['bytes'] / 1024:.1f} KB)")
 
     # Display summary
     auto_updates = sum(1 for r in results if r['decision'] == 'AUTO-UPDATE')
@@ -332,10 +627,18 @@ def batch_process(num_reporters=5, start_row=2):
     print(f"\n  Auto-updates: {auto_updates}")
     print(f"  Manual reviews: {manual_reviews}")
 
+    for call, stats in get_parse_stats().items():
+        print(f"  Parse ({call}): {stats['calls']} responses, {stats['repaired']} repaired, "
+              f"{stats['failed']} failed, recovery rate {stats['recovery_rate']:.0%}")
+    print_summary(metrics)
+
     print(f"\nDetailed Results:")
     for r in results:
         print(f"  Row {r['row']}: {r['name']} - {r['confidence']}% - {r['decision']}")
 
+    emit('done', processed=len(results), attempted=len(attempted), completed=len(completed), auto_updates=auto_updates,
+         manual_reviews=manual_reviews, field_changes=applied, metrics=metrics)
+
     return results, output_path
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""
+Daily API budget ledger: per-API caps (Google queries, Grok tokens) reserved
+before each call and persisted in cache/budget_ledger.json so every run -
+app, CLI or scraper - draws from the same daily allowance. Every update is a
+read-modify-write under the file lock, so processes never lose each other's spend.
+"""
+
+import contextlib
+import json
+import threading
+from datetime import datetime
+from typing import Optional
+
+from src.atomic_io import atomic_write_json, file_lock
+from src.config import Config
+from src.rate_limiter import ApiError
+
+
+UNITS = {'google': 'queries', 'grok': 'tokens'}
+KEEP_DAYS = 30
+
+
+class BudgetExceededError(ApiError):
+    """Daily budget used up - the batch pauses until the budget resets"""
+
+
+def budget_day() -> str:
+    """Ledger date in BUDGET_TIMEZONE (Google's quota resets at midnight Pacific)"""
+    try:
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo(Config.BUDGET_TIMEZONE)).date().isoformat()
+    except Exception:
+        return datetime.now().date().isoformat()
+
+
+def daily_limit(api: str) -> int:
+    """Configured cap for an API (0 = unlimited)"""
+    return {'google': Config.GOOGLE_DAILY_QUERY_LIMIT, 'grok': Config.GROK_DAILY_TOKEN_LIMIT}.get(api, 0)
+
+
+class BudgetLedger:
+    """Thread- and process-safe persistent spend counters per day and API"""
+
+    def __init__(self, path=None):
+        self.path = path or Config.CACHE_PATH / 'budget_ledger.json'
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, data: dict):
+        # Keep the last KEEP_DAYS days only
+        atomic_write_json(self.path, dict(sorted(data.items())[-KEEP_DAYS:]), indent=2)
+
+    @contextlib.contextmanager
+    def _today(self):
+        """Today's {api: spent} counters, saved on exit - held under the thread and file locks"""
+        with self._lock, file_lock(self.path):
+            data = self._load()
+            yield data.setdefault(budget_day(), {})
+            self._save(data)
+
+    def spent(self, api: str) -> int:
+        with self._lock:
+            return self._load().get(budget_day(), {}).get(api, 0)
+
+    def remaining(self, api: str) -> Optional[int]:
+        """Units left today (None = unlimited)"""
+        limit = daily_limit(api)
+        return max(0, limit - self.spent(api)) if limit else None
+
+    def level(self, api: str) -> str:
+        """'ok', 'low' (under BUDGET_LOW_FRACTION of the cap) or 'exhausted'"""
+        limit = daily_limit(api)
+        if not limit:
+            return 'ok'
+        left = self.remaining(api)
+        if left <= 0:
+            return 'exhausted'
+        return 'low' if left < limit * Config.BUDGET_LOW_FRACTION else 'ok'
+
+    def is_low(self, api: str) -> bool:
+        return self.level(api) != 'ok'
+
+    def reserve(self, api: str, units: int = 1) -> int:
+        """
+        Charge `units` to today's spend before a call, or raise
+        BudgetExceededError if they would go over the cap. Check and charge are
+        one locked step, so concurrent callers can't both pass and overspend.
+        Returns the reserved units for settle().
+        """
+        units = max(0, int(units))
+        limit = daily_limit(api)
+        with self._today() as day:
+            left = limit - day.get(api, 0) if limit else None
+            if left is not None and units > left:
+                raise BudgetExceededError(api, f"daily budget exhausted ({limit} {UNITS.get(api, 'units')}, "
+                                               f"{max(0, left)} left) - resumes after the daily reset")
+            day[api] = day.get(api, 0) + units
+        return units
+
+    def settle(self, api: str, reserved: int, actual: int):
+        """Replace a reservation by the actual spend (0 refunds a call that failed)"""
+        delta = int(actual) - int(reserved)
+        if delta:
+            with self._today() as day:
+                day[api] = max(0, day.get(api, 0) + delta)
+
+    def status(self) -> dict:
+        """{api: {'spent', 'limit', 'remaining', 'level', 'unit'}} for today"""
+        return {
+            api: {
+                'spent': self.spent(api),
+                'limit': daily_limit(api),
+                'remaining': self.remaining(api),
+                'level': self.level(api),
+                'unit': unit,
+            }
+            for api, unit in UNITS.items()
+        }
+
+
+_ledger = None
+
+
+def get_ledger() -> BudgetLedger:
+    global _ledger
+    if _ledger is None or _ledger.path != Config.CACHE_PATH / 'budget_ledger.json':
+        _ledger = BudgetLedger()
+    return _ledger
@@ -0,0 +1,186 @@
+"""
+Incremental change feed for downstream syncs
+Every apply appends the field diffs it made (and a marker for each processed
+row) to a per-database JSON-lines log under output/changes/. The cursor a
+consumer passes back is a byte offset into that log ('feed:<offset>'):
+appends are serialized by the file lock, so offsets only grow, whatever the
+wall-clock stamps of concurrent writers. An explicit ISO --since still works,
+through a sorted index on last_updated. Rows and diffs stream out in chunks.
+"""
+
+import csv
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.atomic_io import file_lock
+from src.config import Config
+from src.data_store import NAME_COLUMNS, iter_csv_typed, load_reporters
+
+
+FEED_COLUMNS = ['ts', 'row', 'first_name', 'last_name', 'column', 'old', 'new', 'confidence']
+CURSOR_PREFIX = 'feed:'
+
+_index_lock = threading.Lock()
+_indexes = {}
+
+
+def feed_path(db_path) -> Path:
+    db_path = Path(db_path)
+    digest = hashlib.sha1(str(db_path.resolve()).encode('utf-8')).hexdigest()[:8]
+    return Config.OUTPUT_PATH / 'changes' / f"{db_path.stem.replace(' ', '_')}-{digest}.jsonl"
+
+
+def record_changes(db_path, df: pd.DataFrame, changes: pd.DataFrame, rows: Optional[list] = None) -> int:
+    """
+    Append the applied field changes (update engine change log) to the
+    database's feed, plus a row marker (column null) for each of `rows` that
+    had none - so cursors see every processed row. Returns the field-change count.
+    """
+    if not Config.CHANGE_FEED:
+        return 0
+    applied = changes[changes['applied']] if not changes.empty else changes
+    marked = sorted(set(rows or []) - set(applied['row'].tolist() if not applied.empty else []))
+    if applied.empty and not marked:
+        return 0
+    entries = [(int(c.row), c.column, c.old or None, c.new, int(c.confidence)) for c in applied.itertuples(index=False)]
+    entries += [(int(row), None, None, None, None) for row in marked]
+    positions = [entry[0] for entry in entries]
+    names = [df[c].reindex(positions).to_numpy(dtype=object) if c in df.columns else [None] * len(positions)
+             for c in NAME_COLUMNS]
+    stamps = df['last_updated'].reindex(positions).to_numpy(dtype=object)
+    lines = []
+    for n, (row, column, old, new, confidence) in enumerate(entries):
+        entry = dict(zip(FEED_COLUMNS, (stamps[n], row + 2, names[0][n], names[1][n], column, old, new, confidence)))
+        lines.append(json.dumps({k: (None if pd.isna(v) else v) for k, v in entry.items()}, ensure_ascii=False))
+
+    path = feed_path(db_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(path):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+    return len(applied)
+
+
+def parse_cursor(value: Optional[str]) -> Optional[int]:
+    """Feed offset of a 'feed:<offset>' cursor, None for anything else (e.g. an ISO timestamp)"""
+    if value and value.startswith(CURSOR_PREFIX) and value[len(CURSOR_PREFIX):].isdigit():
+        return int(value[len(CURSOR_PREFIX):])
+    return None
+
+
+def feed_end(db_path) -> int:
+    """Current end of the feed (taken under the lock, so it never falls inside a half-written append)"""
+    path = feed_path(db_path)
+    if not path.exists():
+        return 0
+    with file_lock(path):
+        return path.stat().st_size
+
+
+def _iter_entries(db_path, start: int = 0, end: Optional[int] = None):
+    """Feed entries between byte offsets start and end (a start past the end of a reset feed reads it all)"""
+    path = feed_path(db_path)
+    if not path.exists():
+        return
+    end = path.stat().st_size if end is None else end
+    with open(path, 'rb') as f:
+        f.seek(start if start <= end else 0)
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                yield json.loads(line)
+
+
+def _updated_index(db_path) -> tuple:
+    """(sorted last_updated values, CSV positions in that order), rebuilt when the CSV changes"""
+    path = Path(db_path).resolve()
+    stat = path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _index_lock:
+        cached = _indexes.get(path)
+        if cached is None or cached[0] != signature:
+            stamps = load_reporters(path, columns=['last_updated'])['last_updated'].to_numpy(dtype=object)
+            stamps = np.where(pd.notna(stamps), stamps, '').astype(str)
+            order = np.argsort(stamps, kind='stable')
+            cached = _indexes[path] = (signature, stamps[order], order)
+        return cached[1], cached[2]
+
+
+def changed_rows(db_path, since: Optional[str] = None) -> tuple:
+    """
+    (CSV positions changed after `since` - a feed cursor or an ISO time - in
+    file order; next cursor). Every updated row without `since`.
+    """
+    end = feed_end(db_path)  # Taken first: anything saved meanwhile is picked up by the next call
+    offset = parse_cursor(since)
+    if offset is not None:
+        rows = {entry['row'] - 2 for entry in _iter_entries(db_path, offset, end)}
+        return np.array(sorted(rows), dtype=np.int64), f"{CURSOR_PREFIX}{end}"
+    stamps, order = _updated_index(db_path)
+    start = np.searchsorted(stamps, since or '', side='right')
+    if Config.CHANGE_FEED:
+        cursor = f"{CURSOR_PREFIX}{end}"
+    else:
+        cursor = stamps[-1] if len(stamps) and stamps[-1] else since  # No feed to anchor a cursor to
+    return np.sort(order[start:]), cursor
+
+
+def iter_rows(db_path, positions: Optional[np.ndarray] = None, decision: Optional[str] = None):
+    """The database in typed chunks, limited to `positions` and/or a decision"""
+    for chunk in iter_csv_typed(db_path):
+        if positions is not None:
+            chunk = chunk[np.isin(chunk.index.to_numpy(), positions)]
+        if decision:
+            chunk = chunk[chunk['decision'] == decision] if 'decision' in chunk.columns else chunk.iloc[0:0]
+        yield chunk
+
+
+def iter_field_changes(db_path, since: Optional[str] = None, end: Optional[int] = None):
+    """
+    Applied field changes after `since` (feed cursor: read from its offset;
+    ISO time: every entry stamped later), in feed order, one dict at a time
+    """
+    offset = parse_cursor(since)
+    for entry in _iter_entries(db_path, offset or 0, end):
+        if entry.get('column') is None:
+            continue  # Row marker
+        if offset is None and since and (entry.get('ts') or '') <= since:
+            continue
+        yield entry
+
+
+def write_rows(chunks, target, fmt: str = 'csv') -> int:
+    """Stream row chunks to target as CSV (one header) or JSON lines; returns the row count"""
+    count = 0
+    for n, chunk in enumerate(chunks):
+        if fmt == 'csv':
+            chunk.to_csv(target, index=False, header=n == 0)
+        else:
+            for record in chunk.to_dict('records'):
+                clean = {k: (None if pd.isna(v) else v) for k, v in record.items()}
+                target.write(json.dumps(clean, ensure_ascii=False, default=str) + '\n')
+        count += len(chunk)
+    return count
+
+
+def write_changes(entries, target, fmt: str = 'jsonl') -> int:
+    """Stream field changes to target; returns the change count"""
+    writer = csv.DictWriter(target, fieldnames=FEED_COLUMNS, extrasaction='ignore') if fmt == 'csv' else None
+    if writer:
+        writer.writeheader()
+    count = 0
+    for entry in entries:
+        if writer:
+            writer.writerow(entry)
+        else:
+            target.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        count += 1
+    return count
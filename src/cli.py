@@ -0,0 +1,420 @@
+"""
+Headless command-line interface for the reporter updater (no Streamlit)
+Progress is written to stdout as JSON lines; pipeline chatter goes to stderr
+
+Usage:
+    python -m src.cli run --rows 20                  # highest-priority 20 reporters
+    python -m src.cli run --start-row 2 --rows 50 --range --threshold 80
+    python -m src.cli resume                         # continue the last paused/interrupted run
+    python -m src.cli status [--json]
+    python -m src.cli export --decision "MANUAL REVIEW" --format jsonl -o review.jsonl
+    python -m src.cli export --cursor-file sync.cursor --changes --format jsonl   # changes since the last sync
+    python -m src.cli backups
+    python -m src.cli restore --at 2026-01-31T18:00     # or: restore <snapshot id>
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.atomic_io import atomic_copy, atomic_write_json
+from src.config import Config
+
+# Exit code for "paused, try again later" (budget/quota) - EX_TEMPFAIL for cron wrappers
+EXIT_PAUSED = 75
+
+RUNS_DIR = 'runs'
+
+
+def emit(stream, event: str, **data):
+    """Write one JSON-lines progress event"""
+    record = {'ts': datetime.now().isoformat(timespec='seconds'), 'event': event, **data}
+    stream.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+    stream.flush()
+
+
+def runs_dir() -> Path:
+    return Config.CACHE_PATH / RUNS_DIR
+
+
+def save_run(state: dict):
+    atomic_write_json(runs_dir() / f"{state['id']}.json", state, ensure_ascii=False, indent=2)
+
+
+def load_run(run_id=None):
+    """A run by id, or the most recent unfinished one"""
+    if not runs_dir().exists():
+        return None
+    if run_id:
+        path = runs_dir() / f"{run_id}.json"
+        return json.loads(path.read_text(encoding='utf-8')) if path.exists() else None
+    runs = sorted(runs_dir().glob('*.json'), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in runs:
+        state = json.loads(path.read_text(encoding='utf-8'))
+        if state['status'] != 'complete':
+            return state
+    return None
+
+
+def apply_settings(settings: dict):
+    """Override Config from CLI options (threshold, concurrency, batch size, pipeline workers)"""
+    if settings.get('threshold') is not None:
+        Config.CONFIDENCE_THRESHOLD = settings['threshold']
+    if settings.get('concurrency') is not None:
+        Config.SEARCH_CONCURRENCY = settings['concurrency']
+        Config.ENRICH_CONCURRENCY = settings['concurrency']
+    if settings.get('batch_size') is not None:
+        Config.GROK_BATCH_SIZE = settings['batch_size']
+    if settings.get('search_workers') is not None:
+        Config.PIPELINE_SEARCH_WORKERS = settings['search_workers']
+    if settings.get('extract_workers') is not None:
+        Config.PIPELINE_EXTRACT_WORKERS = settings['extract_workers']
+    if settings.get('no_enrich'):
+        Config.ENRICH_PAGES = False
+
+
+@contextlib.contextmanager
+def pipeline_output(verbose: bool):
+    """Send the pipeline's print() progress to stderr (or drop it) so stdout stays JSON lines"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(sys.stderr if verbose else devnull):
+        yield
+
+
+def plan_rows(args, input_path: Path) -> list:
+    """Row indices to process: priority queue (leased) or a contiguous range"""
+    from src.data_store import load_reporters
+
+    df = load_reporters(input_path, view='scheduler')
+    if args.range:
+        first = max(0, args.start_row - 2)  # CSV line 2 = first reporter (index 0)
+        return list(range(first, min(first + args.rows, len(df))))
+
+    from src.scheduler import RefreshScheduler
+    return RefreshScheduler(input_path).next_batch(df, args.rows)
+
+
+def execute(state: dict, args, out) -> int:
+    """Process the run's pending rows in checkpointed chunks; returns the exit code"""
+    from src.batch_processor import batch_process
+    from src.scheduler import RefreshScheduler
+
+    apply_settings(state['settings'])
+    db_path = Path(state['database'])
+    pending = [i for i in state['rows'] if i not in set(state['done'])]
+    chunk_size = max(1, state['settings'].get('checkpoint') or len(pending) or 1)
+
+    emit(out, 'run_started', run_id=state['id'], pending=len(pending), total=len(state['rows']),
+         database=str(db_path))
+    state['status'] = 'running'
+    save_run(state)
+
+    stopped = None
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        finished = []
+
+        def on_event(event, **data):
+            nonlocal stopped
+            # Done once extracted (or failed, or nothing found) - a row that was only
+            # searched before a stage stopped stays pending for resume
+            if event in ('extracted', 'extraction_failed') or (event == 'searched' and data.get('results') == 0):
+                finished.append(data['row'] - 2)
+            elif event == 'stopped':
+                stopped = data
+            if event != 'done':
+                emit(out, event, run_id=state['id'], **data)
+
+        with pipeline_output(args.verbose):
+            batch_process(rows=chunk, input_path=db_path, on_event=on_event)
+
+        state['done'].extend(finished)
+        save_run(state)
+        if state['settings'].get('prioritize'):
+            RefreshScheduler(db_path).complete(finished)
+
+        emit(out, 'checkpoint', run_id=state['id'], done=len(state['done']), total=len(state['rows']))
+        if stopped:
+            break
+
+    remaining = [i for i in state['rows'] if i not in set(state['done'])]
+    if stopped or remaining:
+        if state['settings'].get('prioritize'):
+            RefreshScheduler(db_path).release(remaining)
+        state['status'] = 'paused'
+        save_run(state)
+        emit(out, 'run_paused', run_id=state['id'], remaining=len(remaining),
+             reason=(stopped or {}).get('error', 'interrupted'))
+        return EXIT_PAUSED
+
+    state['status'] = 'complete'
+    state['finished'] = datetime.now().isoformat()
+    save_run(state)
+    emit(out, 'run_complete', run_id=state['id'], processed=len(state['done']))
+    return 0
+
+
+def cmd_run(args, out) -> int:
+    input_path = Path(args.input or Config.DB_SAMPLE_PATH)
+    if not input_path.exists():
+        emit(out, 'error', error=f"input not found: {input_path}")
+        return 1
+    output_path = Path(args.output or input_path)
+    if output_path != input_path and not args.dry_run:
+        # Work on a copy so the input is never modified
+        atomic_copy(input_path, output_path)
+    working_path = input_path if args.dry_run else output_path
+
+    state = {
+        'id': datetime.now().strftime('%Y%m%d_%H%M%S_') + uuid.uuid4().hex[:4],
+        'created': datetime.now().isoformat(),
+        'status': 'planned',
+        'database': str(working_path),
+        'rows': plan_rows(args, working_path),
+        'done': [],
+        'settings': {
+            'prioritize': not args.range,
+            'threshold': args.threshold,
+            'concurrency': args.concurrency,
+            'batch_size': args.batch_size,
+            'search_workers': args.search_workers,
+            'extract_workers': args.extract_workers,
+            'checkpoint': args.checkpoint,
+            'no_enrich': args.no_enrich,
+        },
+    }
+    if args.dry_run:
+        emit(out, 'plan', rows=[i + 2 for i in state['rows']])
+        if state['settings']['prioritize']:
+            from src.scheduler import RefreshScheduler
+            RefreshScheduler(working_path).release(state['rows'])
+        return 0
+
+    save_run(state)
+    return execute(state, args, out)
+
+
+def cmd_resume(args, out) -> int:
+    state = load_run(args.run_id)
+    if not state:
+        emit(out, 'error', error='no unfinished run to resume')
+        return 1
+    if state['status'] == 'complete':
+        emit(out, 'run_complete', run_id=state['id'], processed=len(state['done']))
+        return 0
+    return execute(state, args, out)
+
+
+def cmd_status(args, out) -> int:
+    from src.budget import get_ledger
+    from src.contacts import duplicate_contacts
+    from src.data_store import load_reporters
+    from src.metrics import load_metrics
+    from src.scheduler import RefreshScheduler
+
+    db_path = Path(args.input or Config.DB_SAMPLE_PATH)
+    df = load_reporters(db_path, view='scheduler')
+    decisions = df['decision'].value_counts().to_dict() if 'decision' in df.columns else {}
+    processed = int(df['confidence_score'].notna().sum()) if 'confidence_score' in df.columns else 0
+    last_run = load_run()
+    metrics = load_metrics(limit=1)
+    unfinished = None
+    if last_run:
+        unfinished = {'id': last_run['id'], 'status': last_run['status'], 'created': last_run['created'],
+                      'done': len(last_run['done']), 'total': len(last_run['rows'])}
+    shared = duplicate_contacts(df)
+    shared = [{'contact': contact, 'kind': group['kind'].iloc[0], 'rows': [int(r) + 2 for r in group['row']]}
+              for contact, group in shared.groupby(level=0, sort=False)]
+
+    status = {
+        'database': str(db_path),
+        'reporters': len(df),
+        'processed': processed,
+        'auto_updates': int(decisions.get('AUTO-UPDATE', 0)),
+        'manual_reviews': int(decisions.get('MANUAL REVIEW', 0)),
+        'budget': get_ledger().status(),
+        'next_up': RefreshScheduler(db_path).preview(df, n=args.top).to_dict('records'),
+        'unfinished_run': unfinished,
+        'last_batch': metrics[-1] if metrics else None,
+        'shared_contacts': shared,
+    }
+
+    if args.json:
+        out.write(json.dumps(status, ensure_ascii=False, default=str, indent=2) + '\n')
+        return 0
+
+    print(f"Database: {status['database']}")
+    print(f"  Reporters: {status['reporters']}  Processed: {processed}  "
+          f"Auto-updates: {status['auto_updates']}  Manual reviews: {status['manual_reviews']}")
+    for api, budget in status['budget'].items():
+        left = f"{budget['remaining']:,}/{budget['limit']:,}" if budget['limit'] else 'unlimited'
+        print(f"  Budget {api}: {left} {budget['unit']} left today ({budget['level']})")
+    if status['unfinished_run']:
+        run = status['unfinished_run']
+        print(f"  Unfinished run {run['id']}: {run['status']}, {run['done']}/{run['total']} rows")
+    if status['last_batch']:
+        batch = status['last_batch']
+        print(f"  Last batch {batch['batch_id']}: {batch['reporters']} reporters in {batch['elapsed_s']}s, "
+              f"{batch['tokens']['total']} tokens")
+    if shared:
+        print(f"  Shared contacts: {len(shared)} emails/mobiles listed on more than one reporter")
+        for entry in shared[:5]:
+            print(f"    {entry['contact']}: rows {', '.join(map(str, entry['rows']))}")
+    print("  Next up:")
+    for entry in status['next_up']:
+        print(f"    Row {entry['row']}: {entry['name']} ({entry['score']}) - {entry['reasons']}")
+    return 0
+
+
+def cmd_export(args, out) -> int:
+    from src.atomic_io import atomic_write
+    from src.change_feed import (CURSOR_PREFIX, changed_rows, feed_end, iter_field_changes, iter_rows, parse_cursor,
+                                 write_changes, write_rows)
+
+    db_path = Path(args.input or Config.DB_SAMPLE_PATH)
+    since = args.since
+    if not since and args.cursor_file and Path(args.cursor_file).exists():
+        since = Path(args.cursor_file).read_text(encoding='utf-8').strip() or None
+    if since and parse_cursor(since) is None:
+        try:
+            since = datetime.fromisoformat(since).isoformat()
+        except ValueError:
+            emit(out, 'error', error=f"not a cursor or ISO timestamp: {since}")
+            return 1
+
+    target = open(args.output, 'w', encoding='utf-8-sig' if args.format == 'csv' else 'utf-8', newline='') \
+        if args.output else out
+    try:
+        if args.changes:
+            end = feed_end(db_path)
+            count = write_changes(iter_field_changes(db_path, since, end), target, args.format)
+            cursor = f"{CURSOR_PREFIX}{end}"
+        elif since or not Config.CHANGE_FEED:
+            # Streamed in EXPORT_CHUNK_ROWS chunks; with a cursor only rows updated after it
+            positions, cursor = changed_rows(db_path, since)
+            count = write_rows(iter_rows(db_path, positions if since else None, args.decision), target, args.format)
+        else:
+            # Full export: no need to look up changed rows, the next cursor is just the feed's current end
+            cursor = f"{CURSOR_PREFIX}{feed_end(db_path)}"
+            count = write_rows(iter_rows(db_path, None, args.decision), target, args.format)
+    finally:
+        if args.output:
+            target.close()
+    if args.cursor_file and cursor:
+        with atomic_write(Path(args.cursor_file)) as f:
+            f.write(cursor + '\n')
+    if args.output:
+        what = 'field changes' if args.changes else 'reporters'
+        print(f"[OK] Exported {count} {what} to {args.output}", file=sys.stderr)
+    if cursor:
+        print(f"[OK] Next cursor: {cursor}", file=sys.stderr)
+    return 0
+
+
+def cmd_backups(args, out) -> int:
+    from src.backups import load_manifest, store_size_mb
+
+    db_path = Path(args.input or Config.DB_SAMPLE_PATH)
+    entries = load_manifest(db_path)[-args.limit:]
+    if args.json:
+        for entry in entries:
+            emit(out, 'snapshot', **{k: v for k, v in entry.items() if k not in ('columns', 'fingerprint')})
+        return 0
+    print(f"Backups of {db_path} ({store_size_mb(db_path):.2f} MB):")
+    for entry in entries:
+        print(f"  {entry['id']}  {entry['created'][:19]}  {entry['kind']:<5}  {entry['changed']:>5} rows  "
+              f"{entry['bytes'] / 1024:>7.1f} KB  {entry.get('note', '')}")
+    return 0
+
+
+def cmd_restore(args, out) -> int:
+    from src.backups import find_snapshot, restore_snapshot
+    from src.data_store import save_reporters
+
+    db_path = Path(args.input or Config.DB_SAMPLE_PATH)
+    at = datetime.fromisoformat(args.at) if args.at else None
+    entry = find_snapshot(db_path, snapshot_id=args.snapshot, at=at)
+    if not entry:
+        emit(out, 'error', error=f"no matching snapshot for {db_path}")
+        return 1
+    df = restore_snapshot(db_path, entry['id'])
+    target = Path(args.output) if args.output else db_path
+    with contextlib.redirect_stdout(sys.stderr):
+        save_reporters(df, target, note=f"restore {entry['id']}")
+    emit(out, 'restored', snapshot=entry['id'], created=entry['created'], rows=len(df), path=str(target))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m src.cli', description="Reporter database updater (headless)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='Process reporters and update the CSV')
+    run.add_argument('-i', '--input', help='Reporter CSV (default: DB_SAMPLE_PATH)')
+    run.add_argument('-o', '--output', help='Write results here instead of updating the input in place')
+    run.add_argument('--rows', type=int, default=Config.BATCH_SIZE, help='Number of reporters to process')
+    run.add_argument('--range', action='store_true', help='Process a contiguous range instead of priority order')
+    run.add_argument('--start-row', type=int, default=2, help='First CSV row with --range (2 = first reporter)')
+    run.add_argument('--threshold', type=int, help='Confidence threshold for auto-update (default: CONFIDENCE_THRESHOLD)')
+    run.add_argument('--concurrency', type=int, help='Concurrent searches / page fetches per reporter')
+    run.add_argument('--batch-size', type=int, help='Reporters per Grok request (1 = no batching)')
+    run.add_argument('--search-workers', type=int, help='Pipeline search workers (default: PIPELINE_SEARCH_WORKERS)')
+    run.add_argument('--extract-workers', type=int, help='Pipeline Grok workers (default: PIPELINE_EXTRACT_WORKERS)')
+    run.add_argument('--checkpoint', type=int, default=10, help='Save and checkpoint every N reporters')
+    run.add_argument('--no-enrich', action='store_true', help='Skip fetching result pages')
+    run.add_argument('--dry-run', action='store_true', help='Print the planned rows and exit')
+
+    resume = sub.add_parser('resume', help='Continue a paused or interrupted run')
+    resume.add_argument('run_id', nargs='?', help='Run id (default: most recent unfinished run)')
+
+    status = sub.add_parser('status', help='Database, budget and queue status')
+    status.add_argument('-i', '--input', help='Reporter CSV (default: DB_SAMPLE_PATH)')
+    status.add_argument('--top', type=int, default=5, help='Show the next N reporters in the queue')
+    status.add_argument('--json', action='store_true', help='Print status as JSON')
+
+    export = sub.add_parser('export', help='Export reporters as CSV or JSON lines')
+    export.add_argument('-i', '--input', help='Reporter CSV (default: DB_SAMPLE_PATH)')
+    export.add_argument('-o', '--output', help='Output file (default: stdout)')
+    export.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    export.add_argument('--decision', choices=['AUTO-UPDATE', 'MANUAL REVIEW'], help='Only rows with this decision')
+    export.add_argument('--since', help='Only rows updated after this ISO time or cursor')
+    export.add_argument('--cursor-file', help='Read --since from this file and store the next cursor in it')
+    export.add_argument('--changes', action='store_true', help='Export field changes (old -> new) instead of rows')
+
+    backups = sub.add_parser('backups', help='List backup snapshots')
+    backups.add_argument('-i', '--input', help='Reporter CSV (default: DB_SAMPLE_PATH)')
+    backups.add_argument('--limit', type=int, default=20, help='Show the last N snapshots')
+    backups.add_argument('--json', action='store_true', help='Print snapshots as JSON lines')
+
+    restore = sub.add_parser('restore', help='Restore the database from a backup snapshot')
+    restore.add_argument('snapshot', nargs='?', help='Snapshot id or unique prefix (default: latest)')
+    restore.add_argument('--at', help='Latest snapshot at or before this ISO time, e.g. 2026-01-31T18:00')
+    restore.add_argument('-i', '--input', help='Reporter CSV (default: DB_SAMPLE_PATH)')
+    restore.add_argument('-o', '--output', help='Write the restored CSV here instead of over the input')
+
+    for sub_parser in (run, resume):
+        sub_parser.add_argument('-v', '--verbose', action='store_true', help='Echo pipeline output to stderr')
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    out = sys.stdout
+    commands = {'run': cmd_run, 'resume': cmd_resume, 'status': cmd_status, 'export': cmd_export,
+                'backups': cmd_backups, 'restore': cmd_restore}
+    try:
+        return commands[args.command](args, out)
+    except KeyboardInterrupt:
+        emit(out, 'interrupted')
+        return EXIT_PAUSED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Request coalescing for duplicate reporters
+Rows that name the same person (normalize_name) share one search and one
+extraction: within a batch they are grouped, concurrent batches in the same
+process wait on the in-flight request, and results stay reusable across
+batches for COALESCE_TTL_HOURS via cache/people/
+"""
+
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from src.atomic_io import atomic_write_json
+from src.config import Config
+from src.metrics import get_recorder
+from src.search_strategy import normalize_name
+
+
+def person_key(first_name, last_name) -> str:
+    return normalize_name(first_name, last_name)
+
+
+def group_rows(people: list) -> dict:
+    """{person key: [rows]} from (row, first_name, last_name, ...) tuples, in first-seen order"""
+    groups = {}
+    for row, first_name, last_name, *_ in people:
+        key = person_key(first_name, last_name) or f"row:{row}"  # Nameless rows are never merged
+        groups.setdefault(key, []).append(row)
+    return groups
+
+
+def _result_path(key: str):
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return Config.CACHE_PATH / 'people' / digest[:2] / f"{digest}.json"
+
+
+class Coalescer:
+    """In-flight registry (one owner per person, others wait) plus the recent-results store"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def recent(self, key: str) -> Optional[dict]:
+        """Extraction for this person from the last COALESCE_TTL_HOURS, if any"""
+        if not Config.COALESCE_TTL_HOURS:
+            return None
+        path = _result_path(key)
+        try:
+            if time.time() - path.stat().st_mtime > Config.COALESCE_TTL_HOURS * 3600:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('key') != key:
+            return None
+        get_recorder().incr('coalesced_recent')
+        return entry['extracted']
+
+    def remember(self, key: str, extracted: dict):
+        if Config.COALESCE_TTL_HOURS and extracted:
+            atomic_write_json(_result_path(key), {'key': key, 'extracted': extracted}, ensure_ascii=False)
+
+    def claim(self, key: str) -> tuple:
+        """(future, is_owner) - the owner must resolve() the key; others wait on the future"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                get_recorder().incr('coalesced_inflight')
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def resolve(self, key: str, extracted: Optional[dict] = None, error: Optional[BaseException] = None):
+        """Publish the owner's result (or error) to waiters and the recent-results store"""
+        with self._lock:
+            future = self._inflight.pop(key, None)
+        if future is None:
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            self.remember(key, extracted)
+            future.set_result(extracted)
+
+    def wait(self, future: Future) -> Optional[dict]:
+        """Result of another batch's in-flight request (None if it failed or took too long)"""
+        try:
+            return future.result(timeout=Config.COALESCE_WAIT_SECONDS)
+        except Exception:
+            return None
+
+
+_coalescer = Coalescer()
+
+
+def get_coalescer() -> Coalescer:
+    return _coalescer
@@ -18,9 +18,14 @@ class Config:
     GROK_API_KEY = os.getenv('GROK_API_KEY')
     GROK_BASE_URL = os.getenv('GROK_BASE_URL', 'https://api.x.ai/v1')
     GROK_MODEL = os.getenv('GROK_MODEL', 'grok-beta')
+    GROK_BATCH_SIZE = int(os.getenv('GROK_BATCH_SIZE', 5))  # Reporters per extraction request (1 = no batching)
+    GROK_BATCH_MAX_INPUT_TOKENS = int(os.getenv('GROK_BATCH_MAX_INPUT_TOKENS', 24000))
+    GROK_MAX_OUTPUT_TOKENS = int(os.getenv('GROK_MAX_OUTPUT_TOKENS', 4000))
+    GROK_JSON_MODE = os.getenv('GROK_JSON_MODE', 'true').lower() == 'true'  # Use response_format when supported
 
     GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
     GOOGLE_SEARCH_ENGINE_ID = os.getenv('GOOGLE_SEARCH_ENGINE_ID')
+    GOOGLE_API_ENDPOINT = os.getenv('GOOGLE_API_ENDPOINT')  # Override (e.g. local benchmark stub)
 
     # Project Settings
     BATCH_SIZE = int(os.getenv('BATCH_SIZE', 50))
@@ -28,12 +33,85 @@ class Config:
     OUTPUT_FOLDER = os.getenv('OUTPUT_FOLDER', 'output')
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
+    # Rate Limiting (requests/second ceilings - adapted down on 429s)
+    GOOGLE_MAX_RPS = float(os.getenv('GOOGLE_MAX_RPS', 1.0))
+    GROK_MAX_RPS = float(os.getenv('GROK_MAX_RPS', 2.0))
+    API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', 5))
+
+    # Daily Budget (0 = unlimited; shared by app, CLI and scraper)
+    GOOGLE_DAILY_QUERY_LIMIT = int(os.getenv('GOOGLE_DAILY_QUERY_LIMIT', 100))  # Custom Search free tier
+    GROK_DAILY_TOKEN_LIMIT = int(os.getenv('GROK_DAILY_TOKEN_LIMIT', 1000000))
+    BUDGET_LOW_FRACTION = float(os.getenv('BUDGET_LOW_FRACTION', 0.2))  # Degrade below this share of the cap
+    BUDGET_TIMEZONE = os.getenv('BUDGET_TIMEZONE', 'America/Los_Angeles')  # Google resets quota at midnight PT
+    SEARCH_CACHE_TTL_HOURS = int(os.getenv('SEARCH_CACHE_TTL_HOURS', 24))  # Any age is served when budget is low
+
+    # Search Strategy (query fan-out per reporter)
+    SEARCH_MAX_VARIANTS = int(os.getenv('SEARCH_MAX_VARIANTS', 4))
+    SEARCH_CONCURRENCY = int(os.getenv('SEARCH_CONCURRENCY', 2))
+    SEARCH_MIN_GOOD_RESULTS = int(os.getenv('SEARCH_MIN_GOOD_RESULTS', 3))
+    SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 8))
+
+    # Batch Pipeline (search -> extract -> apply stages overlap; the apply stage is single-threaded)
+    PIPELINE_SEARCH_WORKERS = int(os.getenv('PIPELINE_SEARCH_WORKERS', 2))
+    PIPELINE_EXTRACT_WORKERS = int(os.getenv('PIPELINE_EXTRACT_WORKERS', 1))
+    PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 10))  # Bound between stages (backpressure)
+    PIPELINE_BATCH_WAIT = float(os.getenv('PIPELINE_BATCH_WAIT', 1.0))  # Seconds to fill a Grok batch
+
+    # Request Coalescing (rows naming the same person share one search + extraction)
+    COALESCE_TTL_HOURS = int(os.getenv('COALESCE_TTL_HOURS', 24))  # Reuse a person's extraction this long (0 = off)
+    COALESCE_WAIT_SECONDS = int(os.getenv('COALESCE_WAIT_SECONDS', 300))  # Max wait on another batch's request
+
+    # Local Lookup (answer from data/journalists.json before calling Google/Grok)
+    LOCAL_LOOKUP = os.getenv('LOCAL_LOOKUP', 'true').lower() == 'true'
+    LOCAL_MATCH_THRESHOLD = int(os.getenv('LOCAL_MATCH_THRESHOLD', 85))  # Below this a match only enriches the prompt
+
+    # Page Enrichment (fetch top hits for bio/contact text)
+    ENRICH_PAGES = os.getenv('ENRICH_PAGES', 'true').lower() == 'true'
+    ENRICH_TOP_N = int(os.getenv('ENRICH_TOP_N', 3))
+    ENRICH_CONCURRENCY = int(os.getenv('ENRICH_CONCURRENCY', 4))
+    ENRICH_TIMEOUT = float(os.getenv('ENRICH_TIMEOUT', 8))
+    ENRICH_MAX_CHARS = int(os.getenv('ENRICH_MAX_CHARS', 1500))
+    PAGE_CACHE_TTL_HOURS = int(os.getenv('PAGE_CACHE_TTL_HOURS', 168))
+
+    # Prompt Compaction (per-reporter context sent to Grok)
+    PROMPT_COMPACTION = os.getenv('PROMPT_COMPACTION', 'true').lower() == 'true'
+    PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', 1500))  # Estimated tokens per reporter context
+    PROMPT_DEDUPE_THRESHOLD = float(os.getenv('PROMPT_DEDUPE_THRESHOLD', 0.8))  # Snippet similarity (0-1)
+
+    # Refresh Scheduler (which reporters to process next)
+    SCHEDULER_STALE_DAYS = int(os.getenv('SCHEDULER_STALE_DAYS', 90))  # Age at which a record counts as fully stale
+    SCHEDULER_LEASE_MINUTES = int(os.getenv('SCHEDULER_LEASE_MINUTES', 60))  # Hold handed-out rows this long
+
+    # Scraper Crawl (pages followed per organization from its staff page / website)
+    CRAWL_MAX_PAGES = int(os.getenv('CRAWL_MAX_PAGES', 25))
+    CRAWL_MAX_DEPTH = int(os.getenv('CRAWL_MAX_DEPTH', 3))  # Link hops from the start pages
+    CRAWL_DELAY = float(os.getenv('CRAWL_DELAY', 1.0))  # Seconds between page fetches on one site
+    CRAWL_ARCHIVE = os.getenv('CRAWL_ARCHIVE', 'true').lower() == 'true'  # Keep fetched pages in output/crawl_archive/
+    CRAWL_REPLAY = os.getenv('CRAWL_REPLAY', 'false').lower() == 'true'  # Crawl from the archive only
+    CRAWL_ARCHIVE_KEEP_DAYS = int(os.getenv('CRAWL_ARCHIVE_KEEP_DAYS', 90))  # Superseded page copies older than this are pruned
+
+    # Data Store
+    CSV_SNAPSHOTS = os.getenv('CSV_SNAPSHOTS', 'true').lower() == 'true'  # Read via a Parquet snapshot of the CSV
+    FILE_LOCK_TIMEOUT = float(os.getenv('FILE_LOCK_TIMEOUT', 30))  # Seconds to wait for another writer
+
+    # Backups (incremental snapshots under output/backups/)
+    BACKUPS = os.getenv('BACKUPS', 'true').lower() == 'true'
+    BACKUP_FULL_EVERY = int(os.getenv('BACKUP_FULL_EVERY', 25))  # Full checkpoint every N snapshots
+    BACKUP_KEEP_DAYS = int(os.getenv('BACKUP_KEEP_DAYS', 30))
+    BACKUP_KEEP_MIN = int(os.getenv('BACKUP_KEEP_MIN', 10))  # Never prune below this many snapshots
+
+    # Change Feed (applied field changes under output/changes/, streamed by `cli export --since`)
+    CHANGE_FEED = os.getenv('CHANGE_FEED', 'true').lower() == 'true'
+    EXPORT_CHUNK_ROWS = int(os.getenv('EXPORT_CHUNK_ROWS', 1000))  # Rows held in memory while exporting
+
     # Paths
     PROJECT_ROOT = Path(__file__).parent.parent
     DB_SAMPLE_PATH = PROJECT_ROOT / 'DB-Sample' / 'Sample list.csv'
     OUTPUT_PATH = PROJECT_ROOT / OUTPUT_FOLDER
     LOGS_PATH = PROJECT_ROOT / 'logs'
     CACHE_PATH = PROJECT_ROOT / 'cache'
+    JOURNALISTS_PATH = PROJECT_ROOT / 'data' / 'journalists.json'
+    ORGANIZATIONS_PATH = PROJECT_ROOT / 'data' / 'media_organizations.json'
 
     @classmethod
     def validate(cls):
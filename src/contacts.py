@@ -0,0 +1,82 @@
+"""
+Contact normalization for emails and Israeli phone numbers
+Whole columns are canonicalized with vectorized string operations: phones to
+E.164 (+972...), emails lowercased and validated. Diffs compare canonical
+values, so a reformatted number is not a change, and contact_index() maps
+every canonical contact in the CSV to its rows for duplicate detection.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data_store import string_dtype
+
+
+# Israeli national significant numbers: landlines 2/3/4/8/9 + 7 digits, mobile/VoIP 5x/7x + 7 digits
+NATIONAL_RE = r'[23489]\d{7}|[57]\d{8}'
+EMAIL_RE = r"[a-z0-9!#$%&'*+/=?^_`{|}~.-]+@[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}"
+
+# Reporter columns holding contacts (זימונית holds pager codes, not phone numbers)
+EMAIL_COLUMNS = ['דוא"ל']
+PHONE_COLUMNS = ['טלפון', 'נייד', 'פקס']
+
+
+def _text(values) -> pd.Series:
+    values = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    return values.astype(object).where(values.notna()).astype(string_dtype())
+
+
+def normalize_phones(values) -> pd.Series:
+    """E.164 (+972XXXXXXXXX) for valid Israeli numbers, NaN otherwise - keeps the input's index"""
+    first = _text(values).str.replace(r'[,;|].*$', '', regex=True)  # Several numbers in a cell: the first
+    digits = first.str.replace(r'\D', '', regex=True).str.replace(r'^00', '', regex=True)
+    national = digits.str.replace(r'^9720?(?=\d{8,9}$)', '', regex=True).str.replace(r'^0', '', regex=True)
+    return ('+972' + national).where(national.str.fullmatch(NATIONAL_RE).fillna(False).astype(bool))
+
+
+def normalize_emails(values) -> pd.Series:
+    """Lowercased, trimmed addresses (mailto:/brackets removed), NaN where not a valid address"""
+    text = _text(values).str.strip().str.lower().str.replace(r'^mailto:', '', regex=True).str.strip(' <>.,;')
+    return text.where(text.str.fullmatch(EMAIL_RE).fillna(False).astype(bool))
+
+
+def phone_kind(canonical: pd.Series) -> pd.Series:
+    """'mobile' for +9725x numbers, 'landline' for the rest"""
+    mobile = canonical.str.startswith('+9725').fillna(False).astype(bool)
+    return pd.Series(np.where(mobile, 'mobile', 'landline'), index=canonical.index)
+
+
+def normalize_column(column: str, values) -> pd.Series:
+    """Canonical form for a reporter contact column (values unchanged for other columns)"""
+    if column in EMAIL_COLUMNS:
+        return normalize_emails(values)
+    if column in PHONE_COLUMNS:
+        return normalize_phones(values)
+    return values
+
+
+def contact_index(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per canonical contact in the CSV: contact (index, sorted), kind
+    (email/mobile/landline), column and row. `index.loc[contact]` finds every
+    reporter holding it.
+    """
+    parts = []
+    for column in EMAIL_COLUMNS + PHONE_COLUMNS:
+        if column not in df.columns:
+            continue
+        canonical = normalize_column(column, df[column]).dropna()
+        kind = 'email' if column in EMAIL_COLUMNS else phone_kind(canonical).to_numpy()
+        parts.append(pd.DataFrame({'contact': canonical.to_numpy(dtype=object), 'kind': kind, 'column': column,
+                                   'row': canonical.index}))
+    if not parts:
+        return pd.DataFrame(columns=['kind', 'column', 'row'], index=pd.Index([], name='contact'))
+    index = pd.concat(parts, ignore_index=True).drop_duplicates(['contact', 'row'])
+    return index.sort_values(['contact', 'row']).set_index('contact')
+
+
+def duplicate_contacts(df: pd.DataFrame, kinds=('email', 'mobile'), index=None) -> pd.DataFrame:
+    """Contacts held by more than one reporter (shared office landlines are excluded by default)"""
+    index = contact_index(df) if index is None else index
+    index = index[index['kind'].isin(kinds)]
+    return index[index.index.duplicated(keep=False)]
@@ -0,0 +1,147 @@
+"""
+Local crawl archive for the staff scraper
+Every fetched page is appended to output/crawl_archive/<org>.warc.gz as a WARC
+'resource' record (raw HTML) and a 'conversion' record (the markdown sent to
+Grok), each its own gzip member, and indexed by URL in <org>.index.jsonl.
+A page whose content is unchanged since its last copy is not appended again,
+and superseded copies older than CRAWL_ARCHIVE_KEEP_DAYS are pruned.
+Replay (CRAWL_REPLAY / --replay) serves the crawl from the archive instead of
+the network, so extraction runs are reproducible and cost no fetches.
+"""
+
+import gzip
+import hashlib
+import json
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from src.atomic_io import atomic_write, file_lock
+from src.config import Config
+
+
+def archive_dir() -> Path:
+    return Config.OUTPUT_PATH / 'crawl_archive'
+
+
+def _warc_record(warc_type: str, url: str, date: str, content_type: str, payload: bytes,
+                 refers_to: Optional[str] = None) -> tuple:
+    """(record bytes, record id) for one WARC/1.1 record"""
+    record_id = f"<urn:uuid:{uuid.uuid4()}>"
+    headers = ['WARC/1.1', f"WARC-Type: {warc_type}", f"WARC-Record-ID: {record_id}", f"WARC-Date: {date}",
+               f"WARC-Target-URI: {url}"]
+    if refers_to:
+        headers.append(f"WARC-Refers-To: {refers_to}")
+    headers += [f"Content-Type: {content_type}", f"Content-Length: {len(payload)}"]
+    return '\r\n'.join(headers).encode('utf-8') + b'\r\n\r\n' + payload + b'\r\n\r\n', record_id
+
+
+def _parse_records(data: bytes) -> dict:
+    """{WARC-Type: payload text} for the records in data"""
+    records, position = {}, 0
+    while position < len(data):
+        end = data.index(b'\r\n\r\n', position)
+        headers = dict(line.split(': ', 1) for line in data[position:end].decode('utf-8').split('\r\n')[1:])
+        start = end + 4
+        length = int(headers['Content-Length'])
+        records[headers['WARC-Type']] = data[start:start + length].decode('utf-8')
+        position = start + length + 4
+    return records
+
+
+def content_digest(html: str, markdown: str) -> str:
+    digest = hashlib.sha1((html or '').encode('utf-8'))
+    digest.update(b'\0' + (markdown or '').encode('utf-8'))
+    return digest.hexdigest()
+
+
+class CrawlArchive:
+    """One organization's archived pages: append-only .warc.gz plus a URL -> (offset, length) index"""
+
+    def __init__(self, name: str):
+        safe = re.sub(r'[^\w.-]+', '_', name)
+        self.path = archive_dir() / f"{safe}.warc.gz"
+        self.index_path = archive_dir() / f"{safe}.index.jsonl"
+        self._index = None
+
+    def _entries(self) -> list:
+        """Every index entry, oldest first (superseded copies included)"""
+        if not self.index_path.exists():
+            return []
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def index(self) -> dict:
+        """{url: latest index entry}"""
+        if self._index is None:
+            self._index = {entry['url']: entry for entry in self._entries()}
+        return self._index
+
+    def add(self, url: str, html: str, markdown: str) -> dict:
+        """Append a page (HTML + markdown) and index it; returns the index entry (the existing one if unchanged)"""
+        digest = content_digest(html, markdown)
+        latest = self.index().get(url)
+        if latest is not None and latest.get('digest') == digest:
+            return latest
+        date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        resource, record_id = _warc_record('resource', url, date, 'text/html; charset=utf-8',
+                                           (html or '').encode('utf-8'))
+        conversion, _ = _warc_record('conversion', url, date, 'text/markdown; charset=utf-8',
+                                     (markdown or '').encode('utf-8'), refers_to=record_id)
+        data = gzip.compress(resource, mtime=0) + gzip.compress(conversion, mtime=0)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.path):
+            with open(self.path, 'ab') as f:
+                offset = f.tell()
+                f.write(data)
+            entry = {'url': url, 'date': date, 'offset': offset, 'length': len(data), 'digest': digest}
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.index()[url] = entry
+        return entry
+
+    def get(self, url: str) -> tuple:
+        """(markdown, html) of the latest archived copy of url, (None, None) if it was never archived"""
+        entry = self.index().get(url)
+        if entry is None:
+            return None, None
+        with open(self.path, 'rb') as f:
+            f.seek(entry['offset'])
+            records = _parse_records(gzip.decompress(f.read(entry['length'])))
+        return records.get('conversion'), records.get('resource')
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """
+        Drop superseded copies older than CRAWL_ARCHIVE_KEEP_DAYS (the latest
+        copy of every URL is always kept, so replay is unaffected) by rewriting
+        the archive and its index. Returns the number of copies dropped.
+        """
+        if not self.path.exists():
+            return 0
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=Config.CRAWL_ARCHIVE_KEEP_DAYS)
+        cutoff = cutoff.strftime('%Y-%m-%dT%H:%M:%SZ')  # Same format as the entries' dates
+        with file_lock(self.path):
+            entries = self._entries()
+            latest = {entry['url']: entry for entry in entries}
+            kept = [entry for entry in entries if latest[entry['url']] is entry or entry['date'] >= cutoff]
+            if len(kept) == len(entries):
+                return 0
+            with open(self.path, 'rb') as source, atomic_write(self.path, 'wb') as target:
+                for entry in kept:
+                    source.seek(entry['offset'])
+                    data = source.read(entry['length'])
+                    entry['offset'] = target.tell()
+                    target.write(data)
+            with atomic_write(self.index_path) as f:
+                for entry in kept:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._index = None
+        dropped = len(entries) - len(kept)
+        print(f"  [~] Pruned {dropped} archived page copies older than {Config.CRAWL_ARCHIVE_KEEP_DAYS} days")
+        return dropped
+
+    def __len__(self) -> int:
+        return len(self.index())
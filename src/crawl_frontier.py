@@ -0,0 +1,157 @@
+"""
+Crawl frontier for organization staff directories
+Links found on fetched pages are normalized, kept to the organization's own
+site, de-duplicated through a compact seen-set of URL digests and queued by how
+much they look like author/staff pages, within CRAWL_MAX_DEPTH and
+CRAWL_MAX_PAGES.
+"""
+
+import hashlib
+import heapq
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from src.config import Config
+
+
+# Author/staff hints in a URL path and in link text
+STAFF_PATH_RE = re.compile(r'author|writer|staff|team|reporter|journalist|contributor|columnist|people|about|'
+                           r'editorial|desk|kotvim|tsevet', re.I)
+STAFF_TEXT_RE = re.compile(r'כותב|כתב(?!ה|ות)|צוות|מערכת|עיתונא|אודות|בעלי טור|'  # כתבה/כתבות are articles
+                           r'author|writer|staff|team|reporter|about', re.I)
+PAGINATION_RE = re.compile(r'[?&](?:page|p|pg)=\d+|/page/\d+|/p/\d+|[-_]page[-_]?\d+', re.I)
+ARTICLE_RE = re.compile(r'/articles?/|/\d{4}/\d{1,2}/|\d{6,}')
+SKIP_EXT_RE = re.compile(r'\.(?:jpe?g|png|gif|webp|svg|ico|css|js|json|xml|rss|pdf|zip|mp[34]|m4a|avi|mov|woff2?)$',
+                         re.I)
+TRACKING_PARAMS = re.compile(r'^(?:utm_\w+|fbclid|gclid|ref|share|cmpid|ocid)$', re.I)
+
+STAFF_SCORE = 2  # Pages at or above this are extracted, the rest only feed links
+START_SCORE = 10
+
+
+def normalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """Absolute http(s) URL without fragment, tracking parameters, default port or index file; None if unusable"""
+    url = urljoin(base, url.strip()) if base else url.strip()
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if parts.port and parts.port != {'http': 80, 'https': 443}[parts.scheme]:
+        host = f"{host}:{parts.port}"
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    path = re.sub(r'/index\.(?:html?|php|aspx?)$', '/', path, flags=re.I)
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    return urlunsplit((parts.scheme, host, path, query, ''))
+
+
+def site_of(url: str) -> str:
+    """Host without 'www.' - www.example.co.il and example.co.il are one site"""
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def link_score(url: str, text: str = '', parent_score: int = 0) -> int:
+    """How much a link looks like an author/staff page (pagination of a staff index counts as one)"""
+    parts = urlsplit(url)
+    path = f"{parts.path}?{parts.query}"
+    score = 0
+    if STAFF_PATH_RE.search(path):
+        score += 3
+    if text and STAFF_TEXT_RE.search(text):
+        score += 2
+    if PAGINATION_RE.search(path) and parent_score >= STAFF_SCORE:
+        score += 3
+    if ARTICLE_RE.search(path):
+        score -= 2
+    return score
+
+
+def extract_links(html: str, base_url: str) -> list:
+    """[(normalized url, link text)] for the page's <a href> links, in page order"""
+    from bs4 import BeautifulSoup
+
+    links = []
+    for a in BeautifulSoup(html, 'lxml').find_all('a', href=True):
+        href = a['href']
+        if href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+            continue
+        url = normalize_url(href, base_url)
+        if url and not SKIP_EXT_RE.search(urlsplit(url).path):
+            links.append((url, a.get_text(' ', strip=True)))
+    return links
+
+
+class SeenSet:
+    """URLs already queued, kept as 8-byte digests instead of strings"""
+
+    def __init__(self):
+        self._digests = set()
+
+    @staticmethod
+    def _digest(url: str) -> int:
+        return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def add(self, url: str) -> bool:
+        """True if url is new (and now recorded)"""
+        digest = self._digest(url)
+        if digest in self._digests:
+            return False
+        self._digests.add(digest)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return self._digest(url) in self._digests
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+
+class CrawlFrontier:
+    """
+    Priority queue of same-site URLs: highest link score (less one per level of
+    depth) first, then shallower, then discovery order. The first start URL is
+    the entry page and is always extracted; further start URLs (e.g. the home
+    page) are crawled for links only.
+    """
+
+    def __init__(self, start_urls: list, max_pages: Optional[int] = None, max_depth: Optional[int] = None):
+        self.max_pages = Config.CRAWL_MAX_PAGES if max_pages is None else max_pages
+        self.max_depth = Config.CRAWL_MAX_DEPTH if max_depth is None else max_depth
+        self.seen = SeenSet()
+        self.popped = 0
+        self._heap = []
+        self._order = 0
+        starts = [normalize_url(url) for url in start_urls if url]
+        starts = [url for url in starts if url]
+        self.sites = {site_of(url) for url in starts}
+        for n, url in enumerate(starts):
+            self.push(url, depth=0, score=START_SCORE if n == 0 else STAFF_SCORE - 1)
+
+    def allowed(self, url: str) -> bool:
+        site = site_of(url)
+        return any(site == root or site.endswith('.' + root) for root in self.sites)
+
+    def push(self, url: str, depth: int, score: int) -> bool:
+        if depth > self.max_depth or not self.allowed(url) or not self.seen.add(url):
+            return False
+        heapq.heappush(self._heap, (-(score - depth), depth, self._order, url, score))
+        self._order += 1
+        return True
+
+    def add_links(self, html: str, base_url: str, depth: int, parent_score: int) -> int:
+        """Queue the page's links one level deeper; returns how many were new"""
+        return sum(self.push(url, depth + 1, link_score(url, text, parent_score))
+                   for url, text in extract_links(html, base_url))
+
+    def pop(self) -> Optional[tuple]:
+        """(url, depth, score) of the next page, or None when empty or CRAWL_MAX_PAGES were handed out"""
+        if not self._heap or self.popped >= self.max_pages:
+            return None
+        _, depth, _, url, score = heapq.heappop(self._heap)
+        self.popped += 1
+        return url, depth, score
+
+    def __len__(self) -> int:
+        return len(self._heap)
@@ -0,0 +1,312 @@
+"""
+Typed loading of the reporter CSV
+Explicit dtypes (Arrow-backed strings, categorical decision, nullable int
+confidence) and per-view column projection keep each session's DataFrame small.
+The CSV stays the master file (Excel needs UTF-8-BOM); internal reads go
+through a Parquet snapshot under cache/snapshots/ that is rebuilt when the
+CSV's mtime/size and content hash no longer match. Saves are atomic and
+locked, back up the changed rows, and a save that only touched some rows
+merges them into whatever another writer saved in the meantime.
+"""
+
+import hashlib
+import importlib.util
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.atomic_io import atomic_write, file_lock
+from src.config import Config
+
+
+NAME_COLUMNS = ['שם פרטי', 'שם משפחה']
+CONTACT_COLUMNS = ['דוא"ל', 'טלפון', 'נייד', 'פקס', 'זימונית']
+TRACKING_COLUMNS = ['confidence_score', 'last_updated', 'update_notes', 'decision', 'source_urls', 'search_history']
+
+DECISIONS = ['AUTO-UPDATE', 'MANUAL REVIEW']
+
+# Columns each view actually reads (None = all columns)
+VIEW_COLUMNS = {
+    'sidebar': ['confidence_score'],
+    'statistics': ['confidence_score', 'decision'],
+    'scheduler': NAME_COLUMNS + ['דוא"ל', 'טלפון', 'נייד', 'confidence_score', 'last_updated', 'decision'],
+    'history': NAME_COLUMNS + ['confidence_score', 'decision', 'last_updated', 'search_history', 'source_urls'],
+    'review': None,  # The review download exports every column
+    'database': None,
+    'process': None,
+}
+
+
+def string_dtype():
+    """Arrow-backed strings when pyarrow is installed, with NaN for missing values like object columns"""
+    try:
+        import pyarrow  # noqa: F401
+        storage = 'pyarrow'
+    except ImportError:
+        storage = 'python'
+    try:
+        return pd.StringDtype(storage, na_value=np.nan)
+    except TypeError:  # pandas < 2.3 has no na_value
+        return pd.StringDtype(storage)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast known columns in place: confidence -> Int16, decision -> category, everything else -> string"""
+    text = string_dtype()
+    for column in df.columns:
+        if column == 'confidence_score':
+            df[column] = pd.to_numeric(df[column], errors='coerce').round().astype('Int16')
+        elif column == 'decision':
+            observed = [v for v in df[column].dropna().unique() if v not in DECISIONS]
+            df[column] = df[column].astype(pd.CategoricalDtype(DECISIONS + sorted(map(str, observed))))
+        elif df[column].dtype != text:
+            df[column] = df[column].astype(text)
+    return df
+
+
+def ensure_tracking_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the update-tracking columns if the CSV doesn't have them yet (typed like loaded ones)"""
+    missing = [c for c in TRACKING_COLUMNS if c not in df.columns]
+    for column in missing:
+        df[column] = None
+    if missing:
+        apply_schema(df)
+    return df
+
+
+def set_cell(df: pd.DataFrame, index, column: str, value):
+    """df.at[index, column] = value, coerced to the column's typed dtype (LLM output may be int/float/list)"""
+    if value is None or (not isinstance(value, (list, tuple)) and pd.isna(value)):
+        df.at[index, column] = None
+        return
+    dtype = df[column].dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        if value not in dtype.categories:
+            df[column] = df[column].cat.add_categories([value])
+    elif pd.api.types.is_integer_dtype(dtype):
+        value = int(round(float(value)))
+    elif isinstance(dtype, pd.StringDtype):
+        value = ', '.join(map(str, value)) if isinstance(value, (list, tuple)) else str(value)
+    df.at[index, column] = value
+
+
+def read_csv_typed(path, columns: Optional[list] = None) -> pd.DataFrame:
+    """Parse the CSV (path or uploaded file) straight into the typed schema"""
+    wanted = set(columns) if columns is not None else None
+    df = pd.read_csv(
+        Path(path) if not hasattr(path, 'read') else path,
+        encoding='utf-8',
+        usecols=(lambda c: c in wanted) if wanted is not None else None,
+        dtype=str,
+        keep_default_na=True,
+    )
+    return apply_schema(df)
+
+
+def iter_csv_typed(path, chunksize: Optional[int] = None):
+    """The CSV as typed chunks of `chunksize` rows (indices continue across chunks) - constant-memory reads"""
+    with pd.read_csv(Path(path), encoding='utf-8', dtype=str, keep_default_na=True,
+                     chunksize=chunksize or Config.EXPORT_CHUNK_ROWS) as reader:
+        for chunk in reader:
+            yield apply_schema(chunk)
+
+
+def snapshot_path(csv_path) -> Path:
+    digest = hashlib.sha1(str(Path(csv_path).resolve()).encode('utf-8')).hexdigest()[:12]
+    return Config.CACHE_PATH / 'snapshots' / f"{digest}.parquet"
+
+
+def file_sha256(path) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _csv_signature(csv_path, sha256: Optional[str] = None) -> dict:
+    stat = Path(csv_path).stat()
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': sha256 or file_sha256(csv_path)}
+
+
+def _snapshot_source(snap: Path) -> Optional[dict]:
+    """The CSV signature stored in the snapshot's Parquet metadata (None if unreadable)"""
+    import pyarrow.parquet as pq
+    try:
+        metadata = pq.read_schema(snap).metadata or {}
+        return json.loads(metadata[b'scoop_source'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def write_snapshot(df: pd.DataFrame, csv_path, signature: Optional[dict] = None) -> Path:
+    """Atomically write the Parquet snapshot of df, stamped with the CSV's signature"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    snap = snapshot_path(csv_path)
+    snap.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    source = json.dumps(signature or _csv_signature(csv_path))
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'scoop_source': source.encode('utf-8')})
+    with atomic_write(snap, 'wb') as f:
+        pq.write_table(table, f)
+    return snap
+
+
+def fresh_snapshot(csv_path) -> Optional[Path]:
+    """
+    Snapshot for csv_path, rebuilt if stale. mtime/size decide the fast path;
+    when they differ the content hash decides (a touched or copied CSV with the
+    same bytes only gets its stamp updated).
+    """
+    snap = snapshot_path(csv_path)
+    stat = Path(csv_path).stat()
+    source = _snapshot_source(snap) if snap.exists() else None
+    if source and source['mtime_ns'] == stat.st_mtime_ns and source['size'] == stat.st_size:
+        return snap
+
+    sha256 = file_sha256(csv_path)
+    if source and source['sha256'] == sha256:
+        import pyarrow.parquet as pq
+        df = pq.read_table(snap).to_pandas()
+    else:
+        df = read_csv_typed(csv_path)
+    write_snapshot(df, csv_path, _csv_signature(csv_path, sha256))
+    return snap
+
+
+def load_reporters(path, columns: Optional[list] = None, view: Optional[str] = None,
+                   snapshot: Optional[bool] = None) -> pd.DataFrame:
+    """
+    Read the reporter database with the typed schema. `columns` (or a `view`
+    name from VIEW_COLUMNS) limits the read to those columns; missing ones are
+    skipped. Paths are served from the Parquet snapshot when CSV_SNAPSHOTS is on
+    and pyarrow is installed; uploaded files are always parsed as CSV.
+    """
+    if view is not None:
+        columns = VIEW_COLUMNS[view]
+    use_snapshot = Config.CSV_SNAPSHOTS if snapshot is None else snapshot
+    if hasattr(path, 'read'):
+        return read_csv_typed(path, columns)
+
+    signature = _file_signature(path)
+    if not use_snapshot or importlib.util.find_spec('pyarrow') is None:
+        df = read_csv_typed(path, columns)
+    else:
+        import pyarrow.parquet as pq
+        snap = fresh_snapshot(path)
+        if columns is not None:
+            available = set(pq.read_schema(snap).names)
+            columns = [c for c in columns if c in available]
+        df = apply_schema(pq.read_table(snap, columns=columns).to_pandas())
+    # save_reporters compares this to decide whether another writer got in first
+    df.attrs['source'] = {'path': str(Path(path).resolve()), 'signature': signature}
+    return df
+
+
+def _file_signature(path) -> list:
+    stat = Path(path).stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _changed_since_load(df: pd.DataFrame, path: Path) -> bool:
+    source = df.attrs.get('source')
+    if not source or source['path'] != str(path.resolve()):
+        return False  # Not loaded from this file - the caller owns it
+    return path.exists() and _file_signature(path) != source['signature']
+
+
+def _row_key(df: pd.DataFrame, index) -> tuple:
+    return tuple(str(df.at[index, c]) for c in NAME_COLUMNS if c in df.columns)
+
+
+def merge_rows(current: pd.DataFrame, ours: pd.DataFrame, rows: list) -> tuple:
+    """
+    Copy `rows` of ours onto the on-disk frame. Rows are matched by index when
+    the name still agrees, otherwise by a unique first+last name; rows that
+    can't be matched are skipped. Returns (merged, {our index: merged index}, skipped).
+    """
+    for column in ours.columns:
+        if column not in current.columns:
+            current[column] = None
+    apply_schema(current)
+
+    by_name = {}
+    for index in current.index:
+        by_name.setdefault(_row_key(current, index), []).append(index)
+
+    targets, skipped = {}, []
+    for index in rows:
+        key = _row_key(ours, index)
+        if index in current.index and _row_key(current, index) == key:
+            target = index
+        elif len(by_name.get(key, [])) == 1:
+            target = by_name[key][0]
+        else:
+            skipped.append(index)
+            continue
+        for column in ours.columns:
+            set_cell(current, target, column, ours.at[index, column])
+        targets[index] = target
+    return current, targets, skipped
+
+
+def save_reporters(df: pd.DataFrame, path, rows: Optional[list] = None, note: str = '',
+                   changes: Optional[pd.DataFrame] = None) -> Optional[dict]:
+    """
+    Write the master CSV (UTF-8-BOM for Excel) atomically under the file lock,
+    refresh its snapshot so the next read doesn't re-parse the CSV, and record
+    an incremental backup (see src/backups.py).
+
+    With `rows` (the indices this job changed), a CSV that another writer
+    saved since df was loaded is re-read and only those rows are merged into
+    it, so concurrent jobs on disjoint rows both keep their work. With
+    `changes` (the update engine's change log for those rows) the saved rows
+    and diffs are appended to the change feed (src/change_feed.py) at the
+    positions they were written to.
+    Returns the backup manifest entry (None when BACKUPS is off).
+    """
+    path = Path(path)
+    source = df.attrs.get('source') or {}
+    base = source.get('signature') if source.get('path') == str(path.resolve()) else None
+    targets = None
+    with file_lock(path):
+        if rows is not None and _changed_since_load(df, path):
+            current = load_reporters(path)
+            current, targets, skipped = merge_rows(current, df, rows)
+            print(f"  [~] {path.name} changed since it was loaded - merged {len(targets)} row(s) into the latest version")
+            if skipped:
+                print(f"  [!] {len(skipped)} row(s) no longer match a reporter and were not saved: "
+                      f"{', '.join(str(i + 2) for i in skipped)}")
+            df, base = current, None
+            rows = [targets[i] for i in rows if i in targets]  # Positions in the merged frame
+
+        with atomic_write(path, encoding='utf-8-sig', newline='') as f:
+            df.to_csv(f, index=False)
+
+        # What re-parsing the CSV would give: typed columns, '' -> missing
+        saved = apply_schema(df.copy())
+        for column in saved.columns:
+            if isinstance(saved[column].dtype, pd.StringDtype):
+                saved[column] = saved[column].mask(saved[column] == '')
+        if Config.CSV_SNAPSHOTS and importlib.util.find_spec('pyarrow') is not None:
+            write_snapshot(saved, path)
+        backup = None
+        if Config.BACKUPS:
+            from src.backups import record_snapshot
+            backup = record_snapshot(saved, path, changed=rows, base=base, note=note)
+        if changes is not None:
+            from src.change_feed import record_changes
+            if targets is not None and not changes.empty:
+                changes = changes[changes['row'].isin(list(targets))].assign(row=lambda c: c['row'].map(targets))
+            record_changes(path, df, changes, rows=rows)
+    df.attrs['source'] = {'path': str(path.resolve()), 'signature': _file_signature(path)}
+    return backup
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
@@ -0,0 +1,192 @@
+"""
+Page enrichment: fetch the top search hits and pull out author-bio / contact regions
+Google snippets rarely contain email or phone - the pages themselves often do
+"""
+
+import contextvars
+import gzip
+import hashlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional
+
+from src.config import Config
+from src.metrics import get_recorder
+from src.budget import get_ledger
+from src.search_strategy import transliterate_hebrew, has_hebrew
+
+
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+PHONE_RE = re.compile(r'(?:\+972|0)[\s-]?\d{1,2}[\s-]?\d{3}[\s-]?\d{4}')
+REGION_HINT_RE = re.compile(r'author|byline|bio|contact|writer|staff|profile|about|kotev|reporter', re.I)
+
+MAX_PAGE_BYTES = 2_000_000
+USER_AGENT = 'Mozilla/5.0 (compatible; ReporterDBUpdater/0.1)'
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Shared requests session with a connection pool sized for ENRICH_CONCURRENCY"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=Config.ENRICH_CONCURRENCY * 2,
+                                  pool_maxsize=Config.ENRICH_CONCURRENCY * 2)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+            _session.headers['User-Agent'] = USER_AGENT
+        return _session
+
+
+def _cache_file(url: str):
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return Config.CACHE_PATH / 'pages' / digest[:2] / f"{digest}.html.gz"
+
+
+def read_cached_page(url: str, max_age_hours: Optional[float] = None) -> Optional[str]:
+    """Return cached HTML for a URL if present and younger than max_age_hours (default PAGE_CACHE_TTL_HOURS)"""
+    if max_age_hours is None:
+        max_age_hours = Config.PAGE_CACHE_TTL_HOURS
+    if max_age_hours <= 0:
+        return None
+    path = _cache_file(url)
+    try:
+        if time.time() - path.stat().st_mtime > max_age_hours * 3600:
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def write_cached_page(url: str, html: str):
+    path = _cache_file(url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f'.{threading.get_ident()}.tmp')
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        f.write(html)
+    tmp.replace(path)
+
+
+def fetch_page(url: str, max_age_hours: Optional[float] = None) -> Optional[str]:
+    """Fetch one page (disk cache first, unless max_age_hours=0); returns HTML or None"""
+    html = read_cached_page(url, max_age_hours)
+    if html is not None:
+        get_recorder().incr('page_cache_hits')
+        return html
+    get_recorder().incr('page_fetches')
+
+    try:
+        response = get_session().get(url, timeout=(3, Config.ENRICH_TIMEOUT), stream=True)
+        content_type = response.headers.get('Content-Type', 'text/html').lower()
+        if response.status_code != 200 or 'html' not in content_type:
+            response.close()
+            return None
+        body = response.raw.read(MAX_PAGE_BYTES, decode_content=True)
+        response.close()
+        # requests defaults to latin-1 without a charset, which mangles Hebrew
+        encoding = response.encoding if 'charset' in content_type else 'utf-8'
+        html = body.decode(encoding or 'utf-8', errors='replace')
+    except Exception as e:
+        print(f"  [!] Fetch failed {url}: {e}")
+        return None
+
+    write_cached_page(url, html)
+    return html
+
+
+def extract_contact_regions(html: str, name_forms: list, max_chars: int) -> str:
+    """Condense a page to author-bio / contact regions and lines mentioning the reporter"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'lxml')
+    for tag in soup(['script', 'style', 'noscript', 'svg', 'iframe']):
+        tag.decompose()
+
+    pieces = []
+
+    # Elements that look like author / contact boxes
+    for el in soup.find_all(attrs={'class': REGION_HINT_RE}) + soup.find_all(attrs={'id': REGION_HINT_RE}):
+        pieces.append(el.get_text(' ', strip=True))
+
+    # mailto/tel links
+    for a in soup.find_all('a', href=True):
+        href = a['href']
+        if href.startswith(('mailto:', 'tel:')):
+            pieces.append(href.split(':', 1)[1])
+
+    # Text blocks mentioning the reporter or containing contact details
+    lowered_forms = [f.lower() for f in name_forms if f]
+    for el in soup.find_all(['p', 'li', 'span', 'div', 'td']):
+        if el.find(['p', 'div', 'li']):
+            continue  # Only leaf-ish blocks
+        text = el.get_text(' ', strip=True)
+        if not text or len(text) > 600:
+            continue
+        lowered = text.lower()
+        if any(form in lowered for form in lowered_forms) or EMAIL_RE.search(text) or PHONE_RE.search(text):
+            pieces.append(text)
+
+    seen = set()
+    condensed = []
+    total = 0
+    for piece in pieces:
+        piece = re.sub(r'\s+', ' ', piece).strip()[:600]
+        if not piece or piece in seen:
+            continue
+        seen.add(piece)
+        condensed.append(piece)
+        total += len(piece)
+        if total >= max_chars:
+            break
+
+    return '\n'.join(condensed)[:max_chars]
+
+
+def enrich_results(reporter_name: str, search_results: list, top_n: Optional[int] = None) -> str:
+    """
+    Fetch the top-N result pages concurrently and return condensed page text
+    for the extraction prompt. Bounded by ENRICH_CONCURRENCY and ENRICH_TIMEOUT;
+    pages that don't finish in time are skipped. Skipped entirely while the
+    Grok token budget is low, since page text is the largest part of a prompt.
+    """
+    if get_ledger().is_low('grok'):
+        print("  [!] Grok budget low, skipping page enrichment")
+        return ''
+    top_n = top_n or Config.ENRICH_TOP_N
+    urls = [r['link'] for r in search_results[:top_n] if r.get('link', '').startswith('http')]
+    if not urls:
+        return ''
+
+    name_forms = [reporter_name, reporter_name.split()[-1] if reporter_name.split() else '']
+    if has_hebrew(reporter_name):
+        name_forms.append(transliterate_hebrew(reporter_name))
+
+    with get_recorder().span('enrich'):
+        pool = ThreadPoolExecutor(max_workers=Config.ENRICH_CONCURRENCY)
+        futures = {pool.submit(contextvars.copy_context().run, fetch_page, url): url for url in urls}
+        done, _ = wait(futures, timeout=Config.ENRICH_TIMEOUT + 3)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        sections = []
+        for future, url in futures.items():
+            if future not in done:
+                continue
+            html = future.result()
+            if not html:
+                continue
+            text = extract_contact_regions(html, name_forms, Config.ENRICH_MAX_CHARS)
+            if text:
+                sections.append(f"[{url}]\n{text}")
+
+    if sections:
+        print(f"  [OK] Enriched with {len(sections)}/{len(urls)} pages")
+    return '\n\n'.join(sections)
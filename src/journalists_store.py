@@ -0,0 +1,157 @@
+"""
+Read-only columnar store for the scraped journalists dataset
+journalists.json is loaded once into typed columns (categorical organization,
+title and status, Arrow-backed strings) that every session shares. Filters
+return row positions instead of copies, and summaries and full downloads are
+computed on first use and then kept with the store.
+"""
+
+import json
+from functools import cached_property
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data_store import string_dtype
+
+
+CATEGORY_COLUMNS = ['organization_name', 'organization_id', 'title', 'status']
+TEXT_COLUMNS = ['name_english', 'name_hebrew', 'job_title_english', 'job_title_hebrew', 'beat', 'email', 'phone',
+                'profile_url', 'source_url', 'id', 'scraped_date']
+
+
+def file_signature(path) -> tuple:
+    """(mtime, size) - cache key so a re-scrape is picked up"""
+    stat = Path(path).stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class JournalistsStore:
+    """Columnar journalists table; treat `frame` as read-only, it is shared by every session"""
+
+    def __init__(self, journalists: list, metadata: Optional[dict] = None):
+        self.metadata = metadata or {}
+        frame = pd.DataFrame(journalists)
+        self.columns = list(frame.columns)  # As in the JSON, for exports
+        for column in TEXT_COLUMNS:
+            if column not in frame.columns:
+                frame[column] = None
+        # One display title per person (English first, as the table shows it)
+        frame['title'] = frame['job_title_english'].where(frame['job_title_english'].astype(bool), None)
+        frame['title'] = frame['title'].fillna(frame['job_title_hebrew'].where(frame['job_title_hebrew'].astype(bool)))
+        for column in frame.columns:
+            if column in CATEGORY_COLUMNS:
+                frame[column] = frame[column].astype('category')
+            elif column == 'verified':
+                frame[column] = frame[column].fillna(False).astype(bool)
+            elif column == 'confidence_score':
+                frame[column] = pd.to_numeric(frame[column], errors='coerce').astype('Int16')
+            elif frame[column].dtype == object:
+                frame[column] = frame[column].astype(object).where(frame[column].notna()).astype(string_dtype())
+        self.frame = frame
+
+    @classmethod
+    def from_file(cls, path) -> 'JournalistsStore':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('journalists', []), data.get('metadata', {}))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @cached_property
+    def _search_text(self) -> pd.Series:
+        return (self.frame['name_english'].fillna('') + ' ' + self.frame['name_hebrew'].fillna('')).str.lower()
+
+    @cached_property
+    def _organization(self) -> pd.Series:
+        """organization_name for grouping and filtering - reporters without one count as 'Unknown'"""
+        column = self.frame['organization_name']
+        if 'Unknown' not in column.cat.categories:
+            column = column.cat.add_categories('Unknown')
+        return column.fillna('Unknown')
+
+    @cached_property
+    def _beat_lower(self) -> pd.Series:
+        return self.frame['beat'].fillna('').str.lower()
+
+    def filter(self, organization: Optional[str] = None, name: Optional[str] = None, beat: Optional[str] = None,
+               title: Optional[str] = None) -> np.ndarray:
+        """Row positions matching every given filter (all rows without filters)"""
+        mask = np.ones(len(self.frame), dtype=bool)
+        if organization:
+            mask &= (self._organization == organization).to_numpy(dtype=bool, na_value=False)
+        if name:
+            mask &= self._search_text.str.contains(name.lower(), regex=False).to_numpy(dtype=bool, na_value=False)
+        if beat:
+            mask &= self._beat_lower.str.contains(beat.lower(), regex=False).to_numpy(dtype=bool, na_value=False)
+        if title:
+            mask &= (self.frame['title'] == title).to_numpy(dtype=bool, na_value=False)
+        return np.flatnonzero(mask)
+
+    def view(self, positions: np.ndarray, columns: Optional[list] = None) -> pd.DataFrame:
+        """The rows at positions (only the given columns) for display"""
+        columns = [c for c in (columns or self.frame.columns) if c in self.frame.columns]
+        return self.frame.iloc[positions][columns]
+
+    def records(self, positions: Optional[np.ndarray] = None) -> list:
+        """Journalists as plain dicts with the JSON's fields (None for missing values)"""
+        frame = self.frame[self.columns] if positions is None else self.frame.iloc[positions][self.columns]
+        frame = frame.astype(object)
+        return frame.where(frame.notna(), None).to_dict('records')
+
+    def record(self, position: int) -> dict:
+        return self.records(np.array([position]))[0]
+
+    @cached_property
+    def labels(self) -> np.ndarray:
+        """'Name - Organization' per row, for pickers"""
+        return (self.frame['name_english'].fillna('') + ' - '
+                + self.frame['organization_name'].astype(object).fillna('').astype(str)).to_numpy(dtype=object)
+
+    @cached_property
+    def organization_counts(self) -> pd.Series:
+        return self._organization.value_counts()
+
+    @cached_property
+    def organizations(self) -> list:
+        return sorted(self.organization_counts[self.organization_counts > 0].index)
+
+    @cached_property
+    def titles(self) -> list:
+        return sorted(self.frame['title'].dropna().unique())
+
+    @cached_property
+    def beat_counts(self) -> pd.Series:
+        beats = self.frame['beat'].dropna().str.split(',').explode().str.strip()
+        return beats[beats != ''].value_counts()
+
+    @cached_property
+    def beats(self) -> list:
+        return sorted(self.beat_counts.index)
+
+    @cached_property
+    def stats(self) -> dict:
+        frame = self.frame
+        return {
+            'total': len(frame),
+            'organizations': int(self._organization.nunique()),
+            'verified': int(frame['verified'].sum()) if 'verified' in frame.columns else 0,
+            'with_email': int((frame['email'].fillna('') != '').sum()),
+            'with_profile': int((frame['profile_url'].fillna('') != '').sum()),
+            'scrape_dates': frame['scraped_date'].fillna('Unknown').str[:10].value_counts().sort_index().to_dict(),
+        }
+
+    def to_csv(self, positions: Optional[np.ndarray] = None) -> bytes:
+        frame = self.frame if positions is None else self.frame.iloc[positions]
+        return frame[self.columns].to_csv(index=False).encode('utf-8-sig')
+
+    @cached_property
+    def full_csv(self) -> bytes:
+        return self.to_csv()
+
+    @cached_property
+    def full_json(self) -> bytes:
+        return json.dumps(self.records(), ensure_ascii=False, indent=2).encode('utf-8')
@@ -0,0 +1,202 @@
+"""
+Local-first resolution against the scraped journalists database
+Reporters are matched by normalized Hebrew/English name against an index of
+data/journalists.json. Confident matches are answered without any API calls;
+weaker ones - and any match without organization or verification evidence -
+are only passed to the extraction prompt as a known profile.
+"""
+
+import json
+import re
+import threading
+from typing import Optional
+
+from src.config import Config
+from src.metrics import get_recorder
+from src.search_strategy import normalize_name
+
+
+# Gendered role suffixes in the CSV ("כתב/ת", "מגיש/ה", "פרשן/ית")
+ROLE_SUFFIX_RE = re.compile(r'/(?:ית|ת|ה)\b')
+ROLE_SPLIT_RE = re.compile(r'[\s,/@\-–()]+')
+# Title words most journalists share - agreeing on them says nothing about identity
+GENERIC_TITLE_WORDS = {
+    'כתב', 'כתבת', 'כותב', 'כותבת', 'מגיש', 'מגישה', 'מארח', 'מארחת', 'מנחה', 'פרשן', 'פרשנית', 'עיתונאי',
+    'עיתונאית', 'עורך', 'עורכת', 'בלוגר', 'בלוגרית', 'פובליציסט', 'פודקאסט', 'בעל', 'בעלת', 'טור', 'טורים',
+    'קבוע', 'קבועה', 'בעבר', 'בכיר', 'בכירה',
+    'reporter', 'journalist', 'writer', 'columnist', 'host', 'co-host', 'presenter', 'commentator', 'editor',
+    'correspondent', 'contributor', 'blogger', 'podcast', 'podcaster', 'analyst', 'former', 'regular', 'senior',
+    'media', 'professional', 'staff',
+}
+
+VERIFIED_BONUS = 10
+ROLE_MATCH_BONUS = 15
+EXTRA_ORG_PENALTY = 10  # Per additional media group listing the same name
+
+_index_lock = threading.Lock()
+_index = {'signature': None, 'people': {}, 'organizations': {}}
+
+
+def _signature(path) -> Optional[tuple]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_list(path, key: str) -> list:
+    if not path.exists():
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get(key, [])
+    except (OSError, ValueError) as e:
+        print(f"  [!] Could not read {path.name}: {e}")
+        return []
+
+
+def _load_index():
+    """(people, organizations): {normalized name: [active records]} and {organization id: organization}"""
+    with _index_lock:
+        signature = (_signature(Config.JOURNALISTS_PATH), _signature(Config.ORGANIZATIONS_PATH))
+        if signature != _index['signature']:
+            people = {}
+            for record in _read_list(Config.JOURNALISTS_PATH, 'journalists'):
+                if record.get('status', 'active') != 'active':
+                    continue
+                keys = {normalize_name(record.get('name_hebrew') or ''),
+                        normalize_name(record.get('name_english') or '')}
+                for key in keys - {''}:
+                    people.setdefault(key, []).append(record)
+            organizations = {org['id']: org for org in _read_list(Config.ORGANIZATIONS_PATH, 'organizations')
+                             if org.get('id')}
+            _index.update(signature=signature, people=people, organizations=organizations)
+        return _index['people'], _index['organizations']
+
+
+def journalist_index() -> dict:
+    """{normalized name: [journalist records]} (Hebrew and English names), rebuilt when the file changes"""
+    return _load_index()[0]
+
+
+def media_group(record: dict) -> str:
+    """Parent company of the record's organization (Mako, N12 and Channel 12 are all Keshet)"""
+    org = _load_index()[1].get(record.get('organization_id'), {})
+    return org.get('parent_company') or record.get('organization_id') or record.get('organization_name') or ''
+
+
+def _organization_names(record: dict) -> list:
+    org = _load_index()[1].get(record.get('organization_id'), {})
+    names = [record.get('organization_name'), org.get('name_hebrew'), org.get('name_english')]
+    return [name.lower() for name in names if name]
+
+
+def _role_tokens(text) -> list:
+    """Distinctive title words (gender suffixes and generic words like 'כתב' / 'reporter' removed)"""
+    text = ROLE_SUFFIX_RE.sub('', str(text or '').lower())
+    return [t for t in ROLE_SPLIT_RE.split(text) if len(t) > 2 and t not in GENERIC_TITLE_WORDS]
+
+
+def organization_matches(role, records: list) -> bool:
+    """True if the CSV role names one of the records' organizations"""
+    if not isinstance(role, str) or not role.strip():
+        return False
+    role_lower = role.lower()
+    return any(name in role_lower for record in records for name in _organization_names(record))
+
+
+def role_matches(role, records: list) -> bool:
+    """True if the CSV role names one of the records' organizations or shares a distinctive title word"""
+    if organization_matches(role, records):
+        return True
+    tokens = _role_tokens(role) if isinstance(role, str) else []
+    for record in records:
+        titles = _role_tokens(f"{record.get('job_title_hebrew') or ''} {record.get('job_title_english') or ''}")
+        if any(title.startswith(token) or token.startswith(title) for token in tokens for title in titles):
+            return True
+    return False
+
+
+def _rank(record: dict) -> tuple:
+    # Hebrew titles first - the CSV is kept in Hebrew
+    return (bool(record.get('job_title_hebrew')), bool(record.get('job_title_english')), bool(record.get('verified')),
+            record.get('confidence_score') or 0, record.get('scraped_date') or '')
+
+
+def match_confidence(records: list, role=None) -> int:
+    """Best scraped confidence, raised by verification and an agreeing CSV role, lowered per extra media group"""
+    score = max(record.get('confidence_score') or 0 for record in records)
+    if any(record.get('verified') for record in records):
+        score += VERIFIED_BONUS
+    if role_matches(role, records):
+        score += ROLE_MATCH_BONUS
+    score -= EXTRA_ORG_PENALTY * (len({media_group(record) for record in records}) - 1)
+    return max(0, min(100, score))
+
+
+def to_extraction(records: list, confidence: int) -> dict:
+    """Shape the best record like a Grok extraction so the update engine applies it unchanged"""
+    best = max(records, key=_rank)
+
+    def first(field):
+        return next((r[field] for r in sorted(records, key=_rank, reverse=True) if r.get(field)), None)
+
+    urls = []
+    for record in records:
+        for url in (record.get('profile_url'), record.get('source_url')):
+            if url and url not in urls:
+                urls.append(url)
+    return {
+        'name_hebrew': first('name_hebrew'),
+        'name_english': first('name_english'),
+        'job_title': best.get('job_title_hebrew') or best.get('job_title_english'),
+        'employer': best.get('organization_name'),
+        'email': first('email'),
+        'phone': first('phone'),
+        'topics': best.get('beat') or first('beat'),
+        'confidence_score': confidence,
+        'source_urls': urls[:3],
+        'notes': f"Matched locally in journalists.json ({', '.join(r.get('id', '?') for r in records)})",
+    }
+
+
+def format_local_context(records: list) -> str:
+    """Known profiles for the extraction prompt"""
+    lines = []
+    for record in sorted(records, key=_rank, reverse=True):
+        names = ' / '.join(n for n in (record.get('name_hebrew'), record.get('name_english')) if n)
+        title = record.get('job_title_hebrew') or record.get('job_title_english') or 'unknown title'
+        parts = [f"{names}: {title} @ {record.get('organization_name') or 'unknown organization'}"]
+        for label, field in (('beat', 'beat'), ('email', 'email'), ('phone', 'phone'), ('profile', 'profile_url')):
+            if record.get(field):
+                parts.append(f"{label}: {record[field]}")
+        lines.append(f"- {'; '.join(parts)} (scraped {str(record.get('scraped_date') or '')[:10]})")
+    return '\n'.join(lines)
+
+
+def lookup_reporter(first_name, last_name, role=None) -> Optional[dict]:
+    """
+    Match a reporter against journalists.json. Returns None without a match,
+    else {'records', 'confidence', 'extracted', 'context'} where `extracted`
+    is set only at LOCAL_MATCH_THRESHOLD or above and when the CSV role names
+    the record's organization or a record is verified (answer without API calls).
+    """
+    if not Config.LOCAL_LOOKUP:
+        return None
+    if not (isinstance(first_name, str) and first_name.strip() and isinstance(last_name, str) and last_name.strip()):
+        return None  # A single name matches too many people
+    records = journalist_index().get(normalize_name(first_name, last_name))
+    if not records:
+        return None
+
+    confidence = match_confidence(records, role)
+    # A name alone (however confident the scrape) is not enough to skip the search
+    evidence = organization_matches(role, records) or any(record.get('verified') for record in records)
+    if confidence >= Config.LOCAL_MATCH_THRESHOLD and evidence:
+        get_recorder().incr('local_matches')
+        return {'records': records, 'confidence': confidence,
+                'extracted': to_extraction(records, confidence), 'context': None}
+    get_recorder().incr('local_hints')
+    return {'records': records, 'confidence': confidence, 'extracted': None,
+            'context': format_local_context(records)}
@@ -0,0 +1,195 @@
+"""
+Structured metrics for batch runs: per-stage spans, token usage and counters
+Each finished batch is appended as one JSON line to logs/metrics.jsonl
+"""
+
+import contextvars
+import json
+import math
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+from src.config import Config
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class MetricsRecorder:
+    """Collects spans, token usage and counters for one batch run (thread-safe)"""
+
+    def __init__(self, source: str = 'cli'):
+        self.batch_id = datetime.now().strftime('%Y%m%d_%H%M%S_') + uuid.uuid4().hex[:6]
+        self.source = source
+        self.started = datetime.now().isoformat()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans = {}
+        self.counters = {}
+        self.tokens = {'prompt': 0, 'completion': 0, 'total': 0}
+        self.reporter_tokens = {}
+        self.reporters = 0
+        self.pipeline = {}
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time a block of work under a stage name (search, enrich, llm, parse, csv_io, ...)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.spans.setdefault(stage, []).append(elapsed)
+
+    def incr(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def record_usage(self, usage, reporters: Optional[list] = None):
+        """Add completion.usage; tokens are split evenly across the reporters in the request"""
+        if usage is None:
+            return
+        prompt = getattr(usage, 'prompt_tokens', 0) or 0
+        completion = getattr(usage, 'completion_tokens', 0) or 0
+        with self._lock:
+            self.tokens['prompt'] += prompt
+            self.tokens['completion'] += completion
+            self.tokens['total'] += prompt + completion
+            for name in reporters or []:
+                share = (prompt + completion) / len(reporters)
+                self.reporter_tokens[name] = round(self.reporter_tokens.get(name, 0) + share)
+
+    def set_pipeline(self, stats: dict):
+        """Per-stage queue/utilization stats from src.pipeline"""
+        with self._lock:
+            self.pipeline = stats
+
+    def summary(self) -> dict:
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': len(samples),
+                    'total_ms': round(sum(samples) * 1000, 1),
+                    'p50_ms': round(percentile(samples, 50) * 1000, 1),
+                    'p95_ms': round(percentile(samples, 95) * 1000, 1),
+                }
+                for stage, samples in self.spans.items()
+            }
+            return {
+                'batch_id': self.batch_id,
+                'source': self.source,
+                'started': self.started,
+                'elapsed_s': round(time.perf_counter() - self._start, 3),
+                'reporters': self.reporters,
+                'stages': stages,
+                'tokens': dict(self.tokens),
+                'tokens_per_reporter': round(self.tokens['total'] / self.reporters) if self.reporters else 0,
+                'reporter_tokens': dict(self.reporter_tokens),
+                'counters': dict(self.counters),
+                'pipeline': dict(self.pipeline),
+            }
+
+
+class _NullRecorder(MetricsRecorder):
+    """Used outside a batch so instrumented functions never need to check"""
+
+    @contextmanager
+    def span(self, stage: str):
+        yield
+
+    def incr(self, counter: str, amount: int = 1):
+        pass
+
+    def record_usage(self, usage, reporters: Optional[list] = None):
+        pass
+
+    def set_pipeline(self, stats: dict):
+        pass
+
+
+_NULL = _NullRecorder()
+# Per-context rather than module-global, so concurrent batches (Streamlit sessions
+# run in separate threads) each see their own recorder; worker threads started by a
+# batch inherit it via contextvars.copy_context()
+_current = contextvars.ContextVar('metrics_recorder', default=None)
+_last_summary = None
+
+
+def get_recorder() -> MetricsRecorder:
+    """The active batch's recorder (a no-op recorder if no batch is running)"""
+    return _current.get() or _NULL
+
+
+def start_batch(source: str = 'cli') -> MetricsRecorder:
+    recorder = MetricsRecorder(source)
+    _current.set(recorder)
+    return recorder
+
+
+def finish_batch(reporters: int = 0) -> Optional[dict]:
+    """Close the active batch and append its summary to logs/metrics.jsonl"""
+    global _last_summary
+    recorder = _current.get()
+    if recorder is None:
+        return None
+    recorder.reporters = reporters
+    summary = recorder.summary()
+    _current.set(None)
+    _last_summary = summary
+
+    try:
+        Config.LOGS_PATH.mkdir(parents=True, exist_ok=True)
+        with open(Config.LOGS_PATH / 'metrics.jsonl', 'a', encoding='utf-8') as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + '\n')
+    except OSError as e:
+        print(f"[!] Could not write metrics: {e}")
+    return summary
+
+
+def get_last_summary() -> Optional[dict]:
+    return _last_summary
+
+
+def load_metrics(limit: int = 50) -> list:
+    """Read the most recent batch summaries from logs/metrics.jsonl"""
+    path = Config.LOGS_PATH / 'metrics.jsonl'
+    if not path.exists():
+        return []
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries[-limit:]
+
+
+def print_summary(summary: dict):
+    """Print a per-stage breakdown of a batch summary"""
+    if not summary:
+        return
+    print(f"\n  Timing ({summary['elapsed_s']:.1f}s wall):")
+    for stage, stats in sorted(summary['stages'].items(), key=lambda kv: -kv[1]['total_ms']):
+        print(f"    {stage:<10} {stats['count']:>4} calls  total {stats['total_ms'] / 1000:>7.2f}s  "
+              f"p50 {stats['p50_ms']:>7.1f}ms  p95 {stats['p95_ms']:>7.1f}ms")
+    tokens = summary['tokens']
+    print(f"  Tokens: {tokens['prompt']} prompt + {tokens['completion']} completion "
+          f"(~{summary['tokens_per_reporter']}/reporter)")
+    if summary['counters']:
+        print("  Counters: " + ", ".join(f"{k}={v}" for k, v in sorted(summary['counters'].items())))
+    for name, stats in summary.get('pipeline', {}).items():
+        print(f"  Pipeline {name:<8} {stats['workers']} worker(s) {stats['items']:>4} items  "
+              f"util {stats['utilization']:>4.0%}  blocked {stats['blocked_s']:.2f}s  "
+              f"queue max {stats['queue_max']} mean {stats['queue_mean']}"
+              + (f"  errors {stats['errors']}" if stats.get('errors') else ""))
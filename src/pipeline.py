@@ -0,0 +1,177 @@
+"""
+Staged pipeline: worker threads per stage connected by bounded queues
+Lets Google searches for the next reporters run while Grok extracts earlier
+ones; a full queue blocks the stage feeding it (backpressure), and per-stage
+busy/blocked time and queue depths show which stage to tune. A batch a stage
+fails on travels on to the last stage (the sink) as a StageFailure, so the
+caller can release or record its items instead of losing them.
+"""
+
+import contextvars
+import queue
+import threading
+import time
+from typing import Callable, Iterable
+
+
+_DONE = object()
+
+
+class StageFailure:
+    """A batch a stage raised on, passed downstream in place of its outputs"""
+
+    def __init__(self, stage: str, items: list, error: Exception):
+        self.stage = stage
+        self.items = items
+        self.error = error
+
+    def __repr__(self):
+        return f"StageFailure({self.stage!r}, {len(self.items)} item(s), {self.error!r})"
+
+
+class Stage:
+    """
+    One pipeline stage. `fn` receives a list of up to `batch_size` items and
+    returns an iterable of outputs for the next stage. With batch_size > 1 a
+    worker waits up to `batch_wait` seconds for a batch to fill.
+    """
+
+    def __init__(self, name: str, fn: Callable, workers: int = 1, batch_size: int = 1, batch_wait: float = 0.0):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.stopped = threading.Event()
+        self._lock = threading.Lock()
+        self.items = 0
+        self.busy_s = 0.0
+        self.blocked_s = 0.0
+        self.depths = []
+        self.errors = 0
+
+    def _record(self, items: int, busy: float, blocked: float, depth: int, failed: bool = False):
+        with self._lock:
+            self.items += items
+            self.errors += int(failed)
+            self.busy_s += busy
+            self.blocked_s += blocked
+            self.depths.append(depth)
+
+
+class Pipeline:
+    """
+    Runs items through stages in order; the last stage's outputs are discarded.
+    Intermediate stages forward StageFailures untouched, so the last stage's fn
+    receives them alongside its normal input; failures of the last stage itself
+    are kept in `failures`.
+    """
+
+    def __init__(self, stages: list, queue_size: int = 4):
+        self.stages = stages
+        # Input queue is unbounded (pre-filled); queues between stages are bounded
+        self.queues = [queue.Queue()] + [queue.Queue(maxsize=max(1, queue_size)) for _ in stages[1:]]
+        self.wall_s = 0.0
+        self.failures = []
+
+    def stop(self, through: str):
+        """Stop taking new work in stage `through` and every stage before it; later stages drain"""
+        for stage in self.stages:
+            stage.stopped.set()
+            if stage.name == through:
+                break
+
+    def _take(self, stage: Stage, inbox: queue.Queue) -> tuple:
+        """Next batch for a worker; (batch, saw_done)"""
+        item = inbox.get()
+        if item is _DONE:
+            return [], True
+        batch = [item]
+        deadline = time.perf_counter() + stage.batch_wait
+        while len(batch) < stage.batch_size:
+            try:
+                item = inbox.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _worker(self, n: int, remaining: list, lock: threading.Lock):
+        stage, inbox = self.stages[n], self.queues[n]
+        outbox = self.queues[n + 1] if n + 1 < len(self.stages) else None
+        while True:
+            depth = inbox.qsize()
+            batch, done = self._take(stage, inbox)
+            if outbox is not None:
+                # Earlier stages' failures skip this stage on their way to the sink
+                for failure in [item for item in batch if isinstance(item, StageFailure)]:
+                    outbox.put(failure)
+                batch = [item for item in batch if not isinstance(item, StageFailure)]
+            if batch and not stage.stopped.is_set():
+                start = time.perf_counter()
+                blocked = 0.0
+                failure = None
+                try:
+                    for output in stage.fn(batch) or ():
+                        if outbox is not None:
+                            put_start = time.perf_counter()
+                            outbox.put(output)
+                            blocked += time.perf_counter() - put_start
+                except Exception as e:
+                    failure = StageFailure(stage.name, batch, e)
+                stage._record(len(batch), time.perf_counter() - start - blocked, blocked, depth, failed=bool(failure))
+                if failure is not None and outbox is not None:
+                    outbox.put(failure)
+                elif failure is not None:
+                    with lock:
+                        self.failures.append(failure)
+            if done:
+                inbox.put(_DONE)  # Let this stage's other workers see it too
+                break
+        with lock:
+            remaining[n] -= 1
+            last = remaining[n] == 0
+        if last and outbox is not None:
+            outbox.put(_DONE)
+
+    def run(self, items: Iterable):
+        for item in items:
+            self.queues[0].put(item)
+        self.queues[0].put(_DONE)
+
+        lock = threading.Lock()
+        remaining = [stage.workers for stage in self.stages]
+        threads = [
+            # Each worker runs in a copy of the caller's context so it sees the batch's metrics recorder
+            threading.Thread(target=contextvars.copy_context().run, args=(self._worker, n, remaining, lock),
+                             name=f"{stage.name}-{w}", daemon=True)
+            for n, stage in enumerate(self.stages) for w in range(stage.workers)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.wall_s = time.perf_counter() - start
+
+    def stats(self) -> dict:
+        """Per stage: items, workers, utilization (busy / workers x wall), backpressure and input queue depth"""
+        wall = self.wall_s or 1e-9
+        report = {}
+        for stage, inbox in zip(self.stages, self.queues):
+            depths = stage.depths or [0]
+            report[stage.name] = {
+                'workers': stage.workers,
+                'items': stage.items,
+                'errors': stage.errors,
+                'busy_s': round(stage.busy_s, 3),
+                'utilization': round(min(1.0, stage.busy_s / (stage.workers * wall)), 3),
+                'blocked_s': round(stage.blocked_s, 3),
+                'queue_max': max(depths),
+                'queue_mean': round(sum(depths) / len(depths), 2),
+                'queue_size': inbox.maxsize or None,
+            }
+        return report
+
@@ -0,0 +1,168 @@
+"""
+Token-budget-aware prompt context for the Grok extraction calls
+Drops results that never mention the reporter, dedupes near-identical snippets
+and truncates to PROMPT_TOKEN_BUDGET before anything is sent
+"""
+
+import re
+from typing import Optional
+
+from src.config import Config
+from src.metrics import get_recorder
+from src.search_strategy import transliterate_hebrew, has_hebrew, normalize_url
+
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def estimate_tokens(text) -> int:
+    """Rough token estimate: ~4 chars/token for Latin text, ~2 for Hebrew"""
+    text = str(text)
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) // 2 + 1
+
+
+def reporter_name_forms(reporter_name: str) -> list:
+    """Lower-cased forms a relevant result would contain (full/last name, transliterations)"""
+    parts = str(reporter_name).split()
+    forms = [reporter_name, parts[-1] if parts else '']
+    if has_hebrew(reporter_name):
+        latin = transliterate_hebrew(reporter_name)
+        forms += [latin, latin.split()[-1] if latin.split() else '']
+    # Ignore 1-2 letter fragments - they match almost anything
+    return [f.lower() for f in forms if f and len(f) > 2]
+
+
+def mentions_name(result: dict, name_forms: list) -> bool:
+    """True if the title, snippet or URL slug mentions any form of the name"""
+    text = f"{result.get('title', '')} {result.get('snippet', '')}".lower()
+    slug = re.sub(r'[-_/.]+', ' ', result.get('link', '').lower())
+    return any(form in text or form in slug for form in name_forms)
+
+
+def _shingles(text: str) -> set:
+    words = WORD_RE.findall(text.lower())
+    if len(words) < 3:
+        return set(words)
+    return {' '.join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def is_near_duplicate(shingles: set, seen: list, threshold: float) -> bool:
+    """Jaccard similarity of word 3-grams against already-kept snippets"""
+    if not shingles:
+        return True
+    for other in seen:
+        union = len(shingles | other)
+        if union and len(shingles & other) / union >= threshold:
+            return True
+    return False
+
+
+def _clean(text: str) -> str:
+    text = re.sub(r'\s+', ' ', str(text or '')).strip()
+    return text.removesuffix('...').removesuffix('…').strip()
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Cut text (on a line or word boundary where possible) to roughly `budget` tokens"""
+    if budget <= 0:
+        return ''
+    if estimate_tokens(text) <= budget:
+        return text
+    # Binary search on the character cut point - the estimate is not linear for mixed scripts
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    cut = text[:low]
+    boundary = max(cut.rfind('\n'), cut.rfind(' '))
+    return (cut[:boundary] if boundary > low // 2 else cut).rstrip() + ' …'
+
+
+def format_result(n: int, result: dict) -> str:
+    return f"{n}. {_clean(result.get('title'))}\n{_clean(result.get('snippet'))}\nURL: {result.get('link', '')}\n"
+
+
+def build_reporter_context(reporter_name: str, search_results: list, page_context: Optional[str] = None,
+                           budget: Optional[int] = None, local_context: Optional[str] = None) -> str:
+    """Format one reporter's search results (and optional page excerpts) for a prompt, compacted to a budget"""
+    context, _ = compact_reporter_context(reporter_name, search_results, page_context, budget, local_context)
+    return context
+
+
+def compact_reporter_context(reporter_name: str, search_results: list, page_context: Optional[str] = None,
+                             budget: Optional[int] = None, local_context: Optional[str] = None) -> tuple:
+    """
+    Returns (context, stats). Results keep their ranked order; those that
+    never mention the reporter and near-duplicates of earlier snippets are
+    dropped, then results and page excerpts are fitted into the token budget.
+    If no result mentions the name the top one is kept so the model can
+    still report low confidence. Known profiles from journalists.json
+    (local_context) always come first.
+    """
+    budget = budget or Config.PROMPT_TOKEN_BUDGET
+    header = f"Reporter Name: {reporter_name}\n"
+    if local_context:
+        header += f"\nKnown Profiles (scraped staff pages - may be outdated, confirm against the results):\n{local_context}\n"
+    header += "\nSearch Results:\n"
+    raw = header + ''.join(f"\n{format_result(i, r)}" for i, r in enumerate(search_results, 1))
+    if page_context:
+        raw += f"\nPage Excerpts (author bio / contact sections from the top results):\n{page_context}\n"
+
+    stats = {'raw_tokens': estimate_tokens(raw), 'dropped_irrelevant': 0, 'dropped_duplicates': 0,
+             'truncated': False}
+
+    if not Config.PROMPT_COMPACTION:
+        stats.update(tokens=stats['raw_tokens'], saved=0)
+        return raw, stats
+
+    name_forms = reporter_name_forms(reporter_name)
+    kept, seen_shingles, seen_urls = [], [], set()
+    for result in search_results:
+        if not mentions_name(result, name_forms):
+            stats['dropped_irrelevant'] += 1
+            continue
+        url = normalize_url(result.get('link', ''))
+        shingles = _shingles(f"{result.get('title', '')} {result.get('snippet', '')}")
+        if url in seen_urls or is_near_duplicate(shingles, seen_shingles, Config.PROMPT_DEDUPE_THRESHOLD):
+            stats['dropped_duplicates'] += 1
+            continue
+        seen_urls.add(url)
+        seen_shingles.append(shingles)
+        kept.append(result)
+    if not kept and search_results:
+        kept = search_results[:1]
+        stats['dropped_irrelevant'] -= 1
+
+    # Results first (in rank order), then page excerpts get what is left
+    context = header
+    remaining = budget - estimate_tokens(header)
+    for n, result in enumerate(kept, 1):
+        block = f"\n{format_result(n, result)}"
+        cost = estimate_tokens(block)
+        if cost > remaining:
+            stats['truncated'] = True
+            break
+        context += block
+        remaining -= cost
+
+    if page_context and remaining > 50:
+        excerpt_header = "\nPage Excerpts (author bio / contact sections from the top results):\n"
+        remaining -= estimate_tokens(excerpt_header)
+        excerpt = truncate_to_tokens(page_context, remaining)
+        stats['truncated'] = stats['truncated'] or excerpt != page_context
+        context += f"{excerpt_header}{excerpt}\n"
+    elif page_context:
+        stats['truncated'] = True
+
+    stats['tokens'] = estimate_tokens(context)
+    stats['saved'] = max(0, stats['raw_tokens'] - stats['tokens'])
+    if stats['saved']:
+        get_recorder().incr('prompt_tokens_saved', stats['saved'])
+        print(f"  [~] Prompt compacted: {stats['raw_tokens']} -> {stats['tokens']} tokens "
+              f"({stats['dropped_irrelevant']} irrelevant, {stats['dropped_duplicates']} duplicate results dropped"
+              f"{', truncated' if stats['truncated'] else ''})")
+    return context, stats
@@ -0,0 +1,216 @@
+"""
+Shared rate limiter and retry policy for external APIs (Google Search, Grok)
+Classifies errors, honors Retry-After, backs off with jitter and adapts the
+request rate per API to the limits we actually observe
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from src.config import Config
+from src.metrics import get_recorder
+
+
+# Error classes returned by classify_error()
+RETRYABLE = 'retryable'        # Transient server/network failure
+RATE_LIMITED = 'rate_limited'  # 429 / per-minute limit - slow down and retry
+QUOTA = 'quota'                # Daily quota / billing exhausted - retrying won't help
+FATAL = 'fatal'                # Bad request, auth error, etc.
+
+
+class ApiError(Exception):
+    """Base class for API failures that must not be mistaken for 'no results'"""
+
+    def __init__(self, api: str, message: str, status: Optional[int] = None):
+        super().__init__(f"{api}: {message}")
+        self.api = api
+        self.status = status
+
+
+class RateLimitError(ApiError):
+    """Still rate limited after all retries"""
+
+
+class QuotaExceededError(ApiError):
+    """Quota exhausted - further calls will fail until the quota resets"""
+
+
+class ServiceUnavailableError(ApiError):
+    """Still failing (5xx / timeout / connection error) after all retries"""
+
+
+def _status_of(error) -> Optional[int]:
+    """Extract HTTP status from openai / googleapiclient / requests errors"""
+    status = getattr(error, 'status_code', None)  # openai.APIStatusError
+    if status is None:
+        resp = getattr(error, 'resp', None)  # googleapiclient HttpError
+        status = getattr(resp, 'status', None)
+    if status is None:
+        response = getattr(error, 'response', None)  # requests.HTTPError
+        status = getattr(response, 'status_code', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _headers_of(error) -> dict:
+    """Extract response headers (lower-cased keys) from an API error"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if headers is None:
+        headers = getattr(error, 'resp', None)  # httplib2.Response is a dict of headers
+    if not headers:
+        return {}
+    try:
+        return {str(k).lower(): v for k, v in dict(headers).items()}
+    except (TypeError, ValueError):
+        return {}
+
+
+def classify_error(error) -> str:
+    """Classify an exception raised by an API call"""
+    status = _status_of(error)
+    text = str(error).lower()
+
+    if ('per day' in text or 'dailylimitexceeded' in text
+            or 'insufficient_quota' in text or 'billing' in text):
+        return QUOTA
+    if status == 429 or (status == 403 and 'ratelimitexceeded' in text):
+        return RATE_LIMITED
+    if status in (408, 409, 500, 502, 503, 504):
+        return RETRYABLE
+    if status is None:
+        name = type(error).__name__.lower()
+        if 'timeout' in name or 'connection' in name or isinstance(error, (TimeoutError, ConnectionError)):
+            return RETRYABLE
+    return FATAL
+
+
+def retry_after_seconds(error) -> Optional[float]:
+    """Read the server's requested wait from Retry-After / Retry-After-Ms headers"""
+    headers = _headers_of(error)
+
+    value = headers.get('retry-after-ms')
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except (TypeError, ValueError):
+            pass
+
+    value = headers.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveRateLimiter:
+    """
+    Paces calls to one API (AIMD): the rate creeps up on every success and is
+    halved on every rate-limit response, so it settles just under the
+    provider's real ceiling instead of a fixed sleep
+    """
+
+    def __init__(self, name: str, max_rate: float, min_rate: float = 0.05, increase: float = 0.05):
+        self.name = name
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.increase = increase
+        self.rate = max_rate
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the next request slot is available"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot, self._blocked_until)
+            self._next_slot = slot + 1.0 / self.rate
+        wait = slot - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+
+_LIMITERS = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_limiter(api: str) -> AdaptiveRateLimiter:
+    """Return the process-wide limiter for an API ('google' or 'grok')"""
+    with _LIMITERS_LOCK:
+        if api not in _LIMITERS:
+            max_rate = {
+                'google': Config.GOOGLE_MAX_RPS,
+                'grok': Config.GROK_MAX_RPS,
+            }.get(api, 1.0)
+            _LIMITERS[api] = AdaptiveRateLimiter(api, max_rate)
+        return _LIMITERS[api]
+
+
+def call_with_retry(api: str, fn, *args, max_retries: Optional[int] = None, **kwargs):
+    """
+    Call fn(*args, **kwargs) through the API's rate limiter, retrying
+    transient and rate-limit failures. Raises QuotaExceededError /
+    RateLimitError / ServiceUnavailableError instead of letting callers treat
+    them as empty results.
+    """
+    limiter = get_limiter(api)
+    if max_retries is None:
+        max_retries = Config.API_MAX_RETRIES
+
+    for attempt in range(max_retries + 1):
+        limiter.acquire()
+        try:
+            result = fn(*args, **kwargs)
+            limiter.on_success()
+            return result
+        except Exception as e:
+            kind = classify_error(e)
+            status = _status_of(e)
+
+            if kind == QUOTA:
+                raise QuotaExceededError(api, str(e), status) from e
+            if kind == FATAL:
+                raise
+
+            wait = retry_after_seconds(e)
+            if kind == RATE_LIMITED:
+                limiter.on_rate_limited(wait)
+
+            if attempt == max_retries:
+                if kind == RATE_LIMITED:
+                    raise RateLimitError(api, f"still rate limited after {attempt + 1} attempts", status) from e
+                raise ServiceUnavailableError(api, f"still failing after {attempt + 1} attempts: "
+                                                   f"{status or type(e).__name__}", status) from e
+
+            delay = wait if wait is not None else backoff_delay(attempt)
+            get_recorder().incr(f'{api}_retries')
+            print(f"  [~] {api} {kind} ({status or type(e).__name__}), retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
@@ -0,0 +1,309 @@
+"""
+Response parsing for Grok extraction calls
+Validates against typed schemas and repairs malformed / truncated JSON instead
+of dropping the whole (paid) response
+"""
+
+import json
+import re
+import threading
+from typing import Optional
+
+from src.config import Config
+from src.metrics import get_recorder
+from src.budget import get_ledger
+from src.prompt_builder import estimate_tokens
+from src.rate_limiter import call_with_retry
+
+
+# Field -> type schemas for the extraction responses
+REPORTER_SCHEMA = {
+    'name_hebrew': str,
+    'name_english': str,
+    'job_title': str,
+    'employer': str,
+    'email': str,
+    'phone': str,
+    'topics': str,
+    'confidence_score': int,
+    'source_urls': list,
+    'notes': str,
+}
+
+JOURNALIST_SCHEMA = {
+    'name_hebrew': str,
+    'name_english': str,
+    'job_title_hebrew': str,
+    'job_title_english': str,
+    'beat': str,
+    'email': str,
+    'profile_url': str,
+}
+
+NULL_STRINGS = {'', 'null', 'none', 'n/a', 'unknown', '...'}
+
+
+class ParseStats:
+    """Per-call-type counters: clean parses, repaired responses, failures, recovered objects"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, call: str, status: str, objects: int = 0):
+        with self._lock:
+            entry = self._stats.setdefault(call, {'calls': 0, 'clean': 0, 'repaired': 0, 'failed': 0, 'objects': 0})
+            entry['calls'] += 1
+            entry[status] += 1
+            entry['objects'] += objects
+
+    def summary(self) -> dict:
+        """Return counters per call type with recovery_rate = repaired / (repaired + failed)"""
+        with self._lock:
+            out = {}
+            for call, entry in self._stats.items():
+                broken = entry['repaired'] + entry['failed']
+                out[call] = dict(entry, recovery_rate=round(entry['repaired'] / broken, 3) if broken else 1.0)
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+PARSE_STATS = ParseStats()
+
+
+def get_parse_stats() -> dict:
+    return PARSE_STATS.summary()
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove markdown code fences (including an unterminated closing fence)"""
+    text = (text or '').strip()
+    if text.startswith("```"):
+        text = text[3:]
+        if text.startswith("json"):
+            text = text[4:]
+        end = text.rfind("```")
+        if end != -1:
+            text = text[:end]
+    return text.strip()
+
+
+def close_truncated_json(text: str) -> str:
+    """Best-effort completion of JSON cut off mid-value: close strings, drop dangling keys, close brackets"""
+    stack = []
+    in_string = False
+    escaped = False
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+        elif ch in '}]' and stack:
+            stack.pop()
+
+    if in_string:
+        text += '"'
+    text = text.rstrip()
+    # Drop a trailing comma or a key without a value
+    text = re.sub(r',\s*$', '', text)
+    text = re.sub(r',?\s*"[^"]*"\s*:\s*$', '', text)
+    return text + ''.join(reversed(stack))
+
+
+def coerce_value(value, field_type):
+    """Coerce one field to its schema type (None for missing/placeholder values)"""
+    if field_type is int:
+        if isinstance(value, bool) or value is None:
+            return 0
+        if isinstance(value, (int, float)):
+            return max(0, min(100, int(value)))
+        match = re.search(r'\d+', str(value))
+        return max(0, min(100, int(match.group()))) if match else 0
+
+    if field_type is list:
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [v.strip() for v in re.split(r'[;,\s]+', value) if v.strip() and v.strip().lower() not in NULL_STRINGS]
+        if isinstance(value, list):
+            return [str(v) for v in value if v is not None and str(v).strip().lower() not in NULL_STRINGS]
+        return [str(value)]
+
+    if value is None:
+        return None
+    if isinstance(value, list):
+        value = ', '.join(str(v) for v in value if v is not None)
+    value = str(value).strip()
+    return None if value.lower() in NULL_STRINGS else value
+
+
+def validate(obj, schema: dict) -> Optional[dict]:
+    """Validate/coerce a parsed object against a schema; extra keys are kept as-is"""
+    if not isinstance(obj, dict):
+        return None
+    cleaned = dict(obj)
+    for field, field_type in schema.items():
+        cleaned[field] = coerce_value(obj.get(field), field_type)
+    return cleaned
+
+
+def _load_object(text: str):
+    """Try progressively more tolerant ways to load a single JSON object"""
+    try:
+        return json.loads(text), 'clean'
+    except ValueError:
+        pass
+
+    start = text.find('{')
+    if start == -1:
+        return None, 'failed'
+    end = text.rfind('}')
+    if end > start:
+        try:
+            return json.loads(text[start:end + 1]), 'repaired'
+        except ValueError:
+            pass
+    try:
+        return json.loads(close_truncated_json(text[start:])), 'repaired'
+    except ValueError:
+        return None, 'failed'
+
+
+def scan_array(text: str) -> tuple:
+    """
+    Incrementally decode elements of a JSON array, keeping every complete
+    element even if the array is cut off or one element is malformed.
+    Returns (items, complete).
+    """
+    start = text.find('[')
+    if start == -1:
+        return [], False
+
+    decoder = json.JSONDecoder()
+    items = []
+    pos = start + 1
+    while pos < len(text):
+        while pos < len(text) and text[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(text):
+            break
+        if text[pos] == ']':
+            return items, True
+        try:
+            item, pos = decoder.raw_decode(text, pos)
+            items.append(item)
+        except ValueError:
+            # Malformed or truncated element - resync on the next object
+            next_obj = text.find('{', pos + 1)
+            if next_obj == -1:
+                break
+            pos = next_obj
+    return items, False
+
+
+def parse_object_response(text: str, schema: dict = REPORTER_SCHEMA, call: str = 'reporter') -> Optional[dict]:
+    """Parse a single-object response; repairs truncation/extra prose before giving up"""
+    with get_recorder().span('parse'):
+        obj, status = _load_object(strip_code_fences(text))
+        data = validate(obj, schema)
+    if data is None:
+        status = 'failed'
+    PARSE_STATS.record(call, status, 1 if data else 0)
+    if status == 'repaired':
+        print(f"  [~] Repaired malformed {call} response")
+    return data
+
+
+def parse_array_response(text: str, schema: dict, call: str) -> list:
+    """Parse an array response (or an object wrapping one); recovers complete elements of truncated arrays"""
+    with get_recorder().span('parse'):
+        return _parse_array(text, schema, call)
+
+
+def _parse_array(text: str, schema: dict, call: str) -> list:
+    cleaned = strip_code_fences(text)
+    status = 'clean'
+    try:
+        data = json.loads(cleaned)
+        if isinstance(data, dict):
+            data = next((v for v in data.values() if isinstance(v, list)), [])
+        if not isinstance(data, list):
+            raise ValueError("response is not an array")
+    except ValueError:
+        data, complete = scan_array(cleaned)
+        status = 'repaired' if data else 'failed'
+        if data:
+            print(f"  [~] Recovered {len(data)} objects from {'malformed' if complete else 'truncated'} {call} response")
+
+    items = [v for v in (validate(item, schema) for item in data) if v is not None]
+    PARSE_STATS.record(call, status, len(items))
+    return items
+
+
+# Structured output (response_format) support - switched off for the rest of
+# the process the first time the endpoint rejects it
+_json_mode_supported = True
+
+
+def json_mode_kwargs() -> dict:
+    """Extra chat.completions.create kwargs for JSON mode, if enabled and supported"""
+    if Config.GROK_JSON_MODE and _json_mode_supported:
+        return {'response_format': {'type': 'json_object'}}
+    return {}
+
+
+def is_json_mode_rejection(error) -> bool:
+    """True if an API error says the endpoint doesn't support response_format"""
+    global _json_mode_supported
+    status = getattr(error, 'status_code', None)
+    if status in (400, 422) and 'response_format' in str(error):
+        _json_mode_supported = False
+        print("  [!] Endpoint rejected JSON mode, falling back to plain completions")
+        return True
+    return False
+
+
+def create_json_completion(client, messages: list, max_tokens: int, json_mode: bool = False,
+                           reporters: Optional[list] = None):
+    """
+    Rate-limited Grok chat completion. With json_mode, requests structured
+    JSON output and transparently retries without it if the endpoint refuses.
+    Only use json_mode for single-object responses (JSON mode requires an object).
+    Token usage is attributed to `reporters` in the batch metrics and charged
+    to the daily budget: prompt + max_tokens are reserved up front
+    (BudgetExceededError if they no longer fit) and settled to the actual usage.
+    """
+    kwargs = json_mode_kwargs() if json_mode else {}
+    recorder = get_recorder()
+    ledger = get_ledger()
+    reserved = ledger.reserve('grok', sum(estimate_tokens(m['content']) for m in messages) + max_tokens)
+    try:
+        with recorder.span('llm'):
+            completion = call_with_retry(
+                'grok',
+                client.chat.completions.create,
+                model=Config.GROK_MODEL,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=max_tokens,
+                **kwargs
+            )
+    except Exception as e:
+        ledger.settle('grok', reserved, 0)
+        if kwargs and is_json_mode_rejection(e):
+            return create_json_completion(client, messages, max_tokens, reporters=reporters)
+        raise
+    usage = getattr(completion, 'usage', None)
+    recorder.record_usage(usage, reporters)
+    ledger.settle('grok', reserved, getattr(usage, 'total_tokens', 0) or reserved)
+    return completion
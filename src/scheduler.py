@@ -0,0 +1,198 @@
+"""
+Refresh scheduler: ranks reporters by how likely their record is wrong
+(staleness, low confidence, MANUAL REVIEW, missing contacts) and hands out the
+highest-value work first from a persistent priority queue under cache/schedule/
+"""
+
+import contextlib
+import hashlib
+import heapq
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from src.atomic_io import atomic_write_json, file_lock
+from src.config import Config
+
+
+# Relative weight of each signal in the 0-1 priority score
+WEIGHTS = {
+    'staleness': 0.4,
+    'low_confidence': 0.25,
+    'manual_review': 0.2,
+    'missing_contacts': 0.15,
+}
+
+EMAIL_COLUMN = 'דוא"ל'
+PHONE_COLUMNS = ['נייד', 'טלפון']
+
+
+def _blank(series: pd.Series) -> pd.Series:
+    return series.isna() | (series.astype(str).str.strip() == '')
+
+
+def score_reporters(df: pd.DataFrame, now: Optional[datetime] = None, attempts: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Vectorized priority signals and score (0-1, higher = refresh sooner) for
+    every row. `attempts` maps row index -> epoch seconds of the last try, so
+    rows whose search found nothing don't come straight back to the top.
+    """
+    now = now or datetime.now()
+    missing = pd.Series(float('nan'), index=df.index)
+
+    updated = pd.to_datetime(df.get('last_updated', missing), errors='coerce')
+    if getattr(updated.dt, 'tz', None) is not None:
+        updated = updated.dt.tz_convert(None)
+    if attempts:
+        tried = pd.Series({int(k): datetime.fromtimestamp(v) for k, v in attempts.items()}, dtype='datetime64[ns]')
+        updated = pd.concat([updated, tried.reindex(df.index)], axis=1).max(axis=1)
+    age_days = (pd.Timestamp(now) - updated).dt.total_seconds() / 86400
+    confidence = pd.to_numeric(df.get('confidence_score', missing), errors='coerce')
+
+    no_email = _blank(df[EMAIL_COLUMN]) if EMAIL_COLUMN in df.columns else pd.Series(True, index=df.index)
+    phone_cols = [c for c in PHONE_COLUMNS if c in df.columns]
+    no_phone = pd.concat([_blank(df[c]) for c in phone_cols], axis=1).all(axis=1) if phone_cols \
+        else pd.Series(True, index=df.index)
+
+    signals = pd.DataFrame({
+        'age_days': age_days,
+        'confidence': confidence,
+        'staleness': (age_days / Config.SCHEDULER_STALE_DAYS).clip(0, 1).fillna(1.0),
+        'low_confidence': ((100 - confidence) / 100).clip(0, 1).fillna(1.0),
+        'manual_review': (df.get('decision', missing) == 'MANUAL REVIEW').astype(float),
+        'missing_contacts': no_email.astype(float) * 0.5 + no_phone.astype(float) * 0.5,
+        'no_email': no_email,
+        'no_phone': no_phone,
+    }, index=df.index)
+    signals['score'] = sum(signals[name] * weight for name, weight in WEIGHTS.items())
+    return signals
+
+
+def describe(signals: pd.Series) -> str:
+    """Human-readable reasons for one row's priority"""
+    reasons = []
+    if pd.isna(signals['age_days']):
+        reasons.append("never updated")
+    elif signals['staleness'] >= 1:
+        reasons.append(f"stale ({int(signals['age_days'])}d)")
+    if signals['manual_review']:
+        reasons.append("manual review")
+    if pd.notna(signals['confidence']) and signals['confidence'] < Config.CONFIDENCE_THRESHOLD:
+        reasons.append(f"confidence {int(signals['confidence'])}%")
+    if signals['no_email']:
+        reasons.append("no email")
+    if signals['no_phone']:
+        reasons.append("no phone")
+    return ', '.join(reasons) or 'routine refresh'
+
+
+def _file_signature(path: Path) -> list:
+    stat = Path(path).stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class RefreshScheduler:
+    """
+    Persistent priority queue over one reporter database.
+
+    The queue is rebuilt whenever the CSV changes (mtime/size) and is otherwise
+    reloaded from disk, so successive batches - across app sessions and CLI
+    runs - keep draining it in priority order. Handed-out rows are leased for
+    SCHEDULER_LEASE_MINUTES so an interrupted batch doesn't starve them. Every
+    change is a read-modify-write under the file lock, so concurrent app
+    sessions and CLI runs never drop each other's leases.
+    """
+
+    def __init__(self, db_path, queue_path: Optional[Path] = None):
+        self.db_path = Path(db_path)
+        digest = hashlib.sha1(str(self.db_path.resolve()).encode('utf-8')).hexdigest()[:12]
+        self.queue_path = queue_path or Config.CACHE_PATH / 'schedule' / f"{digest}.json"
+        self.state = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.queue_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'signature': None, 'heap': [], 'leases': {}, 'attempts': {}}
+
+    def _save(self):
+        atomic_write_json(self.queue_path, self.state)
+
+    @contextlib.contextmanager
+    def _update(self):
+        """Reload the queue under the file lock, apply the caller's changes and write it back"""
+        with file_lock(self.queue_path):
+            self.state = self._load()
+            yield self.state
+            self._save()
+
+    def _expire_leases(self):
+        cutoff = time.time() - Config.SCHEDULER_LEASE_MINUTES * 60
+        self.state['leases'] = {k: t for k, t in self.state['leases'].items() if t > cutoff}
+
+    def rebuild(self, df: pd.DataFrame):
+        """Re-rank every row from the current CSV contents (call within _update)"""
+        signals = score_reporters(df, attempts=self.state.setdefault('attempts', {}))
+        self.state['heap'] = [[-round(score, 6), int(index)] for index, score in signals['score'].items()]
+        heapq.heapify(self.state['heap'])
+        self.state['signature'] = _file_signature(self.db_path)
+        self.state['built'] = datetime.now().isoformat()
+
+    def refresh(self, df: pd.DataFrame):
+        """Rebuild the queue if the CSV changed since it was built (call within _update)"""
+        if self.state.get('signature') != _file_signature(self.db_path) or not self.state['heap']:
+            self.rebuild(df)
+
+    def next_batch(self, df: pd.DataFrame, n: int) -> list:
+        """Pop and lease the n highest-priority row indices that aren't already leased"""
+        with self._update():
+            self.refresh(df)
+            self._expire_leases()
+            heap = self.state['heap']
+            batch, skipped = [], []
+            while heap and len(batch) < n:
+                entry = heapq.heappop(heap)
+                index = entry[1]
+                if str(index) in self.state['leases'] or index not in df.index:
+                    skipped.append(entry)
+                    continue
+                batch.append(index)
+                self.state['leases'][str(index)] = time.time()
+            for entry in skipped:
+                if entry[1] in df.index:
+                    heapq.heappush(heap, entry)
+        return batch
+
+    def complete(self, indices: list):
+        """Release leases and record the attempt (new scores arrive with the next rebuild)"""
+        now = time.time()
+        with self._update() as state:
+            attempts = state.setdefault('attempts', {})
+            for index in indices:
+                state['leases'].pop(str(index), None)
+                attempts[str(index)] = now
+
+    def release(self, indices: list):
+        """Return leased rows to the queue without counting an attempt (e.g. batch paused)"""
+        with self._update() as state:
+            for index in indices:
+                if state['leases'].pop(str(index), None) is not None:
+                    heapq.heappush(state['heap'], [-1.0, int(index)])
+
+    def preview(self, df: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+        """Top-n rows by priority with reasons, without leasing them"""
+        self.state = self._load()
+        signals = score_reporters(df, attempts=self.state.get('attempts'))
+        leased = {int(k) for k in self.state.get('leases', {})}
+        top = signals.drop(index=[i for i in leased if i in signals.index]).nlargest(n, 'score')
+        return pd.DataFrame({
+            'row': top.index + 2,
+            'name': df.loc[top.index, 'שם פרטי'].astype(str) + ' ' + df.loc[top.index, 'שם משפחה'].astype(str),
+            'score': top['score'].round(2),
+            'reasons': [describe(top.loc[i]) for i in top.index],
+        })
@@ -5,11 +5,12 @@ Uses Crawl4AI for extraction and Grok for Hebrew name processing
 """
 
 import asyncio
+import contextlib
+import importlib.util
 import json
 import re
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
 import sys
 import io
 
@@ -21,17 +22,17 @@ if sys.platform == 'win32':
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.atomic_io import atomic_write_json, file_lock
 from src.config import Config
+from src.crawl_archive import CrawlArchive
+from src.crawl_frontier import STAFF_SCORE, CrawlFrontier
+from src.rate_limiter import ApiError
+from src.metrics import get_recorder, start_batch, finish_batch, print_summary
+from src.response_parser import JOURNALIST_SCHEMA, create_json_completion, parse_array_response, get_parse_stats
 
-# Check if crawl4ai is available
-try:
-    from crawl4ai import AsyncWebCrawler
-    CRAWL4AI_AVAILABLE = True
-except ImportError:
-    CRAWL4AI_AVAILABLE = False
-    print("[!] Crawl4AI not installed. Install with: pip install crawl4ai")
-
-from openai import OpenAI
+# Check if crawl4ai is available without importing it (crawl4ai and openai
+# are loaded on first use so 'list' / 'stats' start instantly)
+CRAWL4AI_AVAILABLE = importlib.util.find_spec('crawl4ai') is not None
 
 
 # Paths
@@ -53,12 +54,18 @@ def load_journalists() -> dict:
 
 
 def save_journalists(data: dict):
-    """Save journalists to JSON file"""
-    data['metadata']['last_updated'] = datetime.now().isoformat()
-    data['metadata']['total_journalists'] = len(data['journalists'])
-
-    with open(JOURNALISTS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """Save journalists to JSON file (atomically, keeping entries another run saved meanwhile)"""
+    with file_lock(JOURNALISTS_FILE):
+        if JOURNALISTS_FILE.exists():
+            ours = {j['id'] for j in data['journalists']}
+            added = [j for j in load_journalists()['journalists'] if j['id'] not in ours]
+            if added:
+                print(f"[~] Keeping {len(added)} journalists saved by another run")
+                data['journalists'].extend(added)
+
+        data['metadata']['last_updated'] = datetime.now().isoformat()
+        data['metadata']['total_journalists'] = len(data['journalists'])
+        atomic_write_json(JOURNALISTS_FILE, data, ensure_ascii=False, indent=2)
 
     print(f"[OK] Saved {len(data['journalists'])} journalists to {JOURNALISTS_FILE}")
 
@@ -71,19 +78,82 @@ def generate_journalist_id(org_id: str, name: str) -> str:
     return f"{org_id}_{slug}"
 
 
-async def scrape_with_crawl4ai(url: str, org_name: str) -> Optional[str]:
-    """Scrape URL using Crawl4AI and return markdown content"""
-    if not CRAWL4AI_AVAILABLE:
-        print(f"[!] Crawl4AI not available, skipping {url}")
-        return None
+def page_text(html: str) -> str:
+    """Readable text of a page with link targets kept inline (stand-in for Crawl4AI's markdown)"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'lxml')
+    for tag in soup(['script', 'style', 'noscript', 'svg', 'iframe']):
+        tag.decompose()
+    for a in soup.find_all('a', href=True):
+        a.replace_with(f"{a.get_text(' ', strip=True)} ({a['href']})")
+    return re.sub(r'\n\s*\n+', '\n', soup.get_text('\n', strip=True))
 
+
+async def fetch_crawl_page(url: str, crawler=None) -> tuple:
+    """(content for extraction, html for link discovery) - via Crawl4AI when given a crawler, else a plain fetch"""
     try:
-        async with AsyncWebCrawler() as crawler:
-            result = await crawler.arun(url)
-            return result.markdown
+        with get_recorder().span('crawl'):
+            if crawler is not None:
+                result = await crawler.arun(url)
+                if not result.success:
+                    print(f"[X] Error scraping {url}: {result.error_message}")
+                    return None, None
+                return str(result.markdown), result.html
+            from src.enrichment import fetch_page
+            # Always refetch: the enrichment cache could serve a crawl a week-old page
+            html = await asyncio.to_thread(fetch_page, url, 0)
+        return (page_text(html), html) if html else (None, None)
     except Exception as e:
         print(f"[X] Error scraping {url}: {e}")
-        return None
+        return None, None
+
+
+async def crawl_organization(org: dict) -> list:
+    """
+    [(url, content)] for the organization's staff-like pages. Starts at the
+    staff page (the home page is crawled for links too) and follows same-site
+    links by the frontier's priority (src/crawl_frontier.py). Fetched pages are
+    archived when changed (src/crawl_archive.py); with CRAWL_REPLAY the crawl is served from
+    that archive without any network access.
+    """
+    frontier = CrawlFrontier([org.get('staff_page_url') or org.get('website'), org.get('website')])
+    replay = Config.CRAWL_REPLAY
+    archive = CrawlArchive(org['id']) if replay or Config.CRAWL_ARCHIVE else None
+    pages = []
+    async with contextlib.AsyncExitStack() as stack:
+        crawler = None
+        if replay:
+            print(f"[~] Replaying from the crawl archive ({len(archive)} page(s) archived)")
+        elif CRAWL4AI_AVAILABLE:
+            from crawl4ai import AsyncWebCrawler
+            crawler = await stack.enter_async_context(AsyncWebCrawler())
+        else:
+            print("[!] Crawl4AI not installed (pip install crawl4ai), fetching pages as plain HTML")
+
+        while (item := frontier.pop()) is not None:
+            url, depth, score = item
+            if replay:
+                content, html = archive.get(url)
+            else:
+                if frontier.popped > 1:
+                    await asyncio.sleep(Config.CRAWL_DELAY)  # Politeness between pages on one site
+                content, html = await fetch_crawl_page(url, crawler)
+                if content and archive is not None:
+                    archive.add(url, html, content)
+            if not content:
+                continue
+            found = frontier.add_links(html, url, depth, score) if html else 0
+            staff = score >= STAFF_SCORE
+            print(f"  [{frontier.popped}] {'+' if staff else ' '} {url} (depth {depth}, {found} new links)")
+            if staff:
+                pages.append((url, content))
+
+    if archive is not None and not replay:
+        archive.prune()
+    get_recorder().incr('crawl_pages', frontier.popped)
+    print(f"[~] Crawled {frontier.popped} page(s), {len(frontier.seen)} URLs seen, {len(pages)} staff page(s)")
+    return pages
 
 
 def extract_journalists_with_grok(content: str, org_name: str, org_id: str) -> list:
@@ -139,34 +209,32 @@ If no journalists are found, return an empty array: []
 Return ONLY the JSON array, no other text."""
 
         try:
+            from openai import OpenAI
+
             client = OpenAI(
                 api_key=Config.GROK_API_KEY,
-                base_url=Config.GROK_BASE_URL
+                base_url=Config.GROK_BASE_URL,
+                max_retries=0  # Retries handled by call_with_retry
             )
 
-            completion = client.chat.completions.create(
-                model=Config.GROK_MODEL,
-                messages=[
+            completion = create_json_completion(
+                client,
+                [
                     {"role": "system", "content": "You are a data extraction assistant. Return only valid JSON arrays. Extract ALL people you find, do not limit the results."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1,
                 max_tokens=8000
             )
 
-            response = completion.choices[0].message.content.strip()
-
-            # Clean up response
-            if response.startswith("```"):
-                response = response.split("```")[1]
-                if response.startswith("json"):
-                    response = response[4:]
-                response = response.strip()
-
-            chunk_journalists = json.loads(response)
+            # Keeps every complete object even if the array is cut off at max_tokens
+            chunk_journalists = parse_array_response(
+                completion.choices[0].message.content, JOURNALIST_SCHEMA, call='journalists'
+            )
             print(f"    [+] Chunk {chunk_idx + 1}: Found {len(chunk_journalists)} journalists")
             all_journalists.extend(chunk_journalists)
 
+        except ApiError:
+            raise
         except Exception as e:
             print(f"    [X] Chunk {chunk_idx + 1} error: {e}")
             continue
@@ -175,7 +243,7 @@ Return ONLY the JSON array, no other text."""
     seen_names = set()
     unique_journalists = []
     for j in all_journalists:
-        name_key = (j.get('name_english') or j.get('name_hebrew', '')).lower().strip()
+        name_key = (j.get('name_english') or j.get('name_hebrew') or '').lower().strip()
         if name_key and name_key not in seen_names:
             seen_names.add(name_key)
             # Add metadata
@@ -192,44 +260,39 @@ Return ONLY the JSON array, no other text."""
 
 
 async def scrape_organization(org: dict) -> list:
-    """Scrape a single organization for journalist data"""
+    """Crawl an organization's staff pages and extract journalist data from each"""
     org_id = org['id']
     org_name = org['name_english']
-    staff_url = org.get('staff_page_url')
-    website = org.get('website')
 
     print(f"\n{'='*60}")
     print(f"Scraping: {org_name} ({org_id})")
     print(f"{'='*60}")
 
-    # Determine URL to scrape
-    url = staff_url or website
-    if not url:
+    if not (org.get('staff_page_url') or org.get('website')):
         print(f"[!] No URL available for {org_name}")
         return []
 
-    print(f"[1] Fetching: {url}")
+    print(f"[1] Crawling from: {org.get('staff_page_url') or org.get('website')}")
+    pages = await crawl_organization(org)
 
-    # Scrape the page
-    content = await scrape_with_crawl4ai(url, org_name)
-
-    if not content:
+    if not pages:
         print(f"[!] No content retrieved for {org_name}")
         return []
 
-    print(f"[2] Retrieved {len(content)} characters")
+    print(f"[2] Retrieved {sum(len(content) for _, content in pages)} characters from {len(pages)} page(s)")
     print(f"[3] Extracting journalists with Grok...")
 
-    # Extract journalists
-    journalists = extract_journalists_with_grok(content, org_name, org_id)
-
-    # Add source URL
-    for j in journalists:
-        j['source_url'] = url
+    # Extract journalists page by page; the first page a person appears on is their source
+    journalists = {}
+    for url, content in pages:
+        for j in extract_journalists_with_grok(content, org_name, org_id):
+            if j['id'] not in journalists:
+                j['source_url'] = url
+                journalists[j['id']] = j
 
     print(f"[OK] Found {len(journalists)} journalists")
 
-    return journalists
+    return list(journalists.values())
 
 
 async def scrape_priority_organizations(priority: int = 1):
@@ -247,6 +310,7 @@ async def scrape_priority_organizations(priority: int = 1):
     print(f"# Scraping Priority {priority} Organizations ({len(target_orgs)} total)")
     print(f"{'#'*60}")
 
+    start_batch('scraper')
     all_journalists = []
 
     for org in target_orgs:
@@ -254,10 +318,15 @@ async def scrape_priority_organizations(priority: int = 1):
             journalists = await scrape_organization(org)
             all_journalists.extend(journalists)
 
-            # Rate limiting
-            print("[~] Waiting 3 seconds...")
-            await asyncio.sleep(3)
+            # Rate limiting (nothing to wait for when replaying the archive)
+            if not Config.CRAWL_REPLAY:
+                print("[~] Waiting 3 seconds...")
+                await asyncio.sleep(3)
 
+        except ApiError as e:
+            # Quota exhausted or persistently throttled - keep what we have
+            print(f"[X] API unavailable, stopping: {e}")
+            break
         except Exception as e:
             print(f"[X] Error processing {org['name_english']}: {e}")
             continue
@@ -270,6 +339,7 @@ async def scrape_priority_organizations(priority: int = 1):
 
     # Save
     save_journalists(journalists_data)
+    metrics = finish_batch(reporters=len(new_journalists))
 
     print(f"\n{'='*60}")
     print(f"SUMMARY: Priority {priority}")
@@ -277,6 +347,10 @@ async def scrape_priority_organizations(priority: int = 1):
     print(f"Organizations scraped: {len(target_orgs)}")
     print(f"New journalists found: {len(new_journalists)}")
     print(f"Total journalists in DB: {len(journalists_data['journalists'])}")
+    for call, stats in get_parse_stats().items():
+        print(f"Parse ({call}): {stats['calls']} responses, {stats['repaired']} repaired, "
+              f"{stats['failed']} failed, {stats['objects']} objects, recovery rate {stats['recovery_rate']:.0%}")
+    print_summary(metrics)
 
     return new_journalists
 
@@ -329,6 +403,11 @@ def get_scraping_stats():
     print(f"{'='*60}")
     print(f"Total organizations: {len(orgs_data['organizations'])}")
     print(f"Total journalists: {len(journalists_data['journalists'])}")
+    archived = [CrawlArchive(org['id']) for org in orgs_data['organizations']]
+    archived = [archive for archive in archived if archive.path.exists()]
+    if archived:
+        size_mb = sum(archive.path.stat().st_size for archive in archived) / 1024 / 1024
+        print(f"Crawl archive: {len(archived)} organizations, {sum(len(a) for a in archived)} pages ({size_mb:.1f} MB)")
 
     # By organization
     org_counts = {}
@@ -351,8 +430,14 @@ if __name__ == "__main__":
                        help='Command to run')
     parser.add_argument('--org', type=str, help='Organization ID to scrape')
     parser.add_argument('--priority', type=int, default=1, help='Priority level to scrape (1, 2, or 3)')
+    parser.add_argument('--replay', action='store_true', help='Crawl from the local archive only (no network)')
+    parser.add_argument('--no-archive', action='store_true', help="Don't archive fetched pages")
 
     args = parser.parse_args()
+    if args.replay:
+        Config.CRAWL_REPLAY = True
+    if args.no_archive:
+        Config.CRAWL_ARCHIVE = False
 
     if args.command == 'list':
         list_organizations_by_priority()
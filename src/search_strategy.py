@@ -0,0 +1,226 @@
+"""
+Search strategy: fan out several query variants per reporter, merge and rank
+Variants run concurrently in waves and stop early once enough good results are found
+"""
+
+import contextvars
+import json
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse, urlencode, parse_qsl
+
+from src.config import Config
+from src.budget import get_ledger
+
+
+ORGS_FILE = Path(__file__).parent.parent / "data" / "media_organizations.json"
+
+# Rough Hebrew -> Latin transliteration (good enough for a search query)
+HEBREW_TO_LATIN = {
+    'א': 'a', 'ב': 'b', 'ג': 'g', 'ד': 'd', 'ה': 'h', 'ו': 'v', 'ז': 'z',
+    'ח': 'ch', 'ט': 't', 'י': 'y', 'כ': 'k', 'ך': 'ch', 'ל': 'l', 'מ': 'm',
+    'ם': 'm', 'נ': 'n', 'ן': 'n', 'ס': 's', 'ע': 'a', 'פ': 'p', 'ף': 'f',
+    'צ': 'tz', 'ץ': 'tz', 'ק': 'k', 'ר': 'r', 'ש': 'sh', 'ת': 't',
+}
+
+TRACKING_PARAMS = {'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'fbclid', 'gclid'}
+
+
+def transliterate_hebrew(text: str) -> str:
+    """Transliterate a Hebrew name to Latin letters (approximate)"""
+    words = []
+    for word in str(text).split():
+        out = []
+        for i, ch in enumerate(word):
+            if ch == 'ו' and 0 < i < len(word) - 1:
+                out.append('o')  # Vav between letters is usually a vowel
+            elif ch == 'י' and i > 0:
+                out.append('i')
+            elif ch == 'ב' and i > 0:
+                out.append('v')
+            elif ch == 'פ' and i > 0:
+                out.append('f')
+            else:
+                out.append(HEBREW_TO_LATIN.get(ch, ch))
+        latin = ''.join(out).replace("'", '').replace('"', '')
+        words.append(latin.capitalize())
+    return ' '.join(words)
+
+
+def has_hebrew(text: str) -> bool:
+    return bool(re.search(r'[֐-׿]', str(text)))
+
+
+def normalize_name(first_name, last_name='') -> str:
+    """Comparison key for a person: NFKC, no niqqud/punctuation (geresh, maqaf, dots), lower-case, single spaces"""
+    text = ' '.join(part for part in (first_name, last_name) if isinstance(part, str))
+    text = unicodedata.normalize('NFKC', text)
+    text = re.sub(r'[\u0591-\u05C7]', '', text)  # Niqqud and cantillation marks
+    text = re.sub(r"[\"'`׳״]", '', text)  # Geresh/gershayim belong to the word
+    text = re.sub(r'[.\-־_,()]', ' ', text)
+    return ' '.join(text.lower().split())
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for deduplication (scheme, www, trailing slash, tracking params)"""
+    parsed = urlparse(str(url).strip())
+    host = parsed.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parsed.path.rstrip('/') or '/'
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parsed.query) if k not in TRACKING_PARAMS))
+    return f"{host}{path}" + (f"?{query}" if query else '')
+
+
+def url_domain(url: str) -> str:
+    host = urlparse(str(url)).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+@lru_cache(maxsize=1)
+def load_media_domains() -> tuple:
+    """Load (names, domain) pairs for known media organizations"""
+    try:
+        with open(ORGS_FILE, 'r', encoding='utf-8') as f:
+            orgs = json.load(f).get('organizations', [])
+    except (OSError, ValueError):
+        return ()
+
+    pairs = []
+    for org in orgs:
+        website = org.get('website') or org.get('staff_page_url')
+        if not website:
+            continue
+        names = [org.get('name_hebrew'), org.get('name_english')]
+        names += [b.strip() for b in (org.get('news_brand') or '').split('/')]
+        names = tuple(n.lower() for n in names if n and len(n) > 1)
+        pairs.append((names, url_domain(website)))
+    return tuple(pairs)
+
+
+def split_role(role) -> tuple:
+    """Split a תפקיד value ('title @ employer' after an update) into (title, employer)"""
+    if not isinstance(role, str) or not role.strip() or role == 'nan':
+        return '', ''
+    role = str(role)
+    if '@' in role:
+        title, employer = role.split('@', 1)
+        return title.strip(), employer.strip()
+    return role.strip(), ''
+
+
+def match_org_domains(text: str, limit: int = 2) -> list:
+    """Find domains of known media organizations mentioned in free text"""
+    text = str(text or '').lower()
+    if not text:
+        return []
+    domains = []
+    for names, domain in load_media_domains():
+        if any(name in text for name in names) and domain not in domains:
+            domains.append(domain)
+        if len(domains) >= limit:
+            break
+    return domains
+
+
+def build_query_variants(first_name, last_name, role=None) -> list:
+    """Build query variants in priority order: [(label, query), ...]"""
+    name = f"{first_name} {last_name}".strip()
+    title, employer = split_role(role)
+    variants = [('primary', f'"{name}" Israel journalist reporter media')]
+
+    # Site-restricted queries on the employer's own domain are the most precise -
+    # they go right after the primary one so SEARCH_MAX_VARIANTS never cuts them
+    org_text = employer or title
+    for domain in match_org_domains(org_text):
+        variants.append((f'site:{domain}', f'"{name}" site:{domain}'))
+
+    if has_hebrew(name):
+        variants.append(('hebrew', f'"{name}" עיתונאי OR כתב OR עורך'))
+        variants.append(('english', f'"{transliterate_hebrew(name)}" Israel journalist'))
+
+    if org_text:
+        variants.append(('employer', f'"{name}" {org_text}'))
+
+    return variants[:Config.SEARCH_MAX_VARIANTS]
+
+
+def score_result(result: dict, name_forms: list, media_domains: set) -> float:
+    """Heuristic quality score for one merged search result"""
+    text = f"{result.get('title', '')} {result.get('snippet', '')}".lower()
+    score = 0.0
+    if any(form and form.lower() in text for form in name_forms):
+        score += 2.0
+    if url_domain(result.get('link', '')) in media_domains:
+        score += 1.0
+    # Found by several variants / ranked high -> more likely relevant
+    score += 0.5 * (len(result['variants']) - 1)
+    score += 1.0 / (1 + result['best_position'])
+    return score
+
+
+def merge_results(batches: list, name_forms: list) -> list:
+    """Dedupe results across variants by normalized URL and rank them"""
+    merged = {}
+    for label, results in batches:
+        for position, item in enumerate(results):
+            key = normalize_url(item.get('link', ''))
+            if key not in merged:
+                merged[key] = dict(item, variants=[], best_position=position)
+            entry = merged[key]
+            entry['variants'].append(label)
+            entry['best_position'] = min(entry['best_position'], position)
+            if len(item.get('snippet', '')) > len(entry.get('snippet', '')):
+                entry['snippet'] = item['snippet']
+
+    media_domains = {domain for _, domain in load_media_domains()}
+    for entry in merged.values():
+        entry['score'] = score_result(entry, name_forms, media_domains)
+
+    return sorted(merged.values(), key=lambda r: -r['score'])
+
+
+def search_reporter(search_fn, first_name, last_name, role=None, num_results=5,
+                    max_results: Optional[int] = None) -> list:
+    """
+    Run query variants concurrently (in waves of SEARCH_CONCURRENCY) and
+    return merged, ranked results. Stops issuing variants once
+    SEARCH_MIN_GOOD_RESULTS results mention the reporter's name.
+
+    search_fn(query, num_results) -> list of {'title', 'link', 'snippet'}
+    """
+    name = f"{first_name} {last_name}".strip()
+    name_forms = [name, str(last_name)]
+    if has_hebrew(name):
+        name_forms.append(transliterate_hebrew(name))
+
+    variants = build_query_variants(first_name, last_name, role)
+    if get_ledger().is_low('google'):
+        # Budget running low - one query per reporter instead of the fan-out
+        variants = variants[:1]
+        print("  [!] Google budget low, using a single query")
+    concurrency = max(1, Config.SEARCH_CONCURRENCY)
+    batches = []
+    ranked = []
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for start in range(0, len(variants), concurrency):
+            wave = variants[start:start + concurrency]
+            futures = [(label, pool.submit(contextvars.copy_context().run, search_fn, query, num_results)) for label, query in wave]
+            for label, future in futures:
+                batches.append((label, future.result()))
+
+            ranked = merge_results(batches, name_forms)
+            good = sum(1 for r in ranked if r['score'] >= 3.0)
+            if good >= Config.SEARCH_MIN_GOOD_RESULTS:
+                break
+
+    issued = len(batches)
+    if issued < len(variants):
+        print(f"  [OK] Early stop after {issued}/{len(variants)} query variants")
+
+    return ranked[:max_results or Config.SEARCH_MAX_RESULTS]
@@ -88,6 +88,79 @@ def test_crawl4ai():
         print("[!] Run: pip install -r requirements.txt")
         return False
 
+def test_query_variants():
+    """Check (offline) that a Hebrew-name reporter with an employer gets a site: query"""
+    print("\n" + "="*50)
+    print("Testing Search Query Variants")
+    print("="*50)
+
+    from src.search_strategy import build_query_variants
+
+    variants = build_query_variants('אבי', 'כהן', 'כתב/ת @ ישראל היום')
+    for label, query in variants:
+        print(f"  {label:<28} {query}")
+    if any(label.startswith('site:') for label, _ in variants):
+        print(f"[OK] site: variant kept within SEARCH_MAX_VARIANTS={Config.SEARCH_MAX_VARIANTS}")
+        return True
+    print(f"[X] No site: variant within SEARCH_MAX_VARIANTS={Config.SEARCH_MAX_VARIANTS}")
+    return False
+
+def test_batch_fallback():
+    """Check (offline) that a failing batched Grok call falls back to per-reporter extraction"""
+    print("\n" + "="*50)
+    print("Testing Batch Extraction Fallback")
+    print("="*50)
+
+    from types import SimpleNamespace
+    import src.batch_processor as bp
+
+    def fake_completion(client, messages, max_tokens, json_mode=False, reporters=None):
+        if len(reporters or []) > 1:
+            raise ConnectionResetError("connection reset by peer")  # Not an ApiError
+        content = '{"name_hebrew": "%s", "confidence_score": 60}' % reporters[0]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content),
+                                                        finish_reason='stop')])
+
+    saved = bp.create_json_completion, bp.get_grok_client, Config.GROK_BATCH_SIZE
+    bp.create_json_completion, bp.get_grok_client, Config.GROK_BATCH_SIZE = fake_completion, lambda: None, 3
+    try:
+        reporters = [{'key': n, 'name': name, 'search_results': [], 'page_context': None}
+                     for n, name in enumerate(['אבי כהן', 'דנה לוי', 'יוסי מזרחי'])]
+        extracted = dict(bp.extract_batch_with_grok(reporters))
+    finally:
+        bp.create_json_completion, bp.get_grok_client, Config.GROK_BATCH_SIZE = saved
+
+    if len(extracted) == 3 and all(data and data.get('name_hebrew') for data in extracted.values()):
+        print("[OK] All 3 reporters extracted individually after the batched call failed")
+        return True
+    print(f"[X] Reporters lost when the batched call failed: {extracted}")
+    return False
+
+def test_percentile():
+    """Check (offline) the nearest-rank percentile used for stage p50/p95"""
+    print("\n" + "="*50)
+    print("Testing Percentile")
+    print("="*50)
+
+    from src.metrics import percentile
+
+    cases = [
+        (list(range(1, 11)), 50, 5),
+        ([1, 2], 50, 1),
+        (list(range(1, 21)), 95, 19),
+        (list(range(1, 21)), 100, 20),
+        ([7], 95, 7),
+        ([], 50, 0.0),
+    ]
+    failed = [(values, pct, expected, percentile(values, pct)) for values, pct, expected in cases
+              if percentile(values, pct) != expected]
+    if not failed:
+        print(f"[OK] {len(cases)} known percentiles match")
+        return True
+    for values, pct, expected, got in failed:
+        print(f"[X] p{pct} of {values}: expected {expected}, got {got}")
+    return False
+
 def main():
     """Run all API tests"""
     print("\n" + "="*60)
@@ -99,7 +172,10 @@ def main():
     results = {
         "Google Search": test_google_search(),
         "Grok API": test_grok_api(),
-        "Crawl4AI": test_crawl4ai()
+        "Crawl4AI": test_crawl4ai(),
+        "Query variants": test_query_variants(),
+        "Batch fallback": test_batch_fallback(),
+        "Percentile": test_percentile()
     }
 
     print("\n" + "="*50)
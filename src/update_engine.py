@@ -0,0 +1,197 @@
+"""
+Field-level update engine shared by the batch pipeline (CLI) and the app
+Extraction results become column arrays, are diffed against the current rows a
+column at a time, and the confidence threshold decides which diffs are
+applied. Returns the updated frame plus a change log, so every entry point
+writes the same fields, notes and history.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import Config
+from src.contacts import EMAIL_COLUMNS, PHONE_COLUMNS, normalize_column, normalize_emails, normalize_phones
+from src.data_store import ensure_tracking_columns
+
+
+# Reporter columns the engine updates, in note order
+FIELD_COLUMNS = ['תפקיד', 'נושאים', 'דוא"ל', 'נייד']
+
+# Contact columns compare in canonical form against every column of the same kind in the row
+# (a number already stored under טלפון is not a new נייד)
+CONTACT_GROUPS = {'דוא"ל': EMAIL_COLUMNS, 'נייד': PHONE_COLUMNS}
+
+# Extraction fields listed in a low-confidence note
+FOUND_LABELS = [('employer', 'Employer'), ('job_title', 'Title'), ('email', 'Email'), ('phone', 'Phone'),
+                ('topics', 'Topics')]
+
+CHANGE_COLUMNS = ['row', 'column', 'old', 'new', 'confidence', 'decision', 'applied']
+OUTCOME_COLUMNS = ['confidence', 'decision', 'update_notes', 'changes']
+
+NULL_TEXT = {'', 'null', 'none', 'nan'}
+
+
+def _text(value) -> Optional[str]:
+    """An extraction field as clean text (lists joined, null-like values dropped)"""
+    if isinstance(value, (list, tuple)):
+        value = ', '.join(str(v) for v in value if v not in (None, ''))
+    elif value is None or value != value:  # None / NaN
+        return None
+    value = str(value).strip()
+    return None if value.lower() in NULL_TEXT else value
+
+
+def _urls(value) -> Optional[str]:
+    urls = [value] if isinstance(value, str) else value if isinstance(value, (list, tuple)) else []
+    return "; ".join(str(url) for url in urls if url) or None
+
+
+def confidence_of(extracted: dict) -> int:
+    try:
+        return max(0, min(100, int(round(float(extracted.get('confidence_score') or 0)))))
+    except (TypeError, ValueError):
+        return 0
+
+
+def decision_for(confidence: int, threshold: Optional[int] = None) -> str:
+    threshold = Config.CONFIDENCE_THRESHOLD if threshold is None else threshold
+    return "AUTO-UPDATE" if confidence >= threshold else "MANUAL REVIEW"
+
+
+def _or(values: np.ndarray, default) -> np.ndarray:
+    return np.where(pd.notna(values), values, default)
+
+
+def _join(parts: list, sep: str) -> np.ndarray:
+    """Element-wise join of object arrays, skipping None (None where every part is None)"""
+    joined = np.full(len(parts[0]), None, dtype=object)
+    for part in parts:
+        has_part, has_joined = pd.notna(part), pd.notna(joined)
+        combined = _or(joined, '') + np.where(has_part & has_joined, sep, '') + _or(part, '')
+        joined = np.where(has_part | has_joined, combined, None)
+    return joined
+
+
+def extractions_frame(extractions: dict) -> pd.DataFrame:
+    """{row index: extraction} -> one row per index holding the new column values and tracking fields"""
+    extractions = {i: e for i, e in extractions.items() if e}
+    values = list(extractions.values())
+    found = {key: np.array([_text(e.get(key)) for e in values], dtype=object) for key, _ in FOUND_LABELS}
+    columns = {
+        'תפקיד': _join([found['job_title'], found['employer']], ' @ '),
+        'נושאים': found['topics'],
+        'דוא"ל': normalize_emails(found['email']).to_numpy(dtype=object),  # Invalid contacts are dropped
+        'נייד': normalize_phones(found['phone']).to_numpy(dtype=object),
+        'confidence': np.array([confidence_of(e) for e in values], dtype=int),
+        'source_urls': np.array([_urls(e.get('source_urls')) for e in values], dtype=object),
+        **{f"found_{key}": array for key, array in found.items()},
+    }
+    return pd.DataFrame(columns, index=pd.Index(list(extractions)))
+
+
+def diff_fields(df: pd.DataFrame, frame: pd.DataFrame) -> pd.DataFrame:
+    """Long-format diffs (row, column, old, new) where the extraction has a value that differs from the row"""
+    positions = df.index.get_indexer(frame.index)
+    parts = []
+    for column in FIELD_COLUMNS:
+        if column not in df.columns:
+            continue
+        new = frame[column].to_numpy(dtype=object)
+        old = _or(df[column].to_numpy(dtype=object)[positions], '')
+        if column in CONTACT_GROUPS:
+            known = np.zeros(len(new), dtype=bool)
+            for other in CONTACT_GROUPS[column]:
+                if other in df.columns:
+                    known |= normalize_column(other, df[other].to_numpy(dtype=object)[positions]).to_numpy(dtype=object) == new
+            changed = pd.notna(new) & ~known
+        else:
+            changed = pd.notna(new) & (new != old)
+        parts.append(pd.DataFrame({'row': frame.index[changed], 'column': column,
+                                   'old': old[changed], 'new': new[changed]}))
+    if not parts:
+        return pd.DataFrame(columns=['row', 'column', 'old', 'new'])
+    return pd.concat(parts, ignore_index=True)
+
+
+def _found_notes(frame: pd.DataFrame) -> np.ndarray:
+    """'Low confidence (x%). Found: ...' per row"""
+    items = []
+    for key, label in FOUND_LABELS:
+        values = frame[f"found_{key}"].to_numpy(dtype=object)
+        items.append(np.where(pd.notna(values), label + ': ' + _or(values, ''), None))
+    found = _join(items, '; ')
+    confidence = frame['confidence'].to_numpy().astype(str).astype(object)
+    return np.where(pd.notna(found), 'Low confidence (' + confidence + '%). Found: ' + _or(found, ''),
+                    'Low confidence. Needs manual verification.')
+
+
+def apply_updates(df: pd.DataFrame, extractions: dict, threshold: Optional[int] = None,
+                  timestamp: Optional[str] = None) -> tuple:
+    """
+    Apply extraction results to df in place. Rows at or above the threshold
+    get their changed fields written; every row gets confidence, decision,
+    notes, sources and a search-history entry.
+
+    Returns (df, changes, outcomes): changes has one row per field diff
+    (CHANGE_COLUMNS; `applied` is False for rows left for manual review),
+    outcomes is indexed by row with confidence, decision, update_notes and
+    the number of applied changes.
+    """
+    ensure_tracking_columns(df)
+    frame = extractions_frame(extractions)
+    frame = frame[frame.index.isin(df.index)]
+    if frame.empty:
+        return df, pd.DataFrame(columns=CHANGE_COLUMNS), pd.DataFrame(columns=OUTCOME_COLUMNS)
+    timestamp = timestamp or datetime.now().isoformat()
+    threshold = Config.CONFIDENCE_THRESHOLD if threshold is None else threshold
+
+    rows = frame.index
+    confidence = frame['confidence'].to_numpy()
+    auto = confidence >= threshold
+    decision = np.where(auto, 'AUTO-UPDATE', 'MANUAL REVIEW').astype(object)
+
+    # Field diffs; only auto-update rows have theirs written
+    changes = diff_fields(df, frame)
+    position = rows.get_indexer(changes['row'])
+    changes['confidence'] = confidence[position]
+    changes['decision'] = decision[position]
+    changes['applied'] = auto[position]
+    changes = changes[CHANGE_COLUMNS].reset_index(drop=True)
+    applied = changes[changes['applied']]
+
+    formatted = np.full((len(FIELD_COLUMNS), len(rows)), None, dtype=object)
+    counts = np.zeros(len(rows), dtype=int)
+    for n, column in enumerate(FIELD_COLUMNS):
+        part = applied[applied['column'] == column]
+        if part.empty:
+            continue
+        df.loc[part['row'].to_numpy(), column] = part['new'].to_numpy()
+        at = rows.get_indexer(part['row'])
+        formatted[n, at] = (column + ": '" + part['old'].to_numpy(dtype=object) + "' → '"
+                            + part['new'].to_numpy(dtype=object) + "'")
+        counts[at] += 1
+
+    # Notes: applied diffs for auto-updates, what was found for manual review
+    updated = _join(list(formatted), ' | ')
+    verified = ('No changes needed. Verified: ' + _or(frame['found_employer'].to_numpy(dtype=object), 'N/A')
+                + ' - ' + _or(frame['found_job_title'].to_numpy(dtype=object), 'N/A'))
+    notes = np.where(pd.notna(updated), 'UPDATED: ' + _or(updated, ''), verified)
+    notes = np.where(auto, notes, _found_notes(frame))
+
+    entry = ('[' + timestamp + '] Confidence: ' + confidence.astype(str).astype(object) + '% | Decision: '
+             + decision + ' | ' + notes)
+    history = df.loc[rows, 'search_history'].to_numpy(dtype=object)
+    has_history = pd.notna(history) & (history != '')
+    df.loc[rows, 'search_history'] = np.where(has_history, _or(history, '') + ' || ' + entry, entry)
+    df.loc[rows, 'source_urls'] = frame['source_urls'].to_numpy(dtype=object)
+    df.loc[rows, 'confidence_score'] = confidence
+    df.loc[rows, 'last_updated'] = timestamp
+    df.loc[rows, 'update_notes'] = notes
+    df.loc[rows, 'decision'] = decision
+
+    outcomes = pd.DataFrame({'confidence': confidence, 'decision': decision, 'update_notes': notes,
+                             'changes': counts}, index=rows)
+    return df, changes, outcomes